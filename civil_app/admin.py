@@ -6,8 +6,61 @@ from django.contrib import admin
 Admin registrations to inspect your data in the Django admin UI.
 """
 
-from django.contrib import admin
-from .models import Court, Case, CaseSnapshot, CivilSearchJob
+from django.contrib import admin, messages
+from django.core.paginator import Paginator
+from django.db import connection
+from django.utils.functional import cached_property
+
+from . import search
+from .models import Court, Case, CaseSnapshot, CaseSweep, CivilSearchJob, UserCase
+from .refresh import refresh_cases, rerun_jobs
+
+# Below this many rows an exact COUNT(*) is cheap enough
+ESTIMATED_COUNT_MIN_ROWS = 10_000
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    The unfiltered changelist is counted from the planner statistics
+    (pg_class.reltuples) on PostgreSQL instead of a COUNT(*) over the whole
+    table; filtered lists, small tables and SQLite count exactly.
+    """
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if connection.vendor == "postgresql" and query is not None and not query.where:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                               [self.object_list.model._meta.db_table])
+                row = cursor.fetchone()
+            if row and row[0] >= ESTIMATED_COUNT_MIN_ROWS:
+                return row[0]
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    """
+    Changelist settings for the tables that grow without bound.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+class FullTextSearchMixin:
+    """
+    Answer the changelist search box from the full-text index (search.py)
+    instead of LIKE '%…%' scans; falls back to search_fields when the index is unavailable.
+    Only the SEARCH_MAX_RESULTS best matches are listed, with a warning when that cap is hit.
+    """
+    search_kind = ""
+
+    def get_search_results(self, request, queryset, search_term):
+        if search_term.strip() and search.is_available():
+            ids = search.search_ids(self.search_kind, search_term, limit=search.SEARCH_MAX_RESULTS)
+            if len(ids) >= search.SEARCH_MAX_RESULTS:
+                self.message_user(request, f"Showing the {search.SEARCH_MAX_RESULTS} best matches only; "
+                                           f"narrow the search to see the rest.", messages.WARNING)
+            return queryset.filter(pk__in=ids), False
+        return super().get_search_results(request, queryset, search_term)
 
 @admin.register(Court)
 class CourtAdmin(admin.ModelAdmin):
@@ -15,16 +68,56 @@ class CourtAdmin(admin.ModelAdmin):
     search_fields = ("name", "slug")
 
 @admin.register(Case)
-class CaseAdmin(admin.ModelAdmin):
+class CaseAdmin(FullTextSearchMixin, LargeTableAdmin):
+    search_kind = "case"
     list_display = ("court", "gak_number", "gak_year", "procedure", "subject")
+    list_select_related = ("court",)
     search_fields = ("gak_number", "gak_year", "subject")
+    actions = ("refresh_selected",)
+
+    @admin.action(description="Refresh selected cases from SOLON")
+    def refresh_selected(self, request, queryset):
+        queued = refresh_cases(queryset.only("id", "court_id", "gak_number", "gak_year"))
+        self.message_user(request, f"{queued} refresh job(s) queued; manage.py run_jobs runs them per court.",
+                          messages.SUCCESS)
 
 @admin.register(CaseSnapshot)
-class CaseSnapshotAdmin(admin.ModelAdmin):
+class CaseSnapshotAdmin(LargeTableAdmin):
     list_display = ("case", "scraped_at", "scraper_version")
+    list_select_related = ("case__court",)
+    raw_id_fields = ("case",)
 
 @admin.register(CivilSearchJob)
-class CivilSearchJobAdmin(admin.ModelAdmin):
+class CivilSearchJobAdmin(FullTextSearchMixin, LargeTableAdmin):
+    search_kind = "job"
     list_display = ("client_name", "court", "gak_number", "gak_year", "status", "created_at")
     list_filter = ("status", "court")
+    list_select_related = ("court",)
     search_fields = ("client_name", "gak_number")
+    raw_id_fields = ("user", "case", "snapshot")
+    actions = ("rerun_failed",)
+
+    @admin.action(description="Re-run selected failed jobs")
+    def rerun_failed(self, request, queryset):
+        queued = rerun_jobs(queryset)
+        self.message_user(request, f"{queued} failed job(s) queued again for manage.py run_jobs.",
+                          messages.SUCCESS)
+
+@admin.register(UserCase)
+class UserCaseAdmin(FullTextSearchMixin, LargeTableAdmin):
+    search_kind = "usercase"
+    list_display = ("client_name", "user", "case", "updated_at")
+    list_select_related = ("user", "case__court")
+    search_fields = ("client_name",)
+    raw_id_fields = ("user", "case", "last_snapshot")
+
+@admin.register(CaseSweep)
+class CaseSweepAdmin(admin.ModelAdmin):
+    list_display = ("court", "gak_year", "start_number", "end_number", "progress", "found", "status", "updated_at")
+    list_filter = ("status",)
+    list_select_related = ("court",)
+    readonly_fields = ("next_number", "found", "empty", "skipped", "failed_lookups", "empty_ranges", "error")
+
+    @admin.display(description="Progress")
+    def progress(self, obj):
+        return f"{obj.processed}/{obj.total}"
@@ -0,0 +1,212 @@
+"""
+Admission control for lookup jobs.
+
+- A job starts only while fewer than JOBS_MAX_RUNNING jobs run in total and
+  fewer than JOBS_MAX_RUNNING_PER_USER run for its user; otherwise it stays
+  queued and `manage.py run_jobs` starts it once a slot frees up, oldest first.
+- New jobs are refused (QueueFull) once JOBS_MAX_QUEUED jobs wait in total or
+  JOBS_MAX_QUEUED_PER_USER wait for one user, so a burst backs off at the form
+  instead of piling timeouts onto SOLON.
+- A cross-court search (a job with candidate_courts and no court yet) runs
+  FANOUT_PARALLEL lookups at once and takes that many of the JOBS_MAX_RUNNING
+  slots (at most all of them).
+- A job still "running" after JOBS_RUNNING_TIMEOUT_SECONDS is taken for dead
+  (its worker was killed) and no longer holds a slot.
+- Jobs start in FIFO order: a job is claimed only when it is the oldest queued
+  job whose user is under the per-user cap, so a fresh form submission does
+  not overtake older jobs or a cross-court search waiting for its slots.
+- Queue position counts the jobs queued before this one; the ETA divides it by
+  the finish rate of the last JOBS_THROUGHPUT_WINDOW_SECONDS.
+
+Claims are serialized: BEGIN IMMEDIATE on SQLite, a transaction-level advisory
+lock on PostgreSQL. Counts use the partial indexes job_queued_idx and
+job_running_user_idx.
+"""
+
+from __future__ import annotations
+import math
+from collections import Counter
+from datetime import timedelta
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .fanout import fanout_parallel
+from .models import CivilSearchJob
+
+THROUGHPUT_CACHE_KEY = "civil_app:admission:throughput"
+THROUGHPUT_CACHE_SECONDS = 30
+# pg_advisory_xact_lock key of the claim critical section
+CLAIM_LOCK_ID = 4_711_049
+
+
+class QueueFull(Exception):
+    """
+    Too many jobs are waiting (overall or for this user); retry_after is a hint in seconds.
+    """
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def _setting(name: str, default: int) -> int:
+    return int(getattr(settings, name, default))
+
+
+def max_running() -> int:
+    return _setting("JOBS_MAX_RUNNING", 4)
+
+
+def max_running_per_user() -> int:
+    return _setting("JOBS_MAX_RUNNING_PER_USER", 2)
+
+
+def max_queued() -> int:
+    return _setting("JOBS_MAX_QUEUED", 200)
+
+
+def max_queued_per_user() -> int:
+    return _setting("JOBS_MAX_QUEUED_PER_USER", 20)
+
+
+def _running():
+    cutoff = timezone.now() - timedelta(seconds=_setting("JOBS_RUNNING_TIMEOUT_SECONDS", 10 * 60))
+    return CivilSearchJob.objects.filter(status="running", updated_at__gte=cutoff)
+
+
+def _queued():
+    return CivilSearchJob.objects.filter(status="queued")
+
+
+def throughput() -> float:
+    """
+    Jobs finished per second over the recent window (cached briefly).
+    """
+    rate = cache.get(THROUGHPUT_CACHE_KEY)
+    if rate is None:
+        window = _setting("JOBS_THROUGHPUT_WINDOW_SECONDS", 10 * 60)
+        finished = CivilSearchJob.objects.filter(
+            status__in=CivilSearchJob.TERMINAL_STATUSES,
+            updated_at__gte=timezone.now() - timedelta(seconds=window),
+        ).count()
+        rate = finished / window
+        cache.set(THROUGHPUT_CACHE_KEY, rate, THROUGHPUT_CACHE_SECONDS)
+    return rate
+
+
+def eta_seconds(position: int) -> Optional[int]:
+    """
+    Estimated wait for the job at `position`, or None without recent throughput.
+    """
+    rate = throughput()
+    return math.ceil(position / rate) if rate > 0 else None
+
+
+def admit(user_id: Optional[int]) -> None:
+    """
+    Raise QueueFull when a new job for `user_id` would overflow the queue.
+    """
+    queued = _queued()
+    if user_id is not None and queued.filter(user_id=user_id).count() >= max_queued_per_user():
+        raise QueueFull("Έχετε ήδη πολλές αναζητήσεις σε αναμονή. Δοκιμάστε ξανά σε λίγο.",
+                        eta_seconds(max_queued_per_user()) or 60)
+    total = queued.count()
+    if total >= max_queued():
+        raise QueueFull("Το σύστημα είναι φορτωμένο. Δοκιμάστε ξανά σε λίγο.", eta_seconds(total) or 60)
+
+
+def _lock_claims() -> None:
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [CLAIM_LOCK_ID])
+
+
+def fanout_slots() -> int:
+    return min(fanout_parallel(), max_running())
+
+
+def job_slots(job: CivilSearchJob) -> int:
+    """
+    Running slots `job` takes: one lookup, or a cross-court search's parallel lookups.
+    """
+    return fanout_slots() if job.court_id is None and job.candidate_courts else 1
+
+
+def _slots_in_use(running) -> int:
+    # A running cross-court search has no court until it finds one
+    return running.count() + running.filter(court__isnull=True).count() * (fanout_slots() - 1)
+
+
+def _next_in_line(running):
+    """
+    Queryset of the oldest queued job whose user is under the per-user cap.
+    """
+    per_user = Counter(running.exclude(user_id=None).values_list("user_id", flat=True))
+    busy = [user_id for user_id, n in per_user.items() if n >= max_running_per_user()]
+    return _queued().exclude(user_id__in=busy).order_by("created_at", "id")[:1]
+
+
+def _has_slot(job: CivilSearchJob) -> bool:
+    running = _running()
+    if _slots_in_use(running) + job_slots(job) > max_running():
+        return False
+    return job.user_id is None or running.filter(user_id=job.user_id).count() < max_running_per_user()
+
+
+def _mark_running(job: CivilSearchJob) -> CivilSearchJob:
+    job.status = "running"
+    job.error = ""
+    job.save(update_fields=["status", "error", "updated_at"])
+    return job
+
+
+def try_claim(job_id: int, enforce_caps: bool = True) -> Optional[CivilSearchJob]:
+    """
+    Mark a queued job running if a slot is free and no older job is next in line,
+    and return it; None leaves it queued (or it was claimed already).
+    enforce_caps=False for jobs that need no browser.
+    """
+    with transaction.atomic():
+        _lock_claims()
+        job = CivilSearchJob.objects.select_for_update(of=("self",)).filter(id=job_id, status="queued").first()
+        if job is None:
+            return None
+        if enforce_caps:
+            if not _has_slot(job):
+                return None
+            head = _next_in_line(_running()).values_list("id", flat=True).first()
+            if head is not None and head != job.id:
+                return None
+        return _mark_running(job)
+
+
+def claim_next() -> Optional[CivilSearchJob]:
+    """
+    Claim the oldest queued job whose user is under the per-user cap, if enough
+    slots are free for it (the queue does not skip ahead of a waiting
+    cross-court search, so it cannot starve).
+    """
+    with transaction.atomic():
+        _lock_claims()
+        running = _running()
+        in_use = _slots_in_use(running)
+        if in_use >= max_running():
+            return None
+        job = _next_in_line(running).select_for_update(of=("self",)).first()
+        if job is None or in_use + job_slots(job) > max_running():
+            return None
+        return _mark_running(job)
+
+
+def queue_status(job: CivilSearchJob) -> Optional[Dict[str, Optional[int]]]:
+    """
+    {"position": 1-based place in the queue, "eta_seconds": int or None} for a queued job.
+    """
+    if job.status != "queued":
+        return None
+    ahead = _queued().filter(created_at__lte=job.created_at).exclude(created_at=job.created_at, id__gte=job.id).count()
+    position = ahead + 1
+    return {"position": position, "eta_seconds": eta_seconds(position)}
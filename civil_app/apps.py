@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CivilAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'civil_app'
+
+    def ready(self):
+        from django.conf import settings
+
+        from . import signals  # noqa: F401
+        from .browser_memory import require_shared_cache
+
+        if getattr(settings, "SOLON_BROWSER_CDP_URL", ""):
+            require_shared_cache()
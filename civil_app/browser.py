@@ -0,0 +1,152 @@
+"""
+Chromium for the SOLON scraper.
+
+By default every lookup launches its own headless Chromium and closes it
+afterwards. With SOLON_BROWSER_CDP_URL set, lookups instead attach to the one
+Chromium per host run by `manage.py browser_server` and each gets its own
+isolated BrowserContext (cookies, storage and cache are per context). A worker
+keeps its connection between lookups and reconnects when the server restarts.
+Memory sampling and recycling of the shared browser: browser_memory.py.
+
+Sync Playwright objects belong to the thread that created them, so the
+connection is kept per thread.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import ContextManager, Iterator, Optional, Sequence
+
+from django.conf import settings
+from playwright.sync_api import Browser, BrowserContext, Error as PlaywrightError, Playwright, sync_playwright
+
+from .browser_memory import browser_rss, count_lookup, court_memory, wait_while_draining
+
+logger = logging.getLogger(__name__)
+
+# Attaching to the shared server: attempts and linear backoff between them
+# (a restarting server is usually back within a few seconds).
+CONNECT_ATTEMPTS = 5
+CONNECT_BACKOFF_SECONDS = 1.0
+CONNECT_TIMEOUT_MS = 10_000
+
+
+class _Connection:
+    """
+    One thread's Playwright driver and its CDP connection to the shared browser.
+    """
+    def __init__(self) -> None:
+        self.playwright: Optional[Playwright] = None
+        self.browser: Optional[Browser] = None
+
+    def browser_for(self, endpoint: str) -> Browser:
+        if self.browser is not None and self.browser.is_connected():
+            return self.browser
+        self.disconnect()
+        if self.playwright is None:
+            self.playwright = sync_playwright().start()
+        for attempt in range(1, CONNECT_ATTEMPTS):
+            try:
+                return self._connect(endpoint)
+            except PlaywrightError as exc:
+                logger.warning("Browser server %s unreachable (attempt %s/%s): %s",
+                               endpoint, attempt, CONNECT_ATTEMPTS, exc)
+                time.sleep(CONNECT_BACKOFF_SECONDS * attempt)
+        return self._connect(endpoint)
+
+    def _connect(self, endpoint: str) -> Browser:
+        self.browser = self.playwright.chromium.connect_over_cdp(endpoint, timeout=CONNECT_TIMEOUT_MS)
+        return self.browser
+
+    def disconnect(self) -> None:
+        # Closing a CDP-attached browser only drops our connection; the server keeps running
+        if self.browser is not None:
+            try:
+                self.browser.close()
+            except PlaywrightError:
+                pass
+            self.browser = None
+
+
+_local = threading.local()
+
+
+def _connection() -> _Connection:
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        conn = _local.connection = _Connection()
+    return conn
+
+
+def release_thread_browser() -> None:
+    """
+    Drop this thread's shared-browser connection and stop its Playwright driver;
+    for short-lived threads (fan-out) that will not do another lookup.
+    """
+    conn = getattr(_local, "connection", None)
+    if conn is None:
+        return
+    conn.disconnect()
+    if conn.playwright is not None:
+        try:
+            conn.playwright.stop()
+        except Exception:
+            pass
+    _local.connection = None
+
+
+@contextmanager
+def _launched_context(args: Sequence[str], options: dict) -> Iterator[BrowserContext]:
+    with sync_playwright() as p:
+        # Closed after this one lookup: nothing to govern, so no memory sampling
+        browser = p.chromium.launch(headless=True, args=list(args))
+        try:
+            context = browser.new_context(**options)
+            try:
+                yield context
+            finally:
+                context.close()
+        finally:
+            browser.close()
+
+
+@contextmanager
+def _shared_context(label: str, endpoint: str, options: dict) -> Iterator[BrowserContext]:
+    wait_while_draining(endpoint)
+    conn = _connection()
+    try:
+        browser = conn.browser_for(endpoint)
+        context = browser.new_context(**options)
+    except PlaywrightError:
+        # The server restarted since our last lookup and the old connection is dead
+        conn.disconnect()
+        browser = conn.browser_for(endpoint)
+        context = browser.new_context(**options)
+    before = browser_rss(browser)
+    count_lookup(endpoint)
+    try:
+        yield context
+    finally:
+        try:
+            context.close()
+        except PlaywrightError:
+            # Server went away mid-lookup; reconnect on the next one
+            conn.disconnect()
+        else:
+            court_memory.record(label, before, browser_rss(browser))
+
+
+def browser_context(label: str = "", args: Sequence[str] = (), **options) -> ContextManager[BrowserContext]:
+    """
+    A fresh BrowserContext for one lookup, closed on exit.
+    `label` (the court) keys the memory statistics of browser_memory.py
+    (shared browser only);
+    `options` go to new_context(); `args` are Chromium flags for a locally
+    launched browser (the shared server has its own).
+    """
+    endpoint = getattr(settings, "SOLON_BROWSER_CDP_URL", "")
+    if endpoint:
+        return _shared_context(label, endpoint, options)
+    return _launched_context(args, options)
@@ -0,0 +1,215 @@
+"""
+Memory governor for the reused Chromium (browser.py / `manage.py browser_server`).
+
+- RSS is read from /proc (Linux) for the browser process and everything it
+  spawned (renderers, GPU, utility processes); elsewhere sampling is a no-op.
+- The server recycles its browser once the tree crosses
+  SOLON_BROWSER_MAX_RSS_MB or has served SOLON_BROWSER_RECYCLE_LOOKUPS lookups.
+  It first raises a drain flag in the cache so workers hold new lookups back,
+  and waits (up to SOLON_BROWSER_DRAIN_SECONDS) for in-flight pages to finish.
+  Workers count their lookups in the same cache, so both need the shared
+  cache (DJANGO_CACHE_URL): require_shared_cache() refuses to start without it.
+- Every lookup on the shared browser records the browser's RSS before and after, per court; every
+  LEAK_LOG_EVERY lookups the courts with the largest average growth are logged.
+"""
+
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from .status_cache import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+LEAK_LOG_EVERY = 50
+LEAK_LOG_TOP = 5
+
+# How often a held-back worker re-checks the drain flag
+DRAIN_POLL_SECONDS = 0.5
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def max_rss_bytes() -> int:
+    return int(getattr(settings, "SOLON_BROWSER_MAX_RSS_MB", 1536)) * 1024 * 1024
+
+
+def recycle_after_lookups() -> int:
+    return int(getattr(settings, "SOLON_BROWSER_RECYCLE_LOOKUPS", 500))
+
+
+def drain_seconds() -> float:
+    return float(getattr(settings, "SOLON_BROWSER_DRAIN_SECONDS", 60))
+
+
+# --- /proc sampling ---
+
+def rss_of(pids: Iterable[int]) -> Optional[int]:
+    """
+    Summed resident set size of `pids` in bytes, or None where /proc is unavailable.
+    Processes that exited in the meantime count as 0.
+    """
+    if not os.path.isdir("/proc"):
+        return None
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/statm") as fh:
+                total += int(fh.read().split()[1]) * _PAGE_SIZE
+        except (OSError, IndexError, ValueError):
+            continue
+    return total
+
+
+def process_tree(pid: int) -> List[int]:
+    """
+    `pid` and all of its descendants (Chromium's zygote/renderer processes are children of the browser).
+    """
+    children: Dict[int, List[int]] = defaultdict(list)
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return [pid]
+    for entry in entries:
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                # "pid (comm) state ppid ...": comm may contain spaces, so split after ")"
+                ppid = int(fh.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children[ppid].append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, ()))
+    return tree
+
+
+def browser_rss(browser) -> Optional[int]:
+    """
+    RSS of every process of a Playwright Chromium `browser`, local or CDP-attached
+    (the pids come from the browser itself via SystemInfo.getProcessInfo).
+    """
+    try:
+        session = browser.new_browser_cdp_session()
+        try:
+            info = session.send("SystemInfo.getProcessInfo")
+        finally:
+            session.detach()
+    except Exception:
+        return None
+    return rss_of(p["id"] for p in info.get("processInfo", []))
+
+
+# --- Per-court leak trend ---
+
+class CourtMemoryStats:
+    """
+    Running per-court average of browser RSS growth across a lookup.
+    Concurrent lookups blur single samples; the averages still single out courts
+    whose result pages keep memory alive.
+    """
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._growth: Dict[str, List[int]] = defaultdict(lambda: [0, 0])  # court -> [lookups, total bytes]
+        self._lookups = 0
+        self._last_rss: Optional[int] = None
+
+    def record(self, court: str, before: Optional[int], after: Optional[int]) -> None:
+        if before is None or after is None:
+            return
+        with self._lock:
+            entry = self._growth[court or "?"]
+            entry[0] += 1
+            entry[1] += after - before
+            self._lookups += 1
+            self._last_rss = after
+            if self._lookups % LEAK_LOG_EVERY == 0:
+                self._log()
+
+    def _log(self) -> None:
+        ranked = sorted(self._growth.items(), key=lambda kv: kv[1][1] / kv[1][0], reverse=True)[:LEAK_LOG_TOP]
+        logger.info(
+            "Browser RSS %.0f MB after %s lookups; largest average growth per lookup: %s",
+            (self._last_rss or 0) / 2**20, self._lookups,
+            ", ".join(f"{court} {total / n / 2**20:+.1f} MB ({n})" for court, (n, total) in ranked),
+        )
+
+
+court_memory = CourtMemoryStats()
+
+
+# --- Drain coordination between browser_server and workers ---
+
+def require_shared_cache() -> None:
+    """
+    The drain flag and lookup counter below only reach other processes through a
+    shared cache; with a per-process one the server would recycle its browser
+    under running lookups and never see how many it has served.
+    """
+    if not cache_is_shared():
+        raise ImproperlyConfigured(
+            "The shared browser (SOLON_BROWSER_CDP_URL, manage.py browser_server) needs a cache "
+            "shared between processes: set DJANGO_CACHE_URL."
+        )
+
+
+def _endpoint_key(endpoint: str, what: str) -> str:
+    return f"civil_app:browser:{what}:{urlsplit(endpoint).netloc or endpoint}"
+
+
+def count_lookup(endpoint: str) -> None:
+    key = _endpoint_key(endpoint, "lookups")
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, None)
+
+
+def lookups_served(endpoint: str) -> int:
+    return int(cache.get(_endpoint_key(endpoint, "lookups")) or 0)
+
+
+def set_draining(endpoint: str, draining: bool) -> None:
+    if draining:
+        # Expires on its own should the server die while draining
+        cache.set(_endpoint_key(endpoint, "draining"), True, drain_seconds() * 2 + 60)
+    else:
+        cache.delete(_endpoint_key(endpoint, "draining"))
+        cache.set(_endpoint_key(endpoint, "lookups"), 0, None)
+
+
+def wait_while_draining(endpoint: str) -> None:
+    """
+    Hold a new lookup back while the server recycles its browser (bounded wait).
+    """
+    key = _endpoint_key(endpoint, "draining")
+    deadline = time.monotonic() + drain_seconds() * 2 + 30
+    while cache.get(key) and time.monotonic() < deadline:
+        time.sleep(DRAIN_POLL_SECONDS)
+
+
+def open_pages(endpoint: str) -> Optional[int]:
+    """
+    Pages currently open on the CDP endpoint (about:blank excluded), or None if it does not answer.
+    """
+    try:
+        with urllib.request.urlopen(endpoint.rstrip("/") + "/json/list", timeout=5) as resp:
+            targets = json.load(resp)
+    except (OSError, ValueError):
+        return None
+    return sum(1 for t in targets if t.get("type") == "page" and t.get("url") != "about:blank")
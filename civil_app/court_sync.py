@@ -0,0 +1,130 @@
+"""
+Court list sync from SOLON's 'Κατάστημα' dropdown, shared by the sync_courts
+management command and scripts/sync_courts_standalone.py.
+
+All option texts/values are read with one evaluate_all() (a single Playwright
+round trip), diffed against the Court table in memory, and applied with
+bulk_create/bulk_update in one transaction:
+  - courts are matched on the whitespace-normalized name only: option values
+    are positional indexes, so one court inserted mid-list renumbers the rest
+  - new names are added (with a unique slug)
+  - known names get their current option value (solon_code) refreshed and are
+    reactivated if they had been switched off
+  - active courts no longer offered by SOLON are deactivated (never deleted:
+    cases keep pointing at them)
+"""
+
+from __future__ import annotations
+from typing import Dict, List, Set, Tuple
+
+from django.db import transaction
+from django.utils.text import slugify
+
+from .browser import browser_context
+from .courts import bump_courts_version
+from .models import Court
+from .solon_scraper_adf import SEL_KATASTIMA, URL
+
+PLACEHOLDER_OPTIONS = ("", "--", "επιλέξτε", "επιλογή")
+
+# One round trip: [[value, text], ...] with whitespace collapsed like innerText
+_OPTIONS_JS = """
+els => els.map(o => [o.value || "", (o.textContent || "").replace(/\\s+/g, " ").trim()])
+"""
+
+
+def read_court_options(page) -> List[Tuple[str, str]]:
+    """
+    (value, name) of every real option of the Κατάστημα dropdown on an open SOLON page.
+    """
+    select = page.locator(SEL_KATASTIMA)
+    if not select.count():
+        select = page.get_by_label("Κατάστημα", exact=False)
+    if not select.count():
+        select = page.locator("select").first
+    options = []
+    seen = set()
+    for value, name in select.locator("option").evaluate_all(_OPTIONS_JS):
+        if name.lower() in PLACEHOLDER_OPTIONS or name in seen:
+            continue
+        seen.add(name)
+        options.append((value, name))
+    return options
+
+
+def fetch_court_options() -> List[Tuple[str, str]]:
+    with browser_context("court_sync", args=["--no-sandbox"], locale="el-GR") as context:
+        page = context.new_page()
+        page.goto(URL, wait_until="domcontentloaded", timeout=45000)
+        return read_court_options(page)
+
+
+def _normalized(name: str) -> str:
+    # Option texts are read whitespace-collapsed; stored names may predate that
+    return " ".join((name or "").split())
+
+
+def _unique_slug(name: str, taken: Set[str]) -> str:
+    base = slugify(name, allow_unicode=True)[:240] or "court"
+    slug, n = base, 2
+    while slug in taken:
+        slug, n = f"{base}-{n}", n + 1
+    taken.add(slug)
+    return slug
+
+
+def apply_court_options(options: List[Tuple[str, str]]) -> Dict[str, int]:
+    """
+    Bring the Court table in line with `options`; returns {"added", "changed", "removed", "unchanged"}.
+    Courts are matched on the whitespace-normalized name (never on the positional
+    option value), so a stored name that differs from SOLON's only in spacing keeps its row.
+    An empty option list is treated as a failed scrape, not as "every court is gone".
+    """
+    if not options:
+        raise ValueError("SOLON returned no courts; refusing to deactivate the whole list.")
+
+    counts = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    with transaction.atomic():
+        courts = list(Court.objects.select_for_update().only("id", "name", "slug", "solon_code", "is_active"))
+        by_name = {_normalized(c.name): c for c in courts}
+        slugs = {c.slug for c in courts}
+
+        offered: Dict[int, str] = {}  # court id -> option value
+        new = []
+        for value, name in options:
+            court = by_name.get(_normalized(name))
+            if court is not None:
+                offered.setdefault(court.id, value)
+            else:
+                by_name[_normalized(name)] = court = Court(name=name, slug=_unique_slug(name, slugs),
+                                                           solon_code=value, is_active=True)
+                new.append(court)
+        counts["added"] = len(new)
+
+        to_update = []
+        for court in courts:
+            value = offered.get(court.id)
+            if value is None:
+                if court.is_active:
+                    court.is_active = False
+                    to_update.append(court)
+                    counts["removed"] += 1
+                continue
+            if court.is_active and court.solon_code == value:
+                counts["unchanged"] += 1
+                continue
+            court.is_active = True
+            court.solon_code = value
+            to_update.append(court)
+            counts["changed"] += 1
+
+        Court.objects.bulk_create(new, batch_size=500)
+        Court.objects.bulk_update(to_update, ["is_active", "solon_code"], batch_size=500)
+        # bulk_* send no post_save, so the signal in signals.py never fires here
+        if new or to_update:
+            transaction.on_commit(bump_courts_version)
+    return counts
+
+
+def sync_courts() -> Dict[str, int]:
+    return apply_court_options(fetch_court_options())
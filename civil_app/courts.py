@@ -0,0 +1,173 @@
+"""
+Cached Court list for the Κατάστημα dropdown and the court autocomplete.
+
+The list only changes when sync_courts runs or a Court is edited, so it is kept
+in the cache under a version key; writers call bump_courts_version() and every
+reader picks up the new list on its next request. A per-process cache never
+sees another process's bump (sync_courts runs on its own), so there the
+version only lives COURTS_LOCAL_VERSION_SECONDS and is re-seeded after that.
+
+CourtIndex is an in-process, accent/case-insensitive index over Court.name
+(token prefixes + trigrams) that is rebuilt whenever the version changes.
+"""
+
+from __future__ import annotations
+import heapq
+import re
+import threading
+import time
+import unicodedata
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+from django.core.cache import cache
+
+from .models import Court
+from .status_cache import cache_is_shared
+
+COURTS_VERSION_KEY = "civil_app:courts:version"
+COURTS_CACHE_SECONDS = 24 * 60 * 60
+COURTS_LOCAL_VERSION_SECONDS = 60
+
+
+def _version_timeout() -> Optional[int]:
+    return None if cache_is_shared() else COURTS_LOCAL_VERSION_SECONDS
+
+
+def courts_version() -> int:
+    """
+    Current version of the Court table. Seeded from the clock so a cache flush
+    never reuses a version that may still have a stale list stored under it.
+    """
+    version = cache.get(COURTS_VERSION_KEY)
+    if version is None:
+        cache.add(COURTS_VERSION_KEY, time.time_ns(), timeout=_version_timeout())
+        version = cache.get(COURTS_VERSION_KEY, 0)
+    return version
+
+
+def bump_courts_version() -> None:
+    """
+    Invalidate every cached court list (and anything else keyed on courts_version()).
+    """
+    try:
+        cache.incr(COURTS_VERSION_KEY)
+    except ValueError:
+        cache.set(COURTS_VERSION_KEY, time.time_ns(), timeout=_version_timeout())
+
+
+def cached_court_choices() -> List[Dict[str, Union[int, str]]]:
+    """
+    Active courts as [{"id": ..., "name": ...}] ordered by name; hits the DB only
+    once per courts version.
+    """
+    key = f"civil_app:courts:choices:{courts_version()}"
+    choices = cache.get(key)
+    if choices is None:
+        choices = [
+            {"id": pk, "name": name}
+            for pk, name in Court.objects.filter(is_active=True).order_by("name").values_list("id", "name")
+        ]
+        cache.set(key, choices, COURTS_CACHE_SECONDS)
+    return choices
+
+
+_non_word = re.compile(r"[\W_]+", re.U)
+
+
+def fold(text: str) -> str:
+    """
+    Lowercase, strip Greek/Latin accents and punctuation: 'Πρωτοδικείο  Αθηνών' -> 'πρωτοδικειο αθηνων'.
+    """
+    decomposed = unicodedata.normalize("NFD", text or "")
+    bare = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _non_word.sub(" ", bare.casefold()).strip()
+
+
+def _trigrams(folded: str) -> Set[str]:
+    padded = f" {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class CourtIndex:
+    """
+    Immutable lookup structure; build a new one instead of mutating.
+      - queries shorter than 3 chars use the token-prefix map
+      - longer queries intersect trigram postings, then confirm with a substring test
+    """
+
+    def __init__(self, courts: List[Dict[str, Union[int, str]]], version: int = 0):
+        self.version = version
+        self.courts = courts
+        self.folded: List[str] = [fold(str(c["name"])) for c in courts]
+        self.prefixes: Dict[str, Set[int]] = {}
+        self.postings: Dict[str, Set[int]] = {}
+        for i, name in enumerate(self.folded):
+            for token in name.split():
+                for n in (1, 2):
+                    self.prefixes.setdefault(token[:n], set()).add(i)
+            for gram in _trigrams(name):
+                self.postings.setdefault(gram, set()).add(i)
+
+    def _candidates(self, token: str) -> Set[int]:
+        if len(token) < 3:
+            return self.prefixes.get(token, set())
+        # Interior trigrams only: the query may start/end in the middle of a word
+        grams = sorted(_trigrams(token) - {f" {token[:2]}", f"{token[-2:]} "},
+                       key=lambda g: len(self.postings.get(g, ())))
+        found: Set[int] = set(self.postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not found:
+                break
+            found &= self.postings.get(gram, set())
+        return found
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Union[int, str]]]:
+        """
+        Every query word must appear in the name ('πρωτ αθ' finds 'Πρωτοδικείο Αθηνών').
+        Ranking: name starts with the query, then word-prefix matches, then substrings.
+        """
+        q = fold(query)
+        tokens = q.split()
+        if not tokens:
+            return []
+
+        candidates: Optional[Set[int]] = None
+        for token in sorted(tokens, key=len, reverse=True):
+            found = self._candidates(token)
+            candidates = set(found) if candidates is None else candidates & found
+            if not candidates:
+                return []
+
+        ranked: List[Tuple[int, str, int]] = []
+        for i in candidates or ():
+            name = self.folded[i]
+            padded = f" {name}"
+            if not all(f" {t}" in padded if len(t) < 3 else t in name for t in tokens):
+                continue
+            if name.startswith(q):
+                rank = 0
+            elif all(f" {t}" in padded for t in tokens):
+                rank = 1
+            else:
+                rank = 2
+            ranked.append((rank, name, i))
+        return [self.courts[i] for _, _, i in heapq.nsmallest(limit, ranked)]
+
+
+_index: Optional[CourtIndex] = None
+_index_lock = threading.Lock()
+
+
+def court_index() -> CourtIndex:
+    """
+    Process-wide CourtIndex, rebuilt when courts_version() moves.
+    """
+    global _index
+    version = courts_version()
+    index = _index
+    if index is None or index.version != version:
+        with _index_lock:
+            if _index is None or _index.version != version:
+                _index = CourtIndex(cached_court_choices(), version)
+            index = _index
+    return index
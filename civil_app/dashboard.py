@@ -0,0 +1,166 @@
+"""
+"My cases": a user's followed cases (UserCase), one page at a time.
+
+Cases with a hearing today or later come first (soonest first), then past
+hearings (latest first), then cases without a hearing date. Pages are
+keyset-paginated on (Case.hearing_date, UserCase.id) within those groups so
+page N costs the same as page 1, and rows are read in a single joined query
+(case, court, latest snapshot) restricted to the columns the table shows. The
+per-court / decided / pending counts behind the filters are cached per user.
+"""
+
+from __future__ import annotations
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.core.cache import cache
+from django.db import models, transaction
+from django.db.models import Count, F, Q, When
+from django.utils import timezone
+
+from . import search
+from .models import UserCase
+
+MY_CASES_PAGE_SIZE = 50
+
+# Counts are dropped on follow/unfollow and when a lookup updates a followed
+# case; the timeout only bounds anything that changes behind the ORM's back.
+MY_CASES_COUNTS_CACHE_SECONDS = 10 * 60
+
+DECISION_FILTERS = ("decided", "pending")
+
+ROW_FIELDS = (
+    "id", "client_name",
+    "case__gak_number", "case__gak_year", "case__hearing_date", "case__pinakio_number",
+    "case__decision_number", "case__decision_year", "case__change_count",
+    "case__court__name", "case__latest_snapshot__scraped_at",
+)
+
+
+def counts_cache_key(user_id: int) -> str:
+    return f"civil_app:my_cases_counts:{user_id}"
+
+
+def invalidate_counts(user_ids: Iterable[int]) -> None:
+    """
+    Drop the cached counts once the current transaction commits (immediately
+    outside one), so a concurrent page view cannot re-cache the old numbers.
+    """
+    keys = [counts_cache_key(user_id) for user_id in set(user_ids)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def user_case_counts(user_id: int) -> Dict[str, Any]:
+    """
+    {"total", "decided", "pending", "courts": [{"id", "name", "count"}]} from one grouped query.
+    """
+    key = counts_cache_key(user_id)
+    counts = cache.get(key)
+    if counts is None:
+        rows = list(
+            UserCase.objects.filter(user_id=user_id)
+            .values("case__court_id", "case__court__name")
+            .annotate(total=Count("id"), decided=Count("id", filter=~Q(case__decision_number="")))
+            .order_by("case__court__name")
+        )
+        courts = [{"id": r["case__court_id"], "name": r["case__court__name"], "count": r["total"]} for r in rows]
+        total = sum(c["count"] for c in courts)
+        decided = sum(r["decided"] for r in rows)
+        counts = {"total": total, "decided": decided, "pending": total - decided, "courts": courts}
+        cache.set(key, counts, MY_CASES_COUNTS_CACHE_SECONDS)
+    return counts
+
+
+Cursor = Tuple[date, Optional[date], int]
+
+UPCOMING, PAST, UNDATED = 0, 1, 2
+
+
+def _group(hearing: Optional[date], today: date) -> int:
+    if hearing is None:
+        return UNDATED
+    return UPCOMING if hearing >= today else PAST
+
+
+def make_cursor(user_case: UserCase, today: date) -> str:
+    hearing = user_case.case.hearing_date
+    return f"{today.isoformat()}_{hearing.isoformat() if hearing else 'none'}_{user_case.id}"
+
+
+def parse_cursor(value: str) -> Optional[Cursor]:
+    """
+    "<today>_<YYYY-MM-DD|none>_<usercase id>" -> (today, hearing_date, id), or
+    None when malformed. `today` is the day the first page split upcoming from
+    past, so a walk that crosses midnight stays consistent.
+    """
+    parts = value.split("_")
+    if len(parts) != 3:
+        return None
+    today, hearing, last_id = parts
+    try:
+        return (date.fromisoformat(today), None if hearing == "none" else date.fromisoformat(hearing),
+                int(last_id))
+    except ValueError:
+        return None
+
+
+def _after(after: Cursor) -> Q:
+    today, hearing, last_id = after
+    group = _group(hearing, today)
+    undated = Q(case__hearing_date__isnull=True)
+    if group == UNDATED:
+        return undated & Q(id__gt=last_id)
+    same = Q(case__hearing_date=hearing, id__gt=last_id)
+    if group == UPCOMING:
+        return same | Q(case__hearing_date__gt=hearing) | Q(case__hearing_date__lt=today) | undated
+    return same | Q(case__hearing_date__lt=hearing) | undated
+
+
+def user_cases_page(
+    user_id: int,
+    court_id: Optional[int] = None,
+    decision: str = "",
+    query: str = "",
+    after: Optional[Cursor] = None,
+    page_size: int = MY_CASES_PAGE_SIZE,
+) -> Tuple[List[UserCase], Optional[str]]:
+    """
+    One page of followed cases (upcoming hearings soonest first, then past ones
+    latest first, then undated) and the cursor of the following page (None on
+    the last one). `query` keeps the cases whose client name matches it.
+    """
+    today = after[0] if after is not None else timezone.localdate()
+    qs = (
+        UserCase.objects.filter(user_id=user_id)
+        .select_related("case__court", "case__latest_snapshot")
+        .only(*ROW_FIELDS)
+    )
+    if court_id:
+        qs = qs.filter(case__court_id=court_id)
+    if decision == "decided":
+        qs = qs.exclude(case__decision_number="")
+    elif decision == "pending":
+        qs = qs.filter(case__decision_number="")
+    if query.strip():
+        if search.is_available():
+            qs = qs.filter(id__in=search.search_ids("usercase", query, user_id=user_id, limit=None))
+        else:
+            qs = qs.filter(client_name__icontains=query.strip())
+    if after is not None:
+        qs = qs.filter(_after(after))
+
+    upcoming = Q(case__hearing_date__gte=today)
+    qs = qs.annotate(
+        hearing_group=models.Case(
+            When(upcoming, then=UPCOMING), When(case__hearing_date__isnull=False, then=PAST),
+            default=UNDATED, output_field=models.IntegerField(),
+        ),
+        upcoming_date=models.Case(When(upcoming, then=F("case__hearing_date"))),
+        past_date=models.Case(When(case__hearing_date__lt=today, then=F("case__hearing_date"))),
+    )
+    rows = list(qs.order_by("hearing_group", F("upcoming_date").asc(), F("past_date").desc(), "id")[:page_size + 1])
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        return rows, make_cursor(rows[-1], today)
+    return rows, None
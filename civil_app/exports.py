@@ -0,0 +1,59 @@
+"""
+Streaming exports of a user's followed cases (UserCase).
+
+Rows are produced from a values_list().iterator() query so the result set is
+never materialized; the CSV writer formats one line at a time into the
+StreamingHttpResponse.
+"""
+
+from __future__ import annotations
+import csv
+from typing import Any, Iterator, List
+
+from django.utils import timezone
+
+from .models import UserCase
+from .normalizers import DISPLAY_ORDER, snapshot_fields
+
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADER: List[str] = ["Πελάτης", "Κατάστημα", "ΓΑΚ", "Έτος"] + DISPLAY_ORDER + ["Τελευταίος έλεγχος"]
+
+
+class _Echo:
+    """
+    File-like object for csv.writer that hands each formatted line straight back.
+    """
+    def write(self, value: str) -> str:
+        return value
+
+
+def user_case_rows(user) -> Iterator[List[Any]]:
+    """
+    One row per UserCase with the fields of the case's latest snapshot
+    (joined through Case.latest_snapshot); times are in TIME_ZONE, as on the pages.
+    """
+    qs = (
+        UserCase.objects
+        .filter(user=user)
+        .order_by("client_name", "id")
+        .values_list("client_name", "case__court__name", "case__gak_number", "case__gak_year",
+                     "case__latest_snapshot__data_json", "case__latest_snapshot__scraped_at")
+    )
+    for client_name, court_name, gak_number, gak_year, data, scraped_at in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        fields = snapshot_fields(data)
+        yield (
+            [client_name, court_name, gak_number, gak_year]
+            + [fields.get(label, "") or "" for label in DISPLAY_ORDER]
+            + [timezone.localtime(scraped_at).strftime("%d/%m/%Y %H:%M") if scraped_at else ""]
+        )
+
+
+def iter_user_cases_csv(user) -> Iterator[str]:
+    """
+    CSV lines for user_case_rows(), starting with a UTF-8 BOM so Excel reads the Greek text correctly.
+    """
+    writer = csv.writer(_Echo())
+    yield "\ufeff" + writer.writerow(EXPORT_HEADER)
+    for row in user_case_rows(user):
+        yield writer.writerow(row)
@@ -0,0 +1,128 @@
+"""
+Cross-court lookup for a ΓΑΚ/year whose Κατάστημα is unknown.
+
+Candidate courts (a typeahead query's matches, or every active court) are
+ranked by how often lookups there found a case and cut to FANOUT_MAX_COURTS.
+The form stores them on a queued job (CivilSearchJob.candidate_courts); the
+job runner scrapes them FANOUT_PARALLEL at a time through the normal scraper
+(browser.py decides whether each lookup launches a browser or uses the shared
+one), and admission control counts such a job as FANOUT_PARALLEL slots.
+Every candidate is looked up and the hits come back in candidate order, so the
+outcome does not depend on which lookup finishes first. ΓΑΚ numbering is per
+court, so several hits are different cases: jobs.py lets the user pick one
+instead of binding the job to any of them.
+"""
+
+from __future__ import annotations
+import logging
+import threading
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+from .browser import release_thread_browser
+from .courts import cached_court_choices, court_index
+from .models import CivilSearchJob
+from .negative_cache import is_known_miss, remember_miss
+from .normalizers import GENERAL_NUMBER, clean_solon_fields, has_case_data
+from .solon_scraper_adf import scrape_solon_civil_adf
+
+logger = logging.getLogger(__name__)
+
+COURT_HITS_CACHE_KEY = "civil_app:fanout:court_hits"
+COURT_HITS_CACHE_SECONDS = 60 * 60
+
+Court = Dict[str, Union[int, str]]
+
+
+def fanout_parallel() -> int:
+    return max(1, int(getattr(settings, "FANOUT_PARALLEL", 4)))
+
+
+def fanout_max_courts() -> int:
+    return max(1, int(getattr(settings, "FANOUT_MAX_COURTS", 40)))
+
+
+def court_hits() -> Dict[int, int]:
+    """
+    {court_id: lookups there that found a case}, cached.
+    """
+    hits = cache.get(COURT_HITS_CACHE_KEY)
+    if hits is None:
+        hits = dict(
+            CivilSearchJob.objects.filter(status="done")
+            .values("court_id").annotate(n=Count("id")).values_list("court_id", "n")
+        )
+        cache.set(COURT_HITS_CACHE_KEY, hits, COURT_HITS_CACHE_SECONDS)
+    return hits
+
+
+def candidate_courts(court_q: str = "") -> List[Court]:
+    """
+    Active courts matching `court_q` (all of them when empty), most hits first.
+    Callers cut the list to fanout_max_courts().
+    """
+    if court_q.strip():
+        courts = court_index().search(court_q, limit=len(cached_court_choices()))
+    else:
+        courts = cached_court_choices()
+    hits = court_hits()
+    return sorted(courts, key=lambda c: (-hits.get(c["id"], 0), c["name"]))
+
+
+def _found(raw: Any, gak_number: str, gak_year: int) -> bool:
+    """
+    The results grid holds a row for this ΓΑΚ/year (not just any data).
+    """
+    fields = raw.get("fields") if isinstance(raw, dict) else None
+    if not fields:
+        return False
+    cleaned = clean_solon_fields(raw)
+    general = cleaned.get(GENERAL_NUMBER, "")
+    return has_case_data(cleaned) and (not general or general == f"{gak_number}/{gak_year}")
+
+
+def _lookup(court: Court, gak_number: str, gak_year: int) -> Optional[Dict[str, Any]]:
+    if is_known_miss(int(court["id"]), gak_number, gak_year):
+        return None
+    try:
+        raw = scrape_solon_civil_adf(str(court["name"]), gak_number, gak_year)
+    except Exception:
+        logger.exception("Fan-out lookup failed in %s for %s/%s", court["name"], gak_number, gak_year)
+        return None
+    if not _found(raw, gak_number, gak_year):
+        remember_miss(int(court["id"]), gak_number, gak_year)
+        return None
+    return raw
+
+
+def find_courts(gak_number: str, gak_year: int, courts: List[Court],
+                parallel: Optional[int] = None) -> List[Tuple[Court, Dict[str, Any]]]:
+    """
+    [(court, scrape result), ...] for every court in `courts` holding the ΓΑΚ,
+    in `courts` order; up to `parallel` lookups run at once.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(courts)
+    positions = iter(range(len(courts)))
+    lock = threading.Lock()
+
+    def worker() -> None:
+        try:
+            while True:
+                with lock:
+                    i = next(positions, None)
+                if i is None:
+                    return
+                results[i] = _lookup(courts[i], gak_number, gak_year)
+        finally:
+            release_thread_browser()
+
+    threads = [threading.Thread(target=worker, name=f"fanout-{n}", daemon=True)
+               for n in range(min(parallel or fanout_parallel(), len(courts)))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return [(court, raw) for court, raw in zip(courts, results) if raw is not None]
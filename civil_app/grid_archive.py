@@ -0,0 +1,156 @@
+"""
+Content-addressed archive of the raw SOLON results grid (#pc1:ldoTable::db).
+
+Every lookup's grid HTML is gzip-compressed and stored once per SHA-256 under
+settings.GRID_ARCHIVE_DIR (ab/cd/<sha>.html.gz); CaseSnapshot.grid_sha256
+points at it. extract_row_fields() is a Python port of the in-browser
+extraction in solon_scraper_adf._extract_row_fields, so archived grids can be
+re-parsed offline (renormalize_snapshots --from-archive) when extraction bugs
+are fixed, without scraping SOLON again.
+"""
+
+from __future__ import annotations
+import gzip
+import hashlib
+import os
+import re
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+# Same td id suffix -> label map as the live extractor
+CELL_LABELS: Dict[str, str] = {
+    ":c2": "Ημ. Κατάθεσης",
+    ":c3": "Γενικός Αριθμός Κατάθεσης/Έτος",
+    ":c4": "Ειδικός Αριθμός Κατάθεσης/Έτος",
+    ":c5": "Διαδικασία",
+    ":c6": "Είδος",
+    ":c7": "Αντικείμενο",
+    ":c9": "Αριθμός Πινακίου",
+    ":c10": "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού",
+    ":c11": "Αποτέλεσμα Συζήτησης",
+}
+DECISION_LABEL = "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού"
+
+_ws = re.compile(r"\s+")
+_decision_rx = re.compile(r"\d+/\d{4}\s*-\s*\S")
+
+
+def archive_dir() -> Path:
+    return Path(getattr(settings, "GRID_ARCHIVE_DIR", Path(settings.BASE_DIR) / "grid_archive"))
+
+
+def _path(sha: str) -> Path:
+    return archive_dir() / sha[:2] / sha[2:4] / f"{sha}.html.gz"
+
+
+def store(html: str) -> str:
+    """
+    Archive `html` and return its SHA-256; identical grids are written only once.
+    """
+    data = (html or "").encode("utf-8")
+    sha = hashlib.sha256(data).hexdigest()
+    path = _path(sha)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with gzip.open(tmp, "wb", compresslevel=9) as fh:
+            fh.write(data)
+        # Atomic publish: concurrent writers of the same grid just replace identical bytes
+        os.replace(tmp, path)
+    return sha
+
+
+def load(sha: str) -> Optional[str]:
+    path = _path(sha)
+    if not sha or not path.exists():
+        return None
+    with gzip.open(path, "rb") as fh:
+        return fh.read().decode("utf-8")
+
+
+class _GridParser(HTMLParser):
+    """
+    Collects rows as [(td id, text), ...]. Like querySelectorAll, nested cells
+    count for every enclosing row and a cell's text includes its descendants.
+    """
+    _breaks = {"br", "div", "p", "tr", "td", "th", "li"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.rows: List[List[List[str]]] = []
+        self._open_rows: List[List[List[str]]] = []
+        self._open_cells: List[List[str]] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag == "tr":
+            row: List[List[str]] = []
+            self.rows.append(row)
+            self._open_rows.append(row)
+        elif tag == "td":
+            cell = [dict(attrs).get("id") or "", ""]
+            for row in self._open_rows:
+                row.append(cell)
+            self._open_cells.append(cell)
+        if tag in self._breaks:
+            self._text(" ")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style"):
+            self._skip = max(0, self._skip - 1)
+        elif tag == "td" and self._open_cells:
+            self._open_cells.pop()
+        elif tag == "tr" and self._open_rows:
+            self._open_rows.pop()
+        if tag in self._breaks:
+            self._text(" ")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self._text(data)
+
+    def _text(self, data: str) -> None:
+        for cell in self._open_cells:
+            cell[1] += data
+
+
+def _norm(s: str) -> str:
+    return _ws.sub(" ", (s or "").replace("\u00A0", " ")).strip()
+
+
+def extract_row_fields(html: str, gak_num: str, gak_year: str) -> Dict[str, str]:
+    """
+    Offline equivalent of solon_scraper_adf._extract_row_fields for archived grid HTML.
+    """
+    parser = _GridParser()
+    parser.feed(html or "")
+    parser.close()
+
+    num, year = _norm(str(gak_num)), _norm(str(gak_year))
+    combined = re.compile(r"^\s*" + re.escape(num) + r"\s*/\s*" + re.escape(year) + r"\s*$")
+
+    for row in parser.rows:
+        cells: List[Tuple[str, str]] = [(cid, _norm(text)) for cid, text in row]
+        if not cells:
+            continue
+        texts = [t for _, t in cells]
+        if not ((num in texts and year in texts) or any(combined.match(t) for t in texts)):
+            continue
+
+        out: Dict[str, str] = {}
+        for cid, text in cells:
+            for suffix, label in CELL_LABELS.items():
+                if cid.endswith(suffix):
+                    out[label] = text
+                    break
+        if not out.get(DECISION_LABEL):
+            dec = next((t for t in texts if _decision_rx.search(t)), None)
+            if dec:
+                out[DECISION_LABEL] = dec
+        return out
+    return {}
@@ -0,0 +1,162 @@
+"""
+Per-user iCalendar feed of upcoming hearings (Δικάσιμος) for followed cases.
+
+Calendar apps poll feeds often, so:
+- a one-row aggregate over the user's UserCase/Case rows gives a feed version;
+  an unchanged version is answered from the cache (or with 304) without
+  touching anything else
+- when the version moves, VEVENTs of cases whose updated_at did not change are
+  reused from the previous build and only the changed ones are re-rendered
+"""
+
+from __future__ import annotations
+import hashlib
+import secrets
+from datetime import date, timedelta, timezone as dt_timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.core import signing
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from .models import CalendarFeedKey, UserCase
+
+FEED_SALT = "civil_app.ics"
+FEED_CACHE_SECONDS = 7 * 24 * 60 * 60
+# Keep recently past hearings visible for a while after the date.
+FEED_PAST_DAYS = 30
+
+
+def _signer(user_id: int) -> signing.Signer:
+    # Users who never reset their feed have no key: their original URL stays valid
+    key = CalendarFeedKey.objects.filter(user_id=user_id).values_list("key", flat=True).first()
+    return signing.Signer(salt=f"{FEED_SALT}:{key}" if key else FEED_SALT)
+
+
+def feed_token(user) -> str:
+    """
+    Opaque token for the feed URL (user id signed with the user's feed key; no login needed to fetch it).
+    """
+    return _signer(user.pk).sign(str(user.pk))
+
+
+def user_id_from_token(token: str) -> Optional[int]:
+    try:
+        user_id = int(token.rsplit(":", 1)[0])
+        _signer(user_id).unsign(token)
+    except (signing.BadSignature, ValueError):
+        return None
+    return user_id
+
+
+def reset_feed_token(user) -> str:
+    """
+    Give the user a new feed URL; the previous one stops working.
+    """
+    CalendarFeedKey.objects.update_or_create(user=user, defaults={"key": secrets.token_urlsafe(32)})
+    return feed_token(user)
+
+
+def _escape(text: str) -> str:
+    return (str(text or "").replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line: str) -> str:
+    """
+    RFC 5545 line folding: at most 75 octets per line, continuation lines start with a space.
+    """
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line
+    parts: List[str] = []
+    chunk = ""
+    limit = 75
+    for ch in line:
+        if len((chunk + ch).encode("utf-8")) > limit:
+            parts.append(chunk)
+            chunk = ""
+            limit = 74  # leading space of the continuation line
+        chunk += ch
+    parts.append(chunk)
+    return "\r\n ".join(parts)
+
+
+def _vevent(case_id: int, client_name: str, court: str, gak_number: str, gak_year: int,
+            subject: str, hearing: date, stamp) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:case-{case_id}@yoursolon",
+        f"DTSTAMP:{stamp.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')}",
+        f"DTSTART;VALUE=DATE:{hearing.strftime('%Y%m%d')}",
+        f"DTEND;VALUE=DATE:{(hearing + timedelta(days=1)).strftime('%Y%m%d')}",
+        f"SUMMARY:{_escape(f'Δικάσιμος: {client_name} — ΓΑΚ {gak_number}/{gak_year}')}",
+        f"LOCATION:{_escape(court)}",
+        f"DESCRIPTION:{_escape(subject)}",
+        "TRANSP:TRANSPARENT",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+def _feed_version(user_id: int) -> str:
+    agg = UserCase.objects.filter(user_id=user_id).aggregate(
+        n=Count("id"), uc=Max("updated_at"), c=Max("case__updated_at"),
+    )
+    # The date is part of the version because the FEED_PAST_DAYS window moves daily.
+    token = f"{timezone.localdate()}|{agg['n']}|{agg['uc']}|{agg['c']}"
+    return hashlib.md5(token.encode("utf-8")).hexdigest()
+
+
+def _build(user_id: int, previous: Dict[int, Tuple[str, str]]) -> Tuple[str, Dict[int, Tuple[str, str]]]:
+    since = timezone.localdate() - timedelta(days=FEED_PAST_DAYS)
+    rows = (
+        UserCase.objects
+        .filter(user_id=user_id, case__hearing_date__gte=since)
+        .order_by("case__hearing_date", "case_id")
+        .values_list("case_id", "client_name", "updated_at", "case__court__name", "case__gak_number",
+                     "case__gak_year", "case__subject", "case__hearing_date", "case__updated_at")
+    )
+    events: Dict[int, Tuple[str, str]] = {}
+    for case_id, client, uc_updated, court, num, year, subject, hearing, case_updated in rows.iterator():
+        stamp = max(uc_updated, case_updated)
+        stamp_key = stamp.isoformat()
+        cached = previous.get(case_id)
+        if cached and cached[0] == stamp_key:
+            events[case_id] = cached
+        else:
+            events[case_id] = (stamp_key, _vevent(case_id, client, court, num, year, subject, hearing, stamp))
+
+    body = (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//YourSolon//Δικάσιμοι//EL\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        "METHOD:PUBLISH\r\n"
+        "X-WR-CALNAME:YourSolon — Δικάσιμοι\r\n"
+        "X-PUBLISHED-TTL:PT1H\r\n"
+        + "".join(vevent for _, vevent in events.values())
+        + "END:VCALENDAR\r\n"
+    )
+    return body, events
+
+
+def user_feed(user_id: int) -> Tuple[str, Any]:
+    """
+    Returns (etag, body_factory). Call body_factory() only when the body is
+    actually needed (i.e. not for a 304).
+    """
+    key = f"civil_app:ics:{user_id}"
+    version = _feed_version(user_id)
+    etag = f'"{version}"'
+
+    def body() -> str:
+        cached = cache.get(key)
+        if cached and cached["version"] == version:
+            return cached["body"]
+        text, events = _build(user_id, (cached or {}).get("events", {}))
+        cache.set(key, {"version": version, "body": text, "events": events}, FEED_CACHE_SECONDS)
+        return text
+
+    return etag, body
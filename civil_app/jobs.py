@@ -1,15 +1,26 @@
 import logging
 import traceback
-from typing import Optional
+from collections import defaultdict, deque
+from typing import Dict, Iterable, List, Optional
 
 from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
 
-from .models import Court, Case, CaseSnapshot, CivilSearchJob
-from .solon_scraper_adf import scrape_solon_civil_adf
-from .normalizers import clean_solon_fields
+from . import grid_archive
+from .admission import claim_next, fanout_slots, try_claim
+from .dashboard import invalidate_counts
+from .fanout import find_courts
+from .models import Court, Case, CaseSnapshot, CivilSearchJob, UserCase
+from .solon_scraper_adf import SolonSession, scrape_solon_civil_adf, solon_session
+from .negative_cache import forget_misses, is_known_miss, remember_miss
+from .normalizers import clean_solon_fields, has_case_data, project_case_fields, state_fields
 
 logger = logging.getLogger(__name__)
 
+# Admin refreshes run back to back in one SOLON session, this many at a time
+REFRESH_BATCH_SIZE = 50
+
 
 def _get_court_obj(job) -> Optional[Court]:
     """
@@ -105,35 +116,107 @@ def _ensure_job_case(job) -> Case:
     return case
 
 
-def _has_meaningful_values(d: dict) -> bool:
+def _advance_case(case: Case, snap: CaseSnapshot, fields: dict) -> None:
     """
-    Treat non-empty strings/numbers as meaningful. Empty/None/whitespace is not.
+    Move case.latest_snapshot to the found snapshot `snap`, bumping change_count
+    when the SOLON state differs from the previous latest snapshot, and project
+    the typed columns from it. Empty (no_results) snapshots never become latest,
+    so the pointer and the columns always describe the same data. Call inside
+    the snapshot's transaction; the case row is locked so concurrent jobs count
+    every change.
     """
-    if not isinstance(d, dict) or not d:
-        return False
-    for v in d.values():
-        if isinstance(v, str) and v.strip():
-            return True
-        if isinstance(v, (int, float)) and v:
-            return True
-    return False
+    previous = (
+        Case.objects.select_for_update(of=("self",))
+        .filter(pk=case.pk)
+        .values_list("latest_snapshot__data_json", flat=True)
+        .get()
+    )
+    changed = previous is None or state_fields(previous) != state_fields(fields)
+    update = {"latest_snapshot": snap, "updated_at": timezone.now(), **project_case_fields(fields)}
+    if changed:
+        update["change_count"] = F("change_count") + 1
+    Case.objects.filter(pk=case.pk).update(**update)
+    # A decision may have appeared: followers' decided/pending counts are stale
+    invalidate_counts(UserCase.objects.filter(case_id=case.pk).values_list("user_id", flat=True))
+    if case.court_id:
+        forget_misses(case.court_id, [(case.gak_number, case.gak_year)])
 
 
-def _run_job(job_id: int) -> None:
-    job = CivilSearchJob.objects.select_for_update(of=("self",)).get(id=job_id)
+def _follow_case(job, case: Case, snap: CaseSnapshot) -> None:
+    """
+    A found case joins the requesting user's "My cases" (UserCase), labelled with
+    the job's client name; later lookups of the same case move last_snapshot on.
+    """
+    if not job.user_id:
+        return
+    UserCase.objects.update_or_create(
+        user_id=job.user_id,
+        case=case,
+        defaults={"client_name": job.client_name or "", "last_snapshot": snap},
+    )
 
-    # Mark running
-    job.status = "running"
-    job.error = ""
-    job.save(update_fields=["status", "error"])
 
+def _find_court(job: CivilSearchJob) -> Optional[dict]:
+    """
+    Cross-court search: look the ΓΑΚ up in all of the job's candidate courts.
+    One hit gives the job that court and its scrape result is returned. Several
+    hits are different cases (ΓΑΚ numbering is per court), so the job ends as
+    "ambiguous" with candidate_courts narrowed to them for the user to pick.
+    No hit ends it as no_results.
+    """
+    names = dict(Court.objects.filter(id__in=job.candidate_courts).values_list("id", "name"))
+    courts = [{"id": court_id, "name": names[court_id]} for court_id in job.candidate_courts if court_id in names]
+    hits = find_courts(str(job.gak_number).strip(), int(job.gak_year), courts, parallel=fanout_slots())
+    if len(hits) != 1:
+        logger.info("Job %s: ΓΑΚ %s/%s found in %s of %s court(s)",
+                    job.id, job.gak_number, job.gak_year, len(hits), len(courts))
+        job.status = "ambiguous" if hits else "no_results"
+        if hits:
+            job.candidate_courts = [court["id"] for court, _ in hits]
+        job.save(update_fields=["status", "candidate_courts", "updated_at"])
+        return None
+    court, raw = hits[0]
+    job.court_id = court["id"]
+    job.save(update_fields=["court", "updated_at"])
+    return raw
+
+
+def _run_job(job: CivilSearchJob, raw: Optional[dict] = None, session: Optional[SolonSession] = None) -> None:
+    """
+    Look up a job already claimed (marked running) by admission.py and store the result.
+    With `session` (batched refresh) the lookup re-searches in that open SOLON page.
+    """
+    job_id = job.id
     try:
+        if job.court_id is None and job.candidate_courts:
+            raw = _find_court(job)
+            if raw is None:
+                return
+
         court_label = _get_court_label(job)
         gak_num = str(getattr(job, "gak_number", "")).strip()
         gak_year = int(getattr(job, "gak_year", 0))
 
-        # Scrape
-        raw = scrape_solon_civil_adf(court_label, gak_num, gak_year)
+        # A key SOLON had nothing for a moment ago is answered without scraping
+        if raw is None and session is None and job.court_id and is_known_miss(job.court_id, gak_num, gak_year):
+            job.status = "no_results"
+            job.save(update_fields=["status", "updated_at"])
+            return
+
+        # Scrape, unless the caller already did (fanout.find_courts)
+        if raw is None and session is not None:
+            raw = session.lookup(gak_num, gak_year)
+        elif raw is None:
+            raw = scrape_solon_civil_adf(court_label, gak_num, gak_year)
+
+        # Archive the raw grid so extraction fixes can be replayed offline
+        grid_html = raw.pop("grid_html", "") if isinstance(raw, dict) else ""
+        grid_sha = ""
+        if grid_html:
+            try:
+                grid_sha = grid_archive.store(grid_html)
+            except Exception:
+                logger.exception("Could not archive grid HTML for job %s", job_id)
 
         # Normalize to displayable dict (Greek keys, etc.)
         fields = clean_solon_fields(dict(raw, Υπόθεση=(getattr(job,'client_name','') or getattr(job,'subject','') or ''), case_title=(getattr(job,'subject','') or getattr(job,'client_name','') or ''), client_name=getattr(job,'client_name',''), subject=getattr(job,'subject','')))
@@ -141,11 +224,17 @@ def _run_job(job_id: int) -> None:
         # Persist snapshot atomically, ensuring we have a Case
         with transaction.atomic():
             case = _ensure_job_case(job)
-            snap = CaseSnapshot.objects.create(case=case, data_json=fields)
+            snap = CaseSnapshot.objects.create(case=case, data_json=fields, grid_sha256=grid_sha)
             job.snapshot = snap
 
-            job.status = "done" if _has_meaningful_values(fields) else "no_results"
-            job.save(update_fields=["snapshot", "status"])
+            job.status = "done" if has_case_data(fields) else "no_results"
+            job.save(update_fields=["snapshot", "status", "updated_at"])
+            if job.status == "no_results" and job.court_id:
+                transaction.on_commit(lambda: remember_miss(job.court_id, gak_num, gak_year))
+
+            if job.status == "done":
+                _advance_case(case, snap, fields)
+                _follow_case(job, case, snap)
 
     except Exception as e:
         tb = traceback.format_exc()
@@ -153,7 +242,7 @@ def _run_job(job_id: int) -> None:
         job.status = "error"
         job.error = f"{e}\n{tb}"
         try:
-            job.save(update_fields=["status", "error"])
+            job.save(update_fields=["status", "error", "updated_at"])
         except Exception:
             job.save()
 
@@ -165,8 +254,63 @@ def start_civil_job(job_id: int) -> None:
     run_civil_job(job_id)
 
 
-def run_civil_job(job_id: int) -> None:
+def run_civil_job(job_id: int) -> bool:
     """
-    Entry point invoked by views.
+    Entry point invoked by views: run a queued job now if admission control has a
+    slot for it (admission.py), otherwise leave it queued for `manage.py run_jobs`.
+    Returns whether the job ran.
     """
-    _run_job(job_id)
+    job = try_claim(job_id)
+    if job is None:
+        return False
+    _run_job(job)
+    return True
+
+
+def run_next_job() -> bool:
+    """
+    Run the oldest queued job admission control lets through; False when there is none.
+    An admin refresh (no user) is followed by the next REFRESH_BATCH_SIZE queued
+    refreshes of its court, all in one SOLON session.
+    """
+    job = claim_next()
+    if job is None:
+        return False
+    _run_job(job)
+    if job.user_id is None and job.court_id is not None:
+        run_job_batch(
+            CivilSearchJob.objects.filter(status="queued", user__isnull=True, court_id=job.court_id)
+            .order_by("created_at", "id").values_list("id", flat=True)[:REFRESH_BATCH_SIZE]
+        )
+    return True
+
+
+def run_job_batch(job_ids: Iterable[int]) -> None:
+    """
+    Run queued jobs grouped by court, each court's jobs as re-searches in one
+    SOLON session (reopened after a failed lookup). Jobs another runner claimed
+    in the meantime are left to it, and so are cross-court searches (no court
+    yet). Used by run_next_job for admin refreshes.
+    """
+    by_court: Dict[int, List[int]] = defaultdict(list)
+    for job_id, court_id in (CivilSearchJob.objects.filter(id__in=list(job_ids), status="queued", court__isnull=False)
+                             .order_by("court_id", "id").values_list("id", "court_id")):
+        by_court[court_id].append(job_id)
+
+    for court_id, ids in by_court.items():
+        label = Court.objects.filter(id=court_id).values_list("name", flat=True).first() or ""
+        pending = deque(ids)
+        while pending:
+            try:
+                with solon_session(label) as session:
+                    while pending:
+                        # One browser for the whole batch: it takes no admission slot per job
+                        job = try_claim(pending.popleft(), enforce_caps=False)
+                        if job is None:
+                            continue
+                        _run_job(job, session=session)
+                        if job.status == "error":
+                            break
+            except Exception:
+                logger.exception("SOLON session for %s failed; %s job(s) of the batch left queued", label, len(pending))
+                break
@@ -0,0 +1,149 @@
+"""
+The shared headless Chromium for this host (see civil_app/browser.py).
+
+Runs Playwright's Chromium with remote debugging on --host/--port and starts it
+again whenever it exits, with a fresh profile each time. Point the workers at it
+with SOLON_BROWSER_CDP_URL=http://<host>:<port>. Run it under the process
+supervisor of your choice (systemd, supervisord) like the Celery workers.
+
+While it runs, the browser's process tree is sampled every --sample-seconds and
+recycled (drained, then restarted) past the limits in browser_memory.py.
+"""
+
+import logging
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from playwright.sync_api import sync_playwright
+
+from civil_app.browser_memory import (
+    drain_seconds, lookups_served, max_rss_bytes, open_pages, process_tree, recycle_after_lookups,
+    require_shared_cache, rss_of, set_draining,
+)
+
+logger = logging.getLogger("civil_app.browser_memory")
+
+# A browser that dies this soon after starting is crashing, not being recycled
+CRASH_WINDOW_SECONDS = 30
+MAX_BACKOFF_SECONDS = 60
+# Waiting for a freshly started browser to answer on its endpoint
+STARTUP_SECONDS = 30
+
+
+class Command(BaseCommand):
+    help = "Run the shared Chromium that lookups attach to when SOLON_BROWSER_CDP_URL is set; restarts it on exit."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1",
+                            help="Address to listen on. The endpoint is unauthenticated: keep it private.")
+        parser.add_argument("--port", type=int, default=9222)
+        parser.add_argument("--no-sandbox", action="store_true", help="Needed when running as root in a container.")
+        parser.add_argument("--sample-seconds", type=float, default=10.0, help="Memory sampling interval.")
+
+    def handle(self, *args, **opts):
+        require_shared_cache()
+        with sync_playwright() as p:
+            executable = p.chromium.executable_path
+
+        # Workers find the drain flag / lookup counter under their SOLON_BROWSER_CDP_URL
+        endpoint = settings.SOLON_BROWSER_CDP_URL or f"http://{opts['host']}:{opts['port']}"
+
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        backoff = 1
+        while not self.stopping:
+            profile = tempfile.mkdtemp(prefix="solon-chromium-")
+            cmd = [
+                executable,
+                "--headless=new",
+                f"--remote-debugging-address={opts['host']}",
+                f"--remote-debugging-port={opts['port']}",
+                f"--user-data-dir={profile}",
+                "--no-first-run",
+                "--no-default-browser-check",
+                "--disable-dev-shm-usage",
+                "--disable-background-networking",
+            ]
+            if opts["no_sandbox"]:
+                cmd.append("--no-sandbox")
+            cmd.append("about:blank")
+
+            started = time.monotonic()
+            self.proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            self.stdout.write(f"Chromium pid {self.proc.pid} on http://{opts['host']}:{opts['port']}")
+            self._ready(endpoint)
+            code, recycled = self._govern(endpoint, opts["sample_seconds"])
+            shutil.rmtree(profile, ignore_errors=True)
+            if self.stopping:
+                break
+            if recycled:
+                backoff = 1
+                continue
+
+            if time.monotonic() - started < CRASH_WINDOW_SECONDS:
+                backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+            else:
+                backoff = 1
+            self.stderr.write(f"Chromium exited with {code}; restarting in {backoff}s")
+            time.sleep(backoff)
+
+        self.stdout.write("Browser server stopped.")
+
+    def _ready(self, endpoint):
+        """
+        Wait for the new browser to answer, then let held-back workers through.
+        """
+        deadline = time.monotonic() + STARTUP_SECONDS
+        while open_pages(endpoint) is None and self.proc.poll() is None and time.monotonic() < deadline:
+            time.sleep(0.5)
+        set_draining(endpoint, False)
+
+    def _govern(self, endpoint, sample_seconds):
+        """
+        Sample until the browser exits (-> (code, False)) or needs recycling (-> (code, True)).
+        """
+        while True:
+            try:
+                return self.proc.wait(timeout=sample_seconds), False
+            except subprocess.TimeoutExpired:
+                pass
+            if self.stopping:
+                continue
+            rss = rss_of(process_tree(self.proc.pid))
+            lookups = lookups_served(endpoint)
+            logger.debug("Browser pid %s: RSS %s bytes after %s lookups", self.proc.pid, rss, lookups)
+            if rss is not None and rss > max_rss_bytes():
+                reason = f"RSS {rss / 2**20:.0f} MB over {max_rss_bytes() / 2**20:.0f} MB"
+            elif lookups >= recycle_after_lookups() > 0:
+                reason = f"{lookups} lookups served"
+            else:
+                continue
+            return self._recycle(endpoint, reason), True
+
+    def _recycle(self, endpoint, reason):
+        set_draining(endpoint, True)
+        deadline = time.monotonic() + drain_seconds()
+        pending = open_pages(endpoint)
+        while pending and time.monotonic() < deadline:
+            time.sleep(1)
+            pending = open_pages(endpoint)
+        logger.info("Recycling browser pid %s (%s); %s page(s) still open", self.proc.pid, reason, pending or 0)
+        self.proc.terminate()
+        try:
+            return self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+            return self.proc.wait()
+
+    def _stop(self, signum, frame):
+        self.stopping = True
+        proc = getattr(self, "proc", None)
+        if proc is not None and proc.poll() is None:
+            proc.terminate()
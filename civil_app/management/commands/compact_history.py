@@ -0,0 +1,240 @@
+"""
+Retention for CaseSnapshot / CivilSearchJob history.
+
+  1) jobs older than --archive-after-months in a terminal state are written to a
+     gzip JSONL archive (Django's "jsonl" serializer) and deleted
+  2) per case, in batches:
+     - snapshots identical to the previous one (not a change point) and older than
+       --thin-after-days are deleted
+     - remaining snapshots older than the archive cutoff are archived and deleted
+     the latest snapshot of a case (Case.latest_snapshot) and any snapshot still
+     referenced by a job or UserCase are always kept
+  3) SQLite: PRAGMA incremental_vacuum to hand freed pages back to the OS
+
+Restore with --restore FILE (snapshot archives before job archives).
+"""
+
+import gzip
+import io
+import os
+from datetime import timedelta
+from pathlib import Path
+from typing import List, Set
+
+from django.conf import settings
+from django.core import serializers
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from civil_app.models import Case, CaseSnapshot, CivilSearchJob, UserCase
+from civil_app.normalizers import state_fields
+
+
+class _Archive:
+    """
+    Lazily created gzip JSONL file; nothing is created when nothing is archived.
+    Every write() appends one complete gzip member and fsyncs it, so a batch is
+    on disk before its rows are deleted; a run killed mid-write leaves at most
+    a truncated last member whose rows were never deleted.
+    """
+    def __init__(self, directory: Path, prefix: str, stamp: str):
+        self.path = directory / f"{prefix}-{stamp}.jsonl.gz"
+        self.count = 0
+
+    def write(self, objects: List) -> None:
+        if not objects:
+            return
+        created = not self.path.exists()
+        if created:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as raw:
+            size = raw.tell()
+            try:
+                with gzip.GzipFile(fileobj=raw, mode="wb") as gz, \
+                        io.TextIOWrapper(gz, encoding="utf-8") as text:
+                    serializers.serialize("jsonl", objects, stream=text)
+                raw.flush()
+                os.fsync(raw.fileno())
+            except BaseException:
+                # Leave only complete members behind
+                raw.truncate(size)
+                raise
+        if created:
+            _fsync_dir(self.path.parent)
+        self.count += len(objects)
+
+
+def _fsync_dir(directory: Path) -> None:
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Command(BaseCommand):
+    help = "Thin redundant snapshots, archive old jobs/snapshots to gzip JSONL and vacuum (bounded memory)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--thin-after-days", type=int, default=30,
+                            help="Drop unchanged (non change-point) snapshots older than this.")
+        parser.add_argument("--archive-after-months", type=int, default=12,
+                            help="Archive jobs and snapshots older than this (30-day months).")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--no-vacuum", action="store_true")
+        parser.add_argument("--restore", metavar="FILE", help="Load an archive file back into the database.")
+
+    def handle(self, *args, **opts):
+        if opts["restore"]:
+            return self._restore(Path(opts["restore"]), opts["batch_size"])
+
+        now = timezone.now()
+        thin_before = now - timedelta(days=opts["thin_after_days"])
+        archive_before = now - timedelta(days=30 * opts["archive_after_months"])
+        batch_size = opts["batch_size"]
+        dry_run = opts["dry_run"]
+
+        directory = Path(getattr(settings, "HISTORY_ARCHIVE_DIR", Path(settings.BASE_DIR) / "history_archive"))
+        stamp = now.strftime("%Y%m%d-%H%M%S")
+        jobs_archive = _Archive(directory, "jobs", stamp)
+        snaps_archive = _Archive(directory, "snapshots", stamp)
+
+        archived_jobs = self._archive_jobs(archive_before, batch_size, dry_run, jobs_archive)
+        thinned, archived_snaps = self._compact_snapshots(
+            thin_before, archive_before, batch_size, dry_run, snaps_archive
+        )
+
+        verb = "would be" if dry_run else "were"
+        self.stdout.write(self.style.SUCCESS(
+            f"{archived_jobs} jobs and {archived_snaps} snapshots {verb} archived, {thinned} redundant snapshots {verb} removed."
+        ))
+        for archive in (jobs_archive, snaps_archive):
+            if archive.count and not dry_run:
+                self.stdout.write(f"  {archive.path}")
+
+        if not dry_run and not opts["no_vacuum"]:
+            self._vacuum()
+
+    def _archive_jobs(self, before, batch_size, dry_run, archive: _Archive) -> int:
+        qs = CivilSearchJob.objects.filter(created_at__lt=before, status__in=CivilSearchJob.TERMINAL_STATUSES)
+        total = 0
+        last_id = 0
+        while True:
+            batch = list(qs.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                return total
+            last_id = batch[-1].id
+            total += len(batch)
+            if dry_run:
+                continue
+            archive.write(batch)
+            with transaction.atomic():
+                CivilSearchJob.objects.filter(id__in=[j.id for j in batch]).delete()
+
+    def _compact_snapshots(self, thin_before, archive_before, batch_size, dry_run, archive: _Archive):
+        thinned = archived = 0
+        last_case = 0
+        while True:
+            case_ids = list(
+                Case.objects.filter(id__gt=last_case).order_by("id").values_list("id", flat=True)[:batch_size]
+            )
+            if not case_ids:
+                return thinned, archived
+            last_case = case_ids[-1]
+
+            # Jobs due for archiving do not protect their snapshot (keeps --dry-run numbers exact)
+            protected: Set[int] = set(
+                CivilSearchJob.objects.filter(snapshot__case_id__in=case_ids)
+                .exclude(created_at__lt=archive_before, status__in=CivilSearchJob.TERMINAL_STATUSES)
+                .values_list("snapshot_id", flat=True)
+            ) | set(
+                UserCase.objects.filter(last_snapshot__case_id__in=case_ids).values_list("last_snapshot_id", flat=True)
+            ) | set(
+                Case.objects.filter(id__in=case_ids).values_list("latest_snapshot_id", flat=True)
+            )
+
+            drop: List[int] = []
+            move: List[int] = []
+            rows = (
+                CaseSnapshot.objects.filter(case_id__in=case_ids, scraped_at__lt=thin_before)
+                .order_by("case_id", "scraped_at", "id")
+                .values_list("id", "case_id", "scraped_at", "data_json")
+            )
+            prev_case, prev_print = None, None
+            for sid, cid, scraped_at, data in rows.iterator(chunk_size=batch_size):
+                fingerprint = state_fields(data)
+                is_change_point = cid != prev_case or fingerprint != prev_print
+                prev_case, prev_print = cid, fingerprint
+                if sid in protected:
+                    continue
+                if not is_change_point:
+                    drop.append(sid)
+                elif scraped_at < archive_before:
+                    move.append(sid)
+
+            thinned += len(drop)
+            archived += len(move)
+            if dry_run:
+                continue
+            with transaction.atomic():
+                if move:
+                    archive.write(list(CaseSnapshot.objects.filter(id__in=move).order_by("id")))
+                CaseSnapshot.objects.filter(id__in=drop + move).delete()
+
+    def _vacuum(self):
+        if connection.vendor != "sqlite":
+            return
+        with connection.cursor() as cur:
+            cur.execute("PRAGMA auto_vacuum")
+            mode = cur.fetchone()[0]
+            if mode == 2:
+                cur.execute("PRAGMA incremental_vacuum")
+                self.stdout.write("Ran PRAGMA incremental_vacuum.")
+            else:
+                # Switching modes needs one full VACUUM; afterwards every run is incremental
+                self.stdout.write("Enabling auto_vacuum=INCREMENTAL (one-off full VACUUM)…")
+                cur.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                cur.execute("VACUUM")
+
+    def _restore(self, path: Path, batch_size: int):
+        if not path.exists():
+            raise CommandError(f"No such archive: {path}")
+        restored = 0
+        truncated = False
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            objects = serializers.deserialize("jsonl", fh, ignorenonexistent=True)
+            while True:
+                batch = []
+                try:
+                    for obj in objects:
+                        batch.append(obj)
+                        if len(batch) >= batch_size:
+                            break
+                except (EOFError, gzip.BadGzipFile):
+                    # A run killed while writing: the incomplete batch was never deleted
+                    truncated = True
+                if batch:
+                    with transaction.atomic():
+                        for obj in batch:
+                            self._fix_dangling(obj.object)
+                            obj.save()
+                    restored += len(batch)
+                if truncated or not batch:
+                    break
+        if truncated:
+            self.stderr.write(f"{path} ends in an incomplete batch; its rows were never deleted.")
+        self.stdout.write(self.style.SUCCESS(f"Restored {restored} rows from {path}."))
+
+    @staticmethod
+    def _fix_dangling(instance):
+        # A job may point at a snapshot that was archived separately and not restored
+        if isinstance(instance, CivilSearchJob) and instance.snapshot_id:
+            if not CaseSnapshot.objects.filter(id=instance.snapshot_id).exists():
+                instance.snapshot_id = None
@@ -0,0 +1,138 @@
+from pathlib import Path
+
+from django.apps import apps
+from django.contrib.auth.models import Permission
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction
+from django.db.migrations.executor import MigrationExecutor
+
+from civil_app.models import Case
+
+SOURCE_ALIAS = "sqlite_source"
+
+# Every model of these apps is copied, M2M tables (user groups/permissions) included
+COPY_APPS = ("auth", "civil_app")
+
+# `migrate` creates these on the target itself, under ids of its own; rows that
+# point at them are matched by natural key instead
+RECREATED_MODELS = (Permission,)
+
+# Case <-> CaseSnapshot is a cycle: Case rows go in without the pointer, which is
+# filled in once the snapshots exist.
+DEFERRED_FKS = {Case: "latest_snapshot"}
+
+
+def models_to_copy():
+    """
+    The COPY_APPS models, parents before children so every FK target already exists.
+    """
+    pending = [m for m in apps.get_models(include_auto_created=True)
+               if m._meta.app_label in COPY_APPS and m not in RECREATED_MODELS]
+    ordered = []
+    while pending:
+        ready = [
+            model for model in pending
+            if all(field.related_model in ordered or field.related_model in RECREATED_MODELS
+                   or field.related_model is model or field.name == DEFERRED_FKS.get(model)
+                   for field in model._meta.concrete_fields if field.is_relation)
+        ]
+        if not ready:
+            raise CommandError(f"FK cycle between {', '.join(m._meta.label for m in pending)}; "
+                               f"add one of its fields to DEFERRED_FKS.")
+        ordered.extend(ready)
+        pending = [model for model in pending if model not in ready]
+    return ordered
+
+
+class Command(BaseCommand):
+    help = ("Stream all users, groups, courts, cases, snapshots, jobs, sweeps and followed cases "
+            "from a SQLite file into the configured default database (e.g. PostgreSQL) in batches. "
+            "Run `migrate` on the target first; re-running skips rows that already exist.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--source", required=True, help="Path to the SQLite database file.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **opts):
+        source = Path(opts["source"])
+        if not source.exists():
+            raise CommandError(f"No such SQLite file: {source}")
+
+        connections.settings[SOURCE_ALIAS] = connections.configure_settings({
+            "default": connections.settings["default"],
+            SOURCE_ALIAS: {"ENGINE": "django.db.backends.sqlite3", "NAME": str(source)},
+        })[SOURCE_ALIAS]
+        target = connections["default"]
+        if target.vendor == "sqlite" and Path(target.settings_dict["NAME"]).resolve() == source.resolve():
+            raise CommandError("Source and target are the same database.")
+
+        for alias in (SOURCE_ALIAS, "default"):
+            executor = MigrationExecutor(connections[alias])
+            if executor.migration_plan(executor.loader.graph.leaf_nodes()):
+                raise CommandError(f"Database '{alias}' has unapplied migrations; "
+                                   f"run `migrate` on it first so both schemas match.")
+
+        models = models_to_copy()
+        remap = {model: self._natural_ids(model) for model in RECREATED_MODELS}
+        for model in models:
+            copied = self._copy(model, opts["batch_size"], remap)
+            self.stdout.write(f"  {model._meta.label}: {copied}")
+        for model, field in DEFERRED_FKS.items():
+            self._link(model, field, opts["batch_size"])
+
+        # Explicit pks were inserted, so move the sequences past them
+        with target.cursor() as cur:
+            for sql in target.ops.sequence_reset_sql(no_style(), models):
+                cur.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS("Done. Run `manage.py rebuild_search_index` on the target."))
+
+    def _natural_ids(self, model):
+        """
+        {source id: target id} for rows present in both databases, matched on natural_key().
+        """
+        target = {obj.natural_key(): obj.pk for obj in model._default_manager.using("default").all()}
+        return {
+            obj.pk: target[obj.natural_key()]
+            for obj in model._default_manager.using(SOURCE_ALIAS).all() if obj.natural_key() in target
+        }
+
+    def _copy(self, model, batch_size, remap):
+        copied = 0
+        last_pk = 0
+        qs = model._default_manager.using(SOURCE_ALIAS).order_by("pk")
+        remapped = [(f.attname, remap[f.related_model]) for f in model._meta.concrete_fields
+                    if f.is_relation and f.related_model in remap]
+        while True:
+            # Keyset batches keep memory flat on both sides
+            batch = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                return copied
+            last_pk = batch[-1].pk
+            if model in DEFERRED_FKS:
+                for obj in batch:
+                    setattr(obj, DEFERRED_FKS[model], None)
+            for attname, ids in remapped:
+                # A permission the target does not have (app removed) is dropped with its rows
+                batch = [obj for obj in batch if getattr(obj, attname) in ids]
+                for obj in batch:
+                    setattr(obj, attname, ids[getattr(obj, attname)])
+            with transaction.atomic(using="default"):
+                model._default_manager.using("default").bulk_create(batch, ignore_conflicts=True)
+            copied += len(batch)
+
+    def _link(self, model, field, batch_size):
+        attname = model._meta.get_field(field).attname
+        last_pk = 0
+        qs = (model._default_manager.using(SOURCE_ALIAS)
+              .filter(**{f"{attname}__isnull": False}).order_by("pk").values_list("pk", attname))
+        while True:
+            rows = list(qs.filter(pk__gt=last_pk)[:batch_size])
+            if not rows:
+                return
+            last_pk = rows[-1][0]
+            with transaction.atomic(using="default"):
+                model._default_manager.using("default").bulk_update(
+                    [model(pk=pk, **{attname: value}) for pk, value in rows], [field]
+                )
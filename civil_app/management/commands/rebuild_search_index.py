@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from civil_app import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index (cases + snapshot text, jobs, followed cases) in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **opts):
+        if not search.is_available():
+            self.stderr.write(self.style.ERROR("Search index table is missing (run migrate; SQLite needs FTS5)."))
+            return
+        counts = search.rebuild(batch_size=opts["batch_size"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {counts['case']} cases, {counts['job']} jobs, {counts['usercase']} followed cases."
+        ))
@@ -0,0 +1,123 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F
+
+from civil_app import grid_archive, search
+from civil_app.models import Case, CaseSnapshot
+from civil_app.normalizers import clean_solon_fields, has_case_data, project_case_fields, snapshot_fields
+
+
+def _renormalized(data):
+    """
+    New data_json for a stored snapshot, or None if nothing changes.
+    Snapshots that kept the raw scrape ({"raw": ..., "normalized": ...}) are
+    rebuilt from the raw payload; flat ones are run through the pipeline again,
+    keeping any keys of older snapshot shapes that the pipeline does not know.
+    """
+    if not isinstance(data, dict):
+        return None
+    if isinstance(data.get("normalized"), dict):
+        source = data.get("raw") if isinstance(data.get("raw"), dict) else data["normalized"]
+        fields = clean_solon_fields(source)
+        if "Υπόθεση" in data["normalized"] and not fields["Υπόθεση"]:
+            fields["Υπόθεση"] = data["normalized"]["Υπόθεση"]
+        return None if fields == data["normalized"] else dict(data, normalized=fields)
+    fields = clean_solon_fields(data)
+    fields.update((k, v) for k, v in data.items() if k not in fields)
+    return None if fields == data else fields
+
+
+def _reparsed(snap):
+    """
+    Like _renormalized, but the scraped fields come from re-parsing the archived
+    grid HTML offline (grid_archive.extract_row_fields) instead of the stored values.
+    """
+    html = grid_archive.load(snap.grid_sha256)
+    if html is None:
+        return None
+    current = snapshot_fields(snap.data_json)
+    scraped = grid_archive.extract_row_fields(html, snap.case.gak_number, snap.case.gak_year)
+    fields = clean_solon_fields({"fields": scraped, "Υπόθεση": current.get("Υπόθεση", "")})
+    if isinstance(snap.data_json.get("normalized"), dict):
+        return None if fields == current else dict(snap.data_json, normalized=fields)
+    merged = dict(fields)
+    merged.update((k, v) for k, v in snap.data_json.items() if k not in merged)
+    return None if merged == snap.data_json else merged
+
+
+class Command(BaseCommand):
+    help = ("Re-run every CaseSnapshot through normalizers.clean_solon_fields in streamed "
+            "batches (bulk_update), then re-project and re-index the affected cases.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+        parser.add_argument("--dry-run", action="store_true", help="Count changes without writing.")
+        parser.add_argument("--from-archive", action="store_true",
+                            help="Re-extract fields from the archived grid HTML (no network) "
+                                 "instead of re-normalizing the stored values.")
+
+    def handle(self, *args, **opts):
+        batch_size = opts["batch_size"]
+        dry_run = opts["dry_run"]
+        from_archive = opts["from_archive"]
+
+        snapshots = CaseSnapshot.objects.only("id", "case_id", "data_json")
+        if from_archive:
+            snapshots = (
+                CaseSnapshot.objects.exclude(grid_sha256="").select_related("case")
+                .only("id", "case_id", "data_json", "grid_sha256", "case__gak_number", "case__gak_year")
+            )
+
+        scanned = changed = 0
+        touched_cases = set()
+        last_id = 0
+        while True:
+            # Keyset pagination on pk: constant cost per batch however far we are
+            batch = list(snapshots.filter(id__gt=last_id).order_by("id")[:batch_size])
+            if not batch:
+                break
+            last_id = batch[-1].id
+            scanned += len(batch)
+
+            dirty = []
+            for snap in batch:
+                new = _reparsed(snap) if from_archive else _renormalized(snap.data_json)
+                if new is not None:
+                    snap.data_json = new
+                    dirty.append(snap)
+                    touched_cases.add(snap.case_id)
+            changed += len(dirty)
+            if dirty and not dry_run:
+                with transaction.atomic():
+                    CaseSnapshot.objects.bulk_update(dirty, ["data_json"], batch_size=500)
+            self.stdout.write(f"  {scanned} scanned, {changed} changed")
+
+        if not dry_run and touched_cases:
+            self._reproject(sorted(touched_cases), batch_size)
+
+        verb = "would change" if dry_run else "changed"
+        self.stdout.write(self.style.SUCCESS(
+            f"{scanned} snapshots scanned, {changed} {verb}, {len(touched_cases)} cases affected."
+        ))
+
+    def _reproject(self, case_ids, batch_size):
+        """
+        Refresh the typed Case columns and the search document from each affected
+        case's latest snapshot; a pointer left on an empty snapshot projects nothing.
+        """
+        columns = ["filing_date", "hearing_date", "pinakio_number", "decision_number", "decision_year",
+                   "procedure", "subject", "pleading_type", "eak_number", "eak_year"]
+        for start in range(0, len(case_ids), batch_size):
+            cases = list(
+                Case.objects.filter(id__in=case_ids[start:start + batch_size])
+                .annotate(latest_data=F("latest_snapshot__data_json"))
+            )
+            with transaction.atomic():
+                for case in cases:
+                    fields = snapshot_fields(case.latest_data)
+                    if not has_case_data(fields):
+                        continue
+                    for column, value in project_case_fields(fields).items():
+                        setattr(case, column, value)
+                    search.index_case(case, fields)
+                Case.objects.bulk_update(cases, columns, batch_size=500)
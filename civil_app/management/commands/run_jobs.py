@@ -0,0 +1,62 @@
+"""
+Run queued lookup jobs as admission control (civil_app/admission.py) lets them through.
+
+The form runs a job straight away when a slot is free and nothing older is
+waiting; jobs it had to queue are started here, oldest first, as slots free up. Run one per
+host under the process supervisor, like `manage.py browser_server`.
+"""
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from civil_app.admission import max_running
+from civil_app.browser import release_thread_browser
+from civil_app.jobs import run_next_job
+
+
+class Command(BaseCommand):
+    help = "Start queued lookup jobs whenever admission control has a free slot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=0,
+                            help="Worker threads (default: JOBS_MAX_RUNNING).")
+        parser.add_argument("--poll-seconds", type=float, default=1.0,
+                            help="Wait between checks while nothing can be started.")
+
+    def handle(self, *args, **opts):
+        self.stopping = threading.Event()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        threads = [
+            threading.Thread(target=self._work, args=(opts["poll_seconds"],), name=f"jobs-{n}", daemon=True)
+            for n in range(opts["threads"] or max_running())
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f"Running queued jobs with {len(threads)} thread(s).")
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(1)
+        self.stdout.write("Job runner stopped.")
+
+    def _work(self, poll_seconds):
+        try:
+            while not self.stopping.is_set():
+                close_old_connections()
+                try:
+                    ran = run_next_job()
+                except Exception:
+                    # run_next_job records lookup failures on the job; this is the claim itself (DB busy)
+                    self.stderr.write("Claiming the next job failed; retrying.")
+                    ran = False
+                if not ran:
+                    self.stopping.wait(poll_seconds)
+        finally:
+            release_thread_browser()
+
+    def _stop(self, signum, frame):
+        self.stopping.set()
@@ -0,0 +1,63 @@
+"""
+Look up every ΓΑΚ number in a range at one court and year (civil_app/sweeps.py).
+
+    manage.py sweep_gak_range --court 12 --year 2024 --start 1 --end 5000
+    manage.py sweep_gak_range --resume 7
+
+Progress is checkpointed every --batch-size numbers; an interrupted sweep picks
+up where it stopped with --resume.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from civil_app.models import CaseSweep, Court
+from civil_app.sweeps import SWEEP_BATCH_SIZE, run_sweep
+
+
+class Command(BaseCommand):
+    help = "Sweep a ΓΑΚ number range at one court/year, storing every case found."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--court", type=int, help="Court id.")
+        parser.add_argument("--year", type=int, help="ΓΑΚ year.")
+        parser.add_argument("--start", type=int, help="First ΓΑΚ number.")
+        parser.add_argument("--end", type=int, help="Last ΓΑΚ number (inclusive).")
+        parser.add_argument("--resume", type=int, metavar="SWEEP_ID", help="Continue an interrupted sweep.")
+        parser.add_argument("--batch-size", type=int, default=SWEEP_BATCH_SIZE,
+                            help="Numbers looked up between checkpoints.")
+
+    def handle(self, *args, **opts):
+        if opts["resume"]:
+            try:
+                sweep = CaseSweep.objects.get(id=opts["resume"])
+            except CaseSweep.DoesNotExist:
+                raise CommandError(f"No sweep {opts['resume']}.")
+            if sweep.status == "done":
+                raise CommandError(f"Sweep {sweep.id} is already done.")
+        else:
+            missing = [name for name in ("court", "year", "start", "end") if opts[name] is None]
+            if missing:
+                raise CommandError("Give --resume, or all of: " + ", ".join(f"--{name}" for name in missing))
+            if not 0 < opts["start"] <= opts["end"]:
+                raise CommandError("--start must be positive and not above --end.")
+            try:
+                court = Court.objects.get(id=opts["court"])
+            except Court.DoesNotExist:
+                raise CommandError(f"No court {opts['court']}.")
+            sweep = CaseSweep.objects.create(
+                court=court, gak_year=opts["year"],
+                start_number=opts["start"], end_number=opts["end"], next_number=opts["start"],
+            )
+
+        self.stdout.write(f"Sweep {sweep.id}: {sweep} from {sweep.next_number}")
+
+        def progress(number, outcome):
+            self.stdout.write(f"  {number}/{sweep.gak_year}: {outcome}")
+
+        sweep = run_sweep(sweep.id, batch_size=max(1, opts["batch_size"]), progress=progress)
+        summary = (f"Sweep {sweep.id} {sweep.status}: {sweep.found} found, {sweep.empty} empty, "
+                   f"{sweep.skipped} skipped, {sweep.failed_lookups} failed.")
+        if sweep.status == "done":
+            self.stdout.write(self.style.SUCCESS(summary))
+        else:
+            raise CommandError(f"{summary} {sweep.error} Resume with --resume {sweep.id}.")
@@ -1,33 +1,14 @@
-from django.core.management.base import BaseCommand
-from django.utils.text import slugify
-from playwright.sync_api import sync_playwright
-from civil_app.models import Court
-
-SOLON_TRACK_URL = "https://extapps.solon.gov.gr/mojwp/faces/TrackLdoPublic"
+from django.core.management.base import BaseCommand, CommandError
+from civil_app.court_sync import sync_courts
 
 class Command(BaseCommand):
-    help = "Populate/refresh the Court list from SOLON 'Κατάστημα' dropdown."
+    help = "Populate/refresh the Court list from SOLON 'Κατάστημα' dropdown (adds, updates and deactivates)."
 
     def handle(self, *args, **opts):
-        names = []
-        with sync_playwright() as p:
-            browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-            page = browser.new_page(locale="el-GR")
-            page.goto(SOLON_TRACK_URL, wait_until="domcontentloaded", timeout=45000)
-            sel = page.get_by_label("Κατάστημα", exact=False) or page.locator("select").first
-            opts = sel.locator("option")
-            for i in range(opts.count()):
-                t = opts.nth(i).inner_text().strip()
-                if not t or t.lower() in ("--", "επιλέξτε", "επιλογή"):
-                    continue
-                names.append(t)
-            browser.close()
-
-        added = 0
-        for n in names:
-            Court.objects.update_or_create(
-                name=n,
-                defaults={"slug": slugify(n, allow_unicode=True), "is_active": True},
-            )
-            added += 1
-        self.stdout.write(self.style.SUCCESS(f"Synced {added} courts."))
+        try:
+            counts = sync_courts()
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        self.stdout.write(self.style.SUCCESS(
+            "Synced courts: {added} added, {changed} changed, {removed} deactivated, {unchanged} unchanged.".format(**counts)
+        ))
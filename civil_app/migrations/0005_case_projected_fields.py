@@ -0,0 +1,184 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:26
+
+import re
+from datetime import date
+
+from django.db import migrations, models
+
+
+# civil_app.normalizers as of this migration, frozen so that replaying it
+# later gives the same result whatever the live module has become.
+
+DISPLAY_ORDER = [
+    "Υπόθεση",
+    "Ημ. Κατάθεσης",
+    "Γενικός Αριθμός Κατάθεσης/Έτος",
+    "Ειδικός Αριθμός Κατάθεσης/Έτος",
+    "Διαδικασία",
+    "Αντικείμενο",
+    "Είδος",
+    "Αριθμός Πινακίου",
+    "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού",
+    "Αποτέλεσμα Συζήτησης",
+    "Δικάσιμος",
+]
+
+_date_rx = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b")
+_num_year_rx = re.compile(r"(\d+)\s*/\s*(\d{4})")
+_leading_num_rx = re.compile(r"\d+")
+
+
+def _pick_case_title(payload):
+    if not isinstance(payload, dict):
+        return ""
+    for key in ("Υπόθεση", "case_title", "client_name", "subject", "name", "client"):
+        v = payload.get(key)
+        if v:
+            return str(v).strip()
+    return ""
+
+
+def _extract_dikasimos(pinakio_value):
+    m = _date_rx.search((pinakio_value or "").strip())
+    if not m:
+        return ""
+    d, mth, y = m.groups()
+    return f"{int(d):02d}/{int(mth):02d}/{y}"
+
+
+def _parse_date(value):
+    m = _date_rx.search(value or "")
+    if not m:
+        return None
+    d, mth, y = (int(g) for g in m.groups())
+    try:
+        return date(y, mth, d)
+    except ValueError:
+        return None
+
+
+def _split_num_year(value):
+    m = _num_year_rx.search(value or "")
+    if not m:
+        return "", None
+    return m.group(1), int(m.group(2))
+
+
+def _clean_solon_fields(payload):
+    raw_fields = {}
+    if isinstance(payload, dict):
+        f = payload.get("fields")
+        if isinstance(f, dict):
+            raw_fields = {k: (v or "").strip() for k, v in f.items()}
+        else:
+            raw_fields = {k: (v or "").strip() for k, v in payload.items() if isinstance(v, str)}
+    out = {}
+    for key in DISPLAY_ORDER:
+        if key == "Υπόθεση":
+            out[key] = _pick_case_title(payload)
+        elif key == "Δικάσιμος":
+            out[key] = _extract_dikasimos(raw_fields.get("Αριθμός Πινακίου", ""))
+        else:
+            out[key] = raw_fields.get(key, "")
+    return out
+
+
+def _project_case_fields(fields):
+    pinakio = fields.get("Αριθμός Πινακίου", "") or ""
+    hearing = fields.get("Δικάσιμος") or _extract_dikasimos(pinakio)
+    pinakio_num = _leading_num_rx.search(_date_rx.sub(" ", pinakio))
+    decision_number, decision_year = _split_num_year(fields.get("Αριθμός Απόφασης/Έτος - Είδος Διατακτικού", ""))
+    eak_number, eak_year = _split_num_year(fields.get("Ειδικός Αριθμός Κατάθεσης/Έτος", ""))
+    out = {
+        "filing_date": _parse_date(fields.get("Ημ. Κατάθεσης", "")),
+        "hearing_date": _parse_date(hearing),
+        "pinakio_number": pinakio_num.group(0) if pinakio_num else "",
+        "decision_number": decision_number,
+        "decision_year": decision_year,
+    }
+    for column, label, size in (("procedure", "Διαδικασία", 255),
+                                 ("subject", "Αντικείμενο", 255),
+                                 ("pleading_type", "Είδος", 255)):
+        value = (fields.get(label) or "").strip()
+        if value:
+            out[column] = value[:size]
+    if eak_number:
+        out["eak_number"] = eak_number[:20]
+        out["eak_year"] = eak_year
+    return out
+
+
+def _has_case_data(fields):
+    # SOLON returned something (Υπόθεση is our client label)
+    return any(isinstance(v, str) and v.strip() for k, v in fields.items() if k != 'Υπόθεση')
+
+
+def backfill_case_projection(apps, schema_editor):
+    """
+    Fill the new columns from each case's latest snapshot that found the case
+    (empty no_results snapshots would blank them).
+    """
+    Case = apps.get_model('civil_app', 'Case')
+    CaseSnapshot = apps.get_model('civil_app', 'CaseSnapshot')
+    for case in Case.objects.iterator(chunk_size=500):
+        for data in (CaseSnapshot.objects.filter(case_id=case.pk).order_by('-scraped_at', '-id')
+                     .values_list('data_json', flat=True).iterator()):
+            if not isinstance(data, dict):
+                continue
+            data = data.get('normalized', data)
+            fields = data if 'Δικάσιμος' in data else _clean_solon_fields(data)
+            if _has_case_data(fields):
+                Case.objects.filter(pk=case.pk).update(**_project_case_fields(fields))
+                break
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0004_usercase'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='decision_number',
+            field=models.CharField(blank=True, max_length=20),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='decision_year',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='filing_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='hearing_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='pinakio_number',
+            field=models.CharField(blank=True, max_length=32),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['hearing_date'], name='case_hearing_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['filing_date'], name='case_filing_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['decision_year', 'decision_number'], name='case_decision_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='case',
+            index=models.Index(fields=['procedure'], name='case_procedure_idx'),
+        ),
+        migrations.RunPython(backfill_case_projection, migrations.RunPython.noop),
+    ]
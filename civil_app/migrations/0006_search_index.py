@@ -0,0 +1,57 @@
+from django.db import migrations
+
+
+SQLITE_CREATE = """
+CREATE VIRTUAL TABLE IF NOT EXISTS civil_app_search_index USING fts5(
+    body,
+    user_id UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+)
+"""
+
+POSTGRES_CREATE = [
+    """
+    CREATE TABLE IF NOT EXISTS civil_app_search_index (
+        kind smallint NOT NULL,
+        obj_id bigint NOT NULL,
+        user_id bigint NULL,
+        body text NOT NULL,
+        tsv tsvector GENERATED ALWAYS AS (to_tsvector('simple', body)) STORED,
+        PRIMARY KEY (kind, obj_id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS civil_app_search_index_tsv ON civil_app_search_index USING GIN (tsv)",
+]
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Backend-specific full-text table (see civil_app/search.py). Other backends
+    get nothing and search falls back to the admin's default LIKE search.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_CREATE)
+        except Exception:
+            # SQLite built without FTS5
+            pass
+    elif vendor == 'postgresql':
+        for sql in POSTGRES_CREATE:
+            schema_editor.execute(sql)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS civil_app_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0005_case_projected_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='casesnapshot',
+            name='grid_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+    ]
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def create_gin_index(apps, schema_editor):
+    """
+    PostgreSQL only: JSONField is jsonb there, so a jsonb_path_ops GIN index
+    serves containment lookups such as data_json__contains={"Διαδικασία": ...}.
+    SQLite has no equivalent; its queries use the typed Case columns instead.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX CONCURRENTLY IF NOT EXISTS civil_app_casesnapshot_data_gin "
+        "ON civil_app_casesnapshot USING GIN (data_json jsonb_path_ops)"
+    )
+
+
+def drop_gin_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute("DROP INDEX CONCURRENTLY IF EXISTS civil_app_casesnapshot_data_gin")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('civil_app', '0007_casesnapshot_grid_sha256'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gin_index, drop_gin_index),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0008_snapshot_data_gin'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='casesnapshot',
+            index=models.Index(fields=['case', '-scraped_at', '-id'], name='snapshot_case_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='civilsearchjob',
+            index=models.Index(fields=['user', 'updated_at', 'id'], name='job_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='civilsearchjob',
+            index=models.Index(condition=models.Q(('status', 'queued')), fields=['created_at', 'id'], name='job_queued_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='civilsearchjob',
+            index=models.Index(condition=models.Q(('status', 'running')), fields=['user'], name='job_running_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usercase',
+            index=models.Index(fields=['user', '-updated_at'], name='usercase_user_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def _state_fields(data):
+    # civil_app.normalizers.state_fields as of this migration (frozen): the
+    # normalized field dict, plain or under 'normalized', without Υπόθεση
+    if not isinstance(data, dict):
+        return {}
+    normalized = data.get('normalized', data)
+    if not isinstance(normalized, dict):
+        return {}
+    return {k: v for k, v in normalized.items() if k != 'Υπόθεση'}
+
+
+def _has_case_data(state):
+    return any(isinstance(v, str) and v.strip() for v in state.values())
+
+
+def backfill_latest_snapshot(apps, schema_editor):
+    """
+    Point each case at its newest snapshot that found it (empty no_results
+    snapshots are skipped) and count the state changes among those.
+    """
+    Case = apps.get_model('civil_app', 'Case')
+    CaseSnapshot = apps.get_model('civil_app', 'CaseSnapshot')
+    last_id = 0
+    while True:
+        case_ids = list(Case.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:500])
+        if not case_ids:
+            return
+        last_id = case_ids[-1]
+        state = {}
+        rows = (
+            CaseSnapshot.objects.filter(case_id__in=case_ids)
+            .order_by('case_id', 'scraped_at', 'id')
+            .values_list('case_id', 'id', 'data_json')
+        )
+        for case_id, snap_id, data in rows.iterator(chunk_size=500):
+            current = _state_fields(data)
+            if not _has_case_data(current):
+                continue
+            _, changes, previous = state.get(case_id, (None, 0, None))
+            state[case_id] = (snap_id, changes + (current != previous), current)
+        Case.objects.bulk_update(
+            [Case(id=cid, latest_snapshot_id=sid, change_count=n) for cid, (sid, n, _) in state.items()],
+            ['latest_snapshot', 'change_count'],
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0009_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='case',
+            name='change_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='case',
+            name='latest_snapshot',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='civil_app.casesnapshot'),
+        ),
+        migrations.RunPython(backfill_latest_snapshot, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.15 on 2026-10-19 00:57
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0011_casesweep'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='civilsearchjob',
+            name='candidate_courts',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AlterField(
+            model_name='civilsearchjob',
+            name='court',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, to='civil_app.court'),
+        ),
+    ]
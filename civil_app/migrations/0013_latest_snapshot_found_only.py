@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+def _has_case_data(data):
+    # civil_app.normalizers.has_case_data as of this migration (frozen)
+    if not isinstance(data, dict):
+        return False
+    normalized = data.get('normalized', data)
+    if not isinstance(normalized, dict):
+        return False
+    return any(isinstance(v, str) and v.strip() for k, v in normalized.items() if k != 'Υπόθεση')
+
+
+def repoint_latest_snapshot(apps, schema_editor):
+    """
+    Cases whose latest_snapshot is an empty (no_results) snapshot go back to the
+    newest snapshot that found them, or to none; their typed columns were only
+    ever written from found snapshots, so they are left as they are.
+    """
+    Case = apps.get_model('civil_app', 'Case')
+    CaseSnapshot = apps.get_model('civil_app', 'CaseSnapshot')
+    stale = [
+        case_id for case_id, data in
+        Case.objects.filter(latest_snapshot__isnull=False).values_list('id', 'latest_snapshot__data_json').iterator()
+        if not _has_case_data(data)
+    ]
+    for case_id in stale:
+        found = next(
+            (snap_id for snap_id, data in
+             CaseSnapshot.objects.filter(case_id=case_id).order_by('-scraped_at', '-id')
+             .values_list('id', 'data_json').iterator() if _has_case_data(data)),
+            None,
+        )
+        Case.objects.filter(pk=case_id).update(latest_snapshot_id=found)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('civil_app', '0012_job_candidate_courts'),
+    ]
+
+    operations = [
+        migrations.RunPython(repoint_latest_snapshot, migrations.RunPython.noop),
+    ]
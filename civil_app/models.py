@@ -41,6 +41,22 @@ class Case(models.Model):
     eak_number = models.CharField(max_length=20, blank=True)
     eak_year = models.PositiveIntegerField(null=True, blank=True)
 
+    # Typed projection of the latest snapshot (normalizers.project_case_fields),
+    # written with each snapshot so date/decision queries hit an index instead of data_json
+    filing_date = models.DateField(null=True, blank=True)                # Ημ. Κατάθεσης
+    hearing_date = models.DateField(null=True, blank=True)               # Δικάσιμος
+    pinakio_number = models.CharField(max_length=32, blank=True)         # Αριθμός Πινακίου
+    decision_number = models.CharField(max_length=20, blank=True)        # Αριθμός Απόφασης
+    decision_year = models.PositiveIntegerField(null=True, blank=True)   # Έτος Απόφασης
+
+    # Current state without a "newest snapshot" subquery: the newest snapshot that
+    # found the case (no_results snapshots never become latest); both are written
+    # by jobs._run_job in the transaction that creates the snapshot.
+    latest_snapshot = models.ForeignKey(
+        "CaseSnapshot", null=True, blank=True, on_delete=models.SET_NULL, related_name="+"
+    )
+    change_count = models.PositiveIntegerField(default=0)  # snapshots whose SOLON state differed from the previous one
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -51,6 +67,12 @@ class Case(models.Model):
                 name="uniq_case_by_court_gak_year",
             )
         ]
+        indexes = [
+            models.Index(fields=["hearing_date"], name="case_hearing_date_idx"),
+            models.Index(fields=["filing_date"], name="case_filing_date_idx"),
+            models.Index(fields=["decision_year", "decision_number"], name="case_decision_idx"),
+            models.Index(fields=["procedure"], name="case_procedure_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.court} — ΓΑΚ {self.gak_number}/{self.gak_year}"
@@ -62,6 +84,14 @@ class CaseSnapshot(models.Model):
     scraped_at = models.DateTimeField(default=timezone.now)
     scraper_version = models.CharField(max_length=32, default="v1")
     created_by_username = models.CharField(max_length=150, blank=True)  # who initiated the scrape
+    # SHA-256 of the archived raw results grid (grid_archive.py); blank for older snapshots
+    grid_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Latest snapshot per case: ORDER BY scraped_at DESC, id DESC LIMIT 1
+            models.Index(fields=["case", "-scraped_at", "-id"], name="snapshot_case_latest_idx"),
+        ]
 
 class CivilSearchJob(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='civil_jobs', null=True, blank=True)
@@ -76,15 +106,22 @@ class CivilSearchJob(models.Model):
         ("done", "Done"),
         ("failed", "Failed"),
     ]
+    # Statuses after which a job never changes again (jobs.py also writes
+    # "no_results", "error" and "ambiguous": a cross-court search that found
+    # the ΓΑΚ in several courts, now listed in candidate_courts).
+    TERMINAL_STATUSES = ("done", "no_results", "error", "failed", "ambiguous")
 
     client_name = models.CharField(max_length=255)
-    court = models.ForeignKey(Court, on_delete=models.PROTECT)
+    # Empty while a cross-court search (candidate_courts) has not found the case yet
+    court = models.ForeignKey(Court, on_delete=models.PROTECT, null=True, blank=True)
     gak_number = models.CharField(max_length=20)
     gak_year = models.PositiveIntegerField()
 
     status = models.CharField(max_length=16, choices=STATUS, default="queued")
     error = models.TextField(blank=True, default="")
     error_text = models.TextField(blank=True)
+    # Court ids to search, most likely first, when the Κατάστημα is unknown (fanout.py)
+    candidate_courts = models.JSONField(default=list, blank=True)
 
     case = models.ForeignKey(Case, null=True, blank=True, on_delete=models.SET_NULL)
     snapshot = models.ForeignKey(CaseSnapshot, null=True, blank=True, on_delete=models.SET_NULL)
@@ -92,6 +129,22 @@ class CivilSearchJob(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Per-user lookups and the batch status cursor (updated_at, id)
+            models.Index(fields=["user", "updated_at", "id"], name="job_user_updated_idx"),
+            # Partial indexes cover only the few active rows, however large the
+            # history grows. Equality conditions (not IN) so SQLite can match
+            # them against parametrised queries: FIFO order of the queue, and
+            # running jobs per user.
+            models.Index(fields=["created_at", "id"], condition=models.Q(status="queued"), name="job_queued_idx"),
+            models.Index(fields=["user"], condition=models.Q(status="running"), name="job_running_user_idx"),
+        ]
+
+    @property
+    def is_terminal(self) -> bool:
+        return self.status in self.TERMINAL_STATUSES
+
 
 class UserCase(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='user_cases')
@@ -103,7 +156,73 @@ class UserCase(models.Model):
 
     class Meta:
         unique_together = ('user', 'case')
+        indexes = [
+            # Dashboards and the calendar feed: a user's cases, most recently changed first
+            models.Index(fields=["user", "-updated_at"], name="usercase_user_updated_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.client_name} — {self.case}"
 
+
+class CalendarFeedKey(models.Model):
+    """
+    Per-user secret in the calendar feed token (ics.py). Replacing it revokes
+    every feed URL handed out before; users without one keep the original URL.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='calendar_feed_key')
+    key = models.CharField(max_length=64)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:
+        return f"Calendar feed key of {self.user}"
+
+
+
+class CaseSweep(models.Model):
+    """
+    Scan of a ΓΑΚ number range at one court and year (sweeps.py).
+    next_number is the checkpoint: everything below it has been looked up and
+    stored, so an interrupted sweep resumes there.
+    """
+    STATUS = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='case_sweeps')
+    court = models.ForeignKey(Court, on_delete=models.PROTECT, related_name="sweeps")
+    gak_year = models.PositiveIntegerField()
+    start_number = models.PositiveIntegerField()
+    end_number = models.PositiveIntegerField()  # inclusive
+    next_number = models.PositiveIntegerField()
+
+    status = models.CharField(max_length=16, choices=STATUS, default="queued")
+    found = models.PositiveIntegerField(default=0)
+    empty = models.PositiveIntegerField(default=0)
+    skipped = models.PositiveIntegerField(default=0)  # known empty from a recent sweep
+    failed_lookups = models.PositiveIntegerField(default=0)
+    # [[first, last], ...] numbers SOLON had nothing for; later sweeps skip them for a while
+    empty_ranges = models.JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, default="")
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["court", "gak_year", "-updated_at"], name="sweep_court_year_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.court} — ΓΑΚ {self.start_number}-{self.end_number}/{self.gak_year}"
+
+    @property
+    def total(self) -> int:
+        return self.end_number - self.start_number + 1
+
+    @property
+    def processed(self) -> int:
+        return self.next_number - self.start_number
@@ -0,0 +1,44 @@
+"""
+Short-lived memory of lookups SOLON had nothing for.
+
+A (court, ΓΑΚ number, year) whose lookup came back empty (a typo, a filing not
+registered yet) is remembered for NEGATIVE_CACHE_SECONDS, and repeat lookups of
+it are answered as no_results without a scrape. The entry is dropped as soon
+as a job, a refresh or a sweep finds the case there.
+"""
+
+from __future__ import annotations
+from typing import Iterable, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def negative_cache_seconds() -> int:
+    return int(getattr(settings, "NEGATIVE_CACHE_SECONDS", 15 * 60))
+
+
+def miss_key(court_id: int, gak_number: str, gak_year: int) -> str:
+    return f"civil_app:miss:{court_id}:{str(gak_number).strip()}:{gak_year}"
+
+
+def is_known_miss(court_id: int, gak_number: str, gak_year: int) -> bool:
+    if negative_cache_seconds() <= 0:
+        return False
+    return bool(cache.get(miss_key(court_id, gak_number, gak_year)))
+
+
+def remember_miss(court_id: int, gak_number: str, gak_year: int) -> None:
+    if negative_cache_seconds() > 0:
+        cache.set(miss_key(court_id, gak_number, gak_year), True, negative_cache_seconds())
+
+
+def forget_misses(court_id: int, keys: Iterable[Tuple[str, int]]) -> None:
+    """
+    Drop the entries for (gak_number, gak_year) pairs found at `court_id`, once
+    the current transaction commits (immediately outside one).
+    """
+    cache_keys = [miss_key(court_id, number, year) for number, year in keys]
+    if cache_keys:
+        transaction.on_commit(lambda: cache.delete_many(cache_keys))
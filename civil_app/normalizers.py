@@ -1,6 +1,9 @@
-from typing import Dict, Any
+from datetime import date
+from typing import Dict, Any, List, Optional, Tuple
 import re
 
+from .grid_archive import CELL_LABELS
+
 DISPLAY_ORDER = [
     "Υπόθεση",
     "Ημ. Κατάθεσης",
@@ -28,43 +31,170 @@ def _pick_case_title(payload: Any) -> str:
             return str(v).strip()
     return ""
 
+_date_rx = re.compile(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b")
+_num_year_rx = re.compile(r"(\d+)\s*/\s*(\d{4})")
+_leading_num_rx = re.compile(r"\d+")
+
 def _extract_dikasimos(pinakio_value: str) -> str:
     """
     Extract a date from 'Αριθμός Πινακίου' text and normalize to dd/mm/yyyy.
     Matches dd/mm/yyyy, dd-mm-yyyy, dd.mm.yyyy.
     """
     s = (pinakio_value or "").strip()
-    m = re.search(r"\b(\d{1,2})[./-](\d{1,2})[./-](\d{4})\b", s)
+    m = _date_rx.search(s)
     if not m:
         return ""
     d, mth, y = m.groups()
     return f"{int(d):02d}/{int(mth):02d}/{y}"
 
-def clean_solon_fields(payload: Any) -> Dict[str, str]:
-    # 1) Gather scraped fields
-    raw_fields: Dict[str, str] = {}
-    if isinstance(payload, dict):
-        f = payload.get("fields")
-        if isinstance(f, dict):
-            raw_fields = {k: (v or "").strip() for k, v in f.items()}
-        else:
-            raw_fields = {k: (v or "").strip() for k, v in payload.items() if isinstance(v, str)}
+def _parse_date(value: str) -> Optional[date]:
+    m = _date_rx.search(value or "")
+    if not m:
+        return None
+    d, mth, y = (int(g) for g in m.groups())
+    try:
+        return date(y, mth, d)
+    except ValueError:
+        return None
+
+def _split_num_year(value: str) -> Tuple[str, Optional[int]]:
+    """
+    '1234/2025 - Οριστική' -> ('1234', 2025); no match -> ('', None).
+    """
+    m = _num_year_rx.search(value or "")
+    if not m:
+        return "", None
+    return m.group(1), int(m.group(2))
+
+def project_case_fields(fields: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Typed Case columns from a clean_solon_fields() dict (see Case: filing_date, hearing_date, ...).
+    Text columns are only included when SOLON returned a value, so a sparse
+    snapshot never blanks out what we already know.
+    """
+    pinakio = fields.get("Αριθμός Πινακίου", "") or ""
+    hearing = fields.get("Δικάσιμος") or _extract_dikasimos(pinakio)
+    pinakio_num = _leading_num_rx.search(_date_rx.sub(" ", pinakio))
+    decision_number, decision_year = _split_num_year(fields.get("Αριθμός Απόφασης/Έτος - Είδος Διατακτικού", ""))
+    eak_number, eak_year = _split_num_year(fields.get("Ειδικός Αριθμός Κατάθεσης/Έτος", ""))
+
+    out: Dict[str, Any] = {
+        "filing_date": _parse_date(fields.get("Ημ. Κατάθεσης", "")),
+        "hearing_date": _parse_date(hearing),
+        "pinakio_number": pinakio_num.group(0) if pinakio_num else "",
+        "decision_number": decision_number,
+        "decision_year": decision_year,
+    }
+    for column, label, size in (("procedure", "Διαδικασία", 255),
+                                 ("subject", "Αντικείμενο", 255),
+                                 ("pleading_type", "Είδος", 255)):
+        value = (fields.get(label) or "").strip()
+        if value:
+            out[column] = value[:size]
+    if eak_number:
+        out["eak_number"] = eak_number[:20]
+        out["eak_year"] = eak_year
+    return out
+
+FILING_DATE = "Ημ. Κατάθεσης"
+GENERAL_NUMBER = "Γενικός Αριθμός Κατάθεσης/Έτος"
+PINAKIO = "Αριθμός Πινακίου"
+EAK_NUMBER = "Ειδικός Αριθμός Κατάθεσης/Έτος"
+# Grid cells c2..c11 in column order, by td id suffix; None where we map no label (c8)
+GRID_COLUMNS: List[Optional[str]] = [CELL_LABELS.get(f":c{n}") for n in range(2, 12)]
+
+_whole_date_rx = re.compile(r"^\d{1,2}/\d{1,2}/\d{4}$")
+_whole_num_year_rx = re.compile(r"^\d+\s*/\s*\d{4}$")
+
+def _text(v: Any) -> str:
+    return str(v if v is not None else "").replace("\u00A0", " ").strip()
+
+def _gather_fields(payload: Any) -> Dict[str, str]:
+    """
+    Scraped label -> value from payload['fields'] (dict or [label, value] pairs),
+    or from the top-level string values of an already-flat dict.
+    """
+    if not isinstance(payload, dict):
+        return {}
+    f = payload.get("fields")
+    if isinstance(f, dict):
+        return {str(k): _text(v) for k, v in f.items()}
+    if isinstance(f, list):
+        return {_text(kv[0]): _text(kv[1]) for kv in f if isinstance(kv, (list, tuple)) and len(kv) == 2}
+    return {k: _text(v) for k, v in payload.items() if isinstance(v, str)}
 
-    # 2) Compute extras
-    case_title = _pick_case_title(payload)
-    dikasimos  = _extract_dikasimos(raw_fields.get("Αριθμός Πινακίου", ""))
+def _fix_column_shift(raw: Dict[str, str]) -> None:
+    """
+    ADF sometimes misplaces the first grid cells: 'Ημ. Κατάθεσης' holds a
+    non-date while 'Γενικός Αριθμός' holds the date.
+    - the filing cell holds the ΓΑΚ number -> the two cells were swapped
+    - every value sits one cell right of its label -> move each value back one
+      column (GRID_COLUMNS); labels whose cell would come from an unmapped or
+      missing column end up empty. Only done when the moved ΓΑΚ / ΕΑΚ cells
+      then hold numbers, otherwise the row is left as scraped.
+    """
+    filing = raw.get(FILING_DATE, "")
+    general = raw.get(GENERAL_NUMBER, "")
+    if _whole_date_rx.match(filing) or not _whole_date_rx.match(general):
+        return
+    if _whole_num_year_rx.match(filing):
+        raw[FILING_DATE], raw[GENERAL_NUMBER] = general, filing
+        return
+    cells = [raw.get(label, "") if label else "" for label in GRID_COLUMNS] + [""]
+    shifted = {label: cells[i + 1] for i, label in enumerate(GRID_COLUMNS) if label}
+    eak = shifted[EAK_NUMBER]
+    if not _whole_num_year_rx.match(shifted[GENERAL_NUMBER]) or (eak and not _whole_num_year_rx.match(eak)):
+        return
+    raw.update(shifted)
+
+def clean_solon_fields(payload: Any) -> Dict[str, str]:
+    """
+    The single normalization pipeline for scraped SOLON payloads:
+    gather -> column-shift fix -> one ordered pass that cleans the filing date and
+    ΓΑΚ, fills Υπόθεση and derives Δικάσιμος from the πινάκιο.
+    Idempotent, so stored snapshots can be re-run through it (renormalize_snapshots).
+    """
+    raw = _gather_fields(payload)
+    _fix_column_shift(raw)
 
-    # 3) Ordered output
     out: Dict[str, str] = {}
     for key in DISPLAY_ORDER:
         if key == "Υπόθεση":
-            out[key] = case_title
+            out[key] = _pick_case_title(payload)
         elif key == "Δικάσιμος":
-            out[key] = dikasimos
+            out[key] = _extract_dikasimos(raw.get(PINAKIO, ""))
+        elif key == FILING_DATE:
+            m = _date_rx.search(raw.get(key, ""))
+            out[key] = f"{int(m.group(1)):02d}/{int(m.group(2)):02d}/{m.group(3)}" if m else raw.get(key, "")
+        elif key == GENERAL_NUMBER:
+            m = _num_year_rx.search(raw.get(key, ""))
+            out[key] = f"{m.group(1)}/{m.group(2)}" if m else raw.get(key, "")
         else:
-            out[key] = raw_fields.get(key, "")
+            out[key] = raw.get(key, "")
     return out
 
+def snapshot_fields(data: Any) -> Dict[str, Any]:
+    """
+    The normalized field dict of a CaseSnapshot.data_json (plain or under 'normalized').
+    """
+    if not isinstance(data, dict):
+        return {}
+    normalized = data.get("normalized", data)
+    return normalized if isinstance(normalized, dict) else {}
+
+def state_fields(data: Any) -> Dict[str, Any]:
+    """
+    snapshot_fields() without Υπόθεση: the requesting client's label is not SOLON
+    state, so two snapshots with equal state_fields() record no change.
+    """
+    return {k: v for k, v in snapshot_fields(data).items() if k != "Υπόθεση"}
+
+def has_case_data(data: Any) -> bool:
+    """
+    True when SOLON returned anything for the case (Υπόθεση alone is our client label).
+    """
+    return any(isinstance(v, str) and v.strip() for v in state_fields(data).values())
+
 # Back-compat alias used elsewhere
 def normalize_payload(payload: Any) -> Dict[str, str]:
     return clean_solon_fields(payload)
@@ -0,0 +1,47 @@
+"""
+Staff re-scrapes from the admin: refresh selected Cases, re-run failed jobs.
+
+Both only queue CivilSearchJobs; `manage.py run_jobs` runs them. A refresh has
+no user, and the runner takes a court's queued refreshes back to back in one
+SOLON session (jobs.run_next_job); re-run jobs wait their turn in the queue.
+"""
+
+from __future__ import annotations
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from . import status_cache
+from .models import CivilSearchJob
+
+RERUN_STATUSES = ("error", "failed")
+
+
+def refresh_cases(cases) -> int:
+    """
+    Queue one refresh job per Case (no user: nobody starts following it).
+    """
+    jobs = CivilSearchJob.objects.bulk_create([
+        CivilSearchJob(client_name="", court_id=case.court_id, gak_number=case.gak_number,
+                       gak_year=case.gak_year, case=case, status="queued")
+        for case in cases if case.court_id
+    ])
+    # bulk_create sends no post_save: tell open status streams the queue moved
+    status_cache.bump_job_versions([job.id for job in jobs])
+    return len(jobs)
+
+
+def rerun_jobs(jobs) -> int:
+    """
+    Put failed jobs back in the queue; other statuses are left alone.
+    """
+    rows = list(jobs.filter(status__in=RERUN_STATUSES).values_list("id", "user_id"))
+    ids = [job_id for job_id, _ in rows]
+    CivilSearchJob.objects.filter(id__in=ids).update(status="queued", error="", updated_at=timezone.now())
+    # Their terminal status fragments were cached for good (views.job_status_api)
+    keys = [status_cache.status_fragment_cache_key(user_id, job_id) for job_id, user_id in rows if user_id]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+    # update() sends no post_save: tell open status streams and the queue
+    status_cache.bump_job_versions(ids)
+    return len(ids)
@@ -0,0 +1,177 @@
+"""
+Full-text index over our own data:
+- CivilSearchJob.client_name (+ ΓΑΚ)
+- UserCase.client_name
+- Case subject/procedure and the normalized text of its latest snapshot
+  (Αντικείμενο, Αποτέλεσμα Συζήτησης, ...)
+
+Text is accent/case-folded with courts.fold() before it is indexed and before
+it is queried, so 'αθηνων' finds 'Αθηνών'. Storage depends on the backend
+(table created in migration 0006):
+- SQLite: FTS5 virtual table; rowid = obj_id * 4 + kind code, so an update is
+  a rowid delete + insert instead of a scan
+- PostgreSQL: plain table keyed by (kind, obj_id) with a stored tsvector and a GIN index
+
+Rows are kept in sync by the signal receivers in signals.py; the
+rebuild_search_index command backfills everything. Readers: the admin search
+boxes (cases, jobs, followed cases) and the client-name filter of "My cases".
+"""
+
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.db import connection
+
+from .courts import fold
+
+SEARCH_TABLE = "civil_app_search_index"
+SEARCH_MAX_RESULTS = 1000
+
+KINDS: Dict[str, int] = {"case": 1, "job": 2, "usercase": 3}
+
+_available: Optional[bool] = None
+
+
+def is_available() -> bool:
+    """
+    True when the index table exists (FTS5 may be missing from very old SQLite builds).
+    """
+    global _available
+    if _available is None:
+        if connection.vendor not in ("sqlite", "postgresql"):
+            _available = False
+        else:
+            _available = SEARCH_TABLE in connection.introspection.table_names()
+    return _available
+
+
+def _document(*parts: Any) -> str:
+    return fold(" ".join(str(p) for p in parts if p not in (None, "")))
+
+
+def index_document(kind: str, obj_id: int, text: str, user_id: Optional[int] = None) -> None:
+    if not is_available():
+        return
+    code = KINDS[kind]
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            rowid = obj_id * 4 + code
+            cur.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+            if text:
+                cur.execute(
+                    f"INSERT INTO {SEARCH_TABLE} (rowid, body, user_id) VALUES (%s, %s, %s)",
+                    [rowid, text, user_id],
+                )
+        elif text:
+            cur.execute(
+                f"INSERT INTO {SEARCH_TABLE} (kind, obj_id, user_id, body) VALUES (%s, %s, %s, %s) "
+                f"ON CONFLICT (kind, obj_id) DO UPDATE SET user_id = EXCLUDED.user_id, body = EXCLUDED.body",
+                [code, obj_id, user_id, text],
+            )
+        else:
+            cur.execute(f"DELETE FROM {SEARCH_TABLE} WHERE kind = %s AND obj_id = %s", [code, obj_id])
+
+
+def remove_document(kind: str, obj_id: int) -> None:
+    index_document(kind, obj_id, "")
+
+
+def index_case(case, fields: Optional[Dict[str, Any]] = None) -> None:
+    """
+    `fields` is the normalized snapshot dict; pass it when you have it to save a query.
+    """
+    if fields is None:
+        from .normalizers import snapshot_fields
+        latest = case.latest_snapshot.data_json if case.latest_snapshot_id else None
+        fields = snapshot_fields(latest)
+    text = _document(case.gak_number, case.gak_year, case.subject, case.procedure,
+                     case.pleading_type, *(fields or {}).values())
+    index_document("case", case.pk, text)
+
+
+def index_job(job) -> None:
+    index_document("job", job.pk, _document(job.client_name, job.gak_number, job.gak_year), job.user_id)
+
+
+def index_user_case(user_case) -> None:
+    index_document("usercase", user_case.pk, _document(user_case.client_name), user_case.user_id)
+
+
+def _match_expression(query: str) -> str:
+    tokens = fold(query).split()
+    if connection.vendor == "sqlite":
+        return " ".join(f'"{t}"*' for t in tokens)
+    return " & ".join(f"{t}:*" for t in tokens)
+
+
+def search_ids(kind: str, query: str, user_id: Optional[int] = None,
+               limit: Optional[int] = SEARCH_MAX_RESULTS) -> List[int]:
+    """
+    Ids of `kind` objects matching every word of `query` (word prefixes), best
+    match first; at most `limit` of them (None: all).
+    """
+    expr = _match_expression(query)
+    if not expr or not is_available():
+        return []
+    code = KINDS[kind]
+    user_sql = " AND user_id = %s" if user_id is not None else ""
+    user_arg = [user_id] if user_id is not None else []
+    # LIMIT -1 is SQLite's "no limit"; PostgreSQL takes LIMIT NULL
+    limit_arg = limit if limit is not None else (-1 if connection.vendor == "sqlite" else None)
+    with connection.cursor() as cur:
+        if connection.vendor == "sqlite":
+            cur.execute(
+                f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                f"AND rowid %% 4 = %s{user_sql} ORDER BY rank LIMIT %s",
+                [expr, code, *user_arg, limit_arg],
+            )
+            return [rowid // 4 for (rowid,) in cur.fetchall()]
+        cur.execute(
+            f"SELECT obj_id FROM {SEARCH_TABLE} WHERE kind = %s AND tsv @@ to_tsquery('simple', %s){user_sql} "
+            f"ORDER BY ts_rank(tsv, to_tsquery('simple', %s)) DESC LIMIT %s",
+            [code, expr, *user_arg, expr, limit_arg],
+        )
+        return [obj_id for (obj_id,) in cur.fetchall()]
+
+
+def rebuild(batch_size: int = 1000, log=None) -> Dict[str, int]:
+    """
+    Re-index every Case, CivilSearchJob and UserCase in streamed batches.
+    """
+    from django.db import transaction
+    from django.db.models import F
+
+    from .models import Case, CivilSearchJob, UserCase
+    from .normalizers import snapshot_fields
+
+    counts = {"case": 0, "job": 0, "usercase": 0}
+
+    def batched(rows: Iterable[Any], handle) -> int:
+        n = 0
+        batch: List[Any] = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                with transaction.atomic():
+                    for item in batch:
+                        handle(item)
+                n += len(batch)
+                batch = []
+                if log:
+                    log(n)
+        with transaction.atomic():
+            for item in batch:
+                handle(item)
+        return n + len(batch)
+
+    cases = Case.objects.annotate(latest_data=F("latest_snapshot__data_json")).iterator(chunk_size=batch_size)
+    counts["case"] = batched(cases, lambda c: index_case(c, snapshot_fields(c.latest_data)))
+    counts["job"] = batched(
+        CivilSearchJob.objects.only("id", "user_id", "client_name", "gak_number", "gak_year").iterator(chunk_size=batch_size),
+        index_job,
+    )
+    counts["usercase"] = batched(
+        UserCase.objects.only("id", "user_id", "client_name").iterator(chunk_size=batch_size),
+        index_user_case,
+    )
+    return counts
@@ -0,0 +1,69 @@
+"""
+Model signal receivers (connected in CivilAppConfig.ready).
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import search, status_cache
+from .courts import bump_courts_version
+from .dashboard import invalidate_counts
+from .models import Case, CaseSnapshot, CivilSearchJob, Court, UserCase
+from .normalizers import has_case_data, snapshot_fields
+
+
+@receiver(post_save, sender=Court)
+@receiver(post_delete, sender=Court)
+def court_changed(sender, **kwargs):
+    # Admin edits and any other ORM save: drop the cached dropdown
+    bump_courts_version()
+
+
+def _touches(kwargs, field: str) -> bool:
+    update_fields = kwargs.get("update_fields")
+    return kwargs.get("created") or update_fields is None or field in update_fields
+
+
+# --- Full-text index (search.py), kept in sync incrementally ---
+
+@receiver(post_save, sender=CaseSnapshot)
+def snapshot_saved(sender, instance, created, **kwargs):
+    # An empty (no_results) snapshot is not the case's state: keep the document
+    if created and has_case_data(instance.data_json):
+        search.index_case(instance.case, snapshot_fields(instance.data_json))
+
+
+@receiver(post_save, sender=CivilSearchJob)
+def job_saved(sender, instance, **kwargs):
+    # Status updates (update_fields without client_name) do not change the document
+    if _touches(kwargs, "client_name"):
+        search.index_job(instance)
+
+
+@receiver(post_save, sender=UserCase)
+def user_case_saved(sender, instance, **kwargs):
+    if _touches(kwargs, "client_name"):
+        search.index_user_case(instance)
+
+
+# --- Status streams (status_cache.py) ---
+
+@receiver(post_save, sender=CivilSearchJob)
+def job_status_changed(sender, instance, **kwargs):
+    status_cache.bump_job_versions([instance.pk])
+
+
+# --- "My cases" counts (dashboard.py) ---
+
+@receiver(post_save, sender=UserCase)
+@receiver(post_delete, sender=UserCase)
+def user_case_changed(sender, instance, **kwargs):
+    invalidate_counts([instance.user_id])
+
+
+@receiver(post_delete, sender=Case)
+@receiver(post_delete, sender=CivilSearchJob)
+@receiver(post_delete, sender=UserCase)
+def indexed_object_deleted(sender, instance, **kwargs):
+    kind = {Case: "case", CivilSearchJob: "job", UserCase: "usercase"}[sender]
+    search.remove_document(kind, instance.pk)
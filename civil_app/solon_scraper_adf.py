@@ -1,5 +1,7 @@
-from playwright.sync_api import sync_playwright
 import time, re
+from contextlib import contextmanager
+
+from .browser import browser_context
 
 URL = "https://extapps.solon.gov.gr/mojwp/faces/TrackLdoPublic"
 
@@ -164,46 +166,105 @@ def _extract_row_fields(page, gak_num: str, gak_year: str) -> dict:
     """
     return page.evaluate(js, {"dbSel": SEL_GRID_DB, "num": str(gak_num).strip(), "year": str(gak_year).strip()}) or {}
 
-def scrape_solon_civil_adf(court_label: str, gak_number: str, gak_year: int) -> dict:
+def _mark_grid_stale(page):
     """
-    Returns:
-      {
-        "Κατάστημα": <court_label>,
-        "ΓΑΚ": "<num>/<year>",
-        "fields": { ... all greek keys mapped ... }
-      }
+    Tag the current results grid so the next search can tell a fresh grid from this one.
+    """
+    try:
+        page.evaluate("(sel)=>{const db=document.querySelector(sel); if(db){db.dataset.stale='1';}}", SEL_GRID_DB)
+    except Exception:
+        pass
+
+class StaleGridError(RuntimeError):
+    """
+    A re-search never replaced the previous results grid; reading it would
+    report the previous number's grid (usually "no row") for the new one.
+    """
+
+def _wait_grid_replaced(page, timeout_ms=15000):
+    # ADF re-renders the grid on a new search (partial page refresh): wait for the untagged one
+    try:
+        page.wait_for_function(
+            "(sel)=>{const db=document.querySelector(sel); return !db || db.dataset.stale !== '1';}",
+            arg=SEL_GRID_DB,
+            timeout=timeout_ms,
+        )
+    except Exception as exc:
+        raise StaleGridError(f"Results grid not refreshed within {timeout_ms} ms") from exc
+
+class SolonSession:
     """
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        context = browser.new_context(locale="el-GR", viewport={"width": 1500, "height": 950})
+    The SOLON search form of one court, open in one page, for any number of
+    ΓΑΚ lookups: each lookup re-fills the form and searches again in place
+    instead of loading the application from scratch.
+    """
+    def __init__(self, page, court_label: str):
+        self.page = page
+        self.court_label = court_label
+        self.searches = 0
+
+    def lookup(self, gak_number: str, gak_year: int) -> dict:
+        """
+        Returns:
+          {
+            "Κατάστημα": <court_label>,
+            "ΓΑΚ": "<num>/<year>",
+            "fields": { ... all greek keys mapped ... },
+            "grid_html": <inner HTML of the results grid>
+          }
+        """
+        page = self.page
+        if self.searches:
+            _mark_grid_stale(page)
+        page.fill(SEL_GAK_NUMBER, str(gak_number).strip())
+        page.fill(SEL_GAK_YEAR,   str(gak_year).strip())
+
+        _click_search(page)
+        if self.searches:
+            _wait_grid_replaced(page)
+        _wait_results(page, timeout_ms=60_000)
+        self.searches += 1
+
+        fields = _extract_row_fields(page, gak_number, gak_year)
+        # Raw grid for the offline archive (grid_archive.py); never fail the lookup over it
+        try:
+            grid_html = page.inner_html(SEL_GRID_DB)
+        except Exception:
+            grid_html = ""
+
+        # Massage obvious formats
+        if "Ημ. Κατάθεσης" in fields:
+            m = re.search(r"\b(\d{2}/\d{2}/\d{4})\b", fields["Ημ. Κατάθεσης"])
+            if m:
+                fields["Ημ. Κατάθεσης"] = m.group(1)
+
+        return {
+            "Κατάστημα": self.court_label or "",
+            "ΓΑΚ": f"{str(gak_number).strip()}/{str(gak_year).strip()}",
+            "fields": fields,
+            "grid_html": grid_html,
+        }
+
+@contextmanager
+def solon_session(court_label: str):
+    """
+    A SolonSession with the court already selected; the page and its browser context close on exit.
+    """
+    with browser_context(court_label, locale="el-GR", viewport={"width": 1500, "height": 950}) as context:
         page = context.new_page()
         page.set_default_timeout(30_000)
-
         try:
             page.goto(URL, wait_until="domcontentloaded")
             page.wait_for_load_state("networkidle")
             _accept_cookies(page)
-
             _select_court_by_label(page, court_label)
-            page.fill(SEL_GAK_NUMBER, str(gak_number).strip())
-            page.fill(SEL_GAK_YEAR,   str(gak_year).strip())
-
-            _click_search(page)
-            _wait_results(page, timeout_ms=60_000)
-
-            fields = _extract_row_fields(page, gak_number, gak_year)
-
-            # Massage obvious formats
-            if "Ημ. Κατάθεσης" in fields:
-                m = re.search(r"\b(\d{2}/\d{2}/\d{4})\b", fields["Ημ. Κατάθεσης"])
-                if m:
-                    fields["Ημ. Κατάθεσης"] = m.group(1)
-
-            return {
-                "Κατάστημα": court_label or "",
-                "ΓΑΚ": f"{str(gak_number).strip()}/{str(gak_year).strip()}",
-                "fields": fields,
-            }
+            yield SolonSession(page, court_label)
         finally:
-            context.close()
-            browser.close()
+            page.close()
+
+def scrape_solon_civil_adf(court_label: str, gak_number: str, gak_year: int) -> dict:
+    """
+    One lookup in a session of its own; see SolonSession.lookup for the result.
+    """
+    with solon_session(court_label) as session:
+        return session.lookup(gak_number, gak_year)
@@ -0,0 +1,69 @@
+"""
+Change markers for the job status endpoints (views.job_status_stream).
+
+Every saved CivilSearchJob bumps its own version and the queue version (any job
+moving can shift queue positions) once its transaction commits. An open status
+stream polls these two cache values and reads the job row only when one of
+them changed, so idle streams cost a cache get per check instead of queries.
+Terminal jobs' rendered status fragments are cached under
+status_fragment_cache_key(); whoever re-queues a job drops that entry.
+
+Markers only travel between processes through a shared cache (DJANGO_CACHE_URL);
+cache_is_shared() tells the callers that depend on that.
+"""
+
+from __future__ import annotations
+import time
+from typing import Iterable, Optional, Tuple
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+QUEUE_VERSION_KEY = "civil_app:jobs:queue_version"
+# Outlives any open stream (views.STREAM_MAX_SECONDS)
+VERSION_CACHE_SECONDS = 60 * 60
+
+
+def cache_is_shared() -> bool:
+    """
+    False for the per-process default cache (local memory, dummy): values set
+    by a worker, sync_courts or browser_server are never seen by other processes.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def status_fragment_cache_key(user_id: int, job_id: int) -> str:
+    """
+    Where views.job_status_api keeps a terminal job's rendered fragment.
+    """
+    return f"civil_app:status_fragment:{user_id}:{job_id}"
+
+
+def job_version_key(job_id: int) -> str:
+    return f"civil_app:job_version:{job_id}"
+
+
+def bump_job_versions(job_ids: Iterable[int]) -> None:
+    """
+    Mark the jobs (and the queue) changed once the current transaction commits
+    (immediately outside one).
+    """
+    keys = [job_version_key(job_id) for job_id in job_ids]
+
+    def bump() -> None:
+        version = time.time_ns()
+        cache.set_many({key: version for key in keys + [QUEUE_VERSION_KEY]}, VERSION_CACHE_SECONDS)
+
+    if keys:
+        transaction.on_commit(bump)
+
+
+async def aversions(job_id: int) -> Tuple[Optional[int], Optional[int]]:
+    """
+    (job version, queue version); None for a marker not set (yet, or evicted).
+    """
+    key = job_version_key(job_id)
+    values = await cache.aget_many([key, QUEUE_VERSION_KEY])
+    return values.get(key), values.get(QUEUE_VERSION_KEY)
@@ -0,0 +1,236 @@
+"""
+ΓΑΚ range sweeps (CaseSweep): every filing numbered start..end at one court and year.
+
+- One SOLON session for the whole range: the court is selected once and every
+  number is a re-search on the same page (SolonSession); the session is
+  reopened after a failed lookup.
+- At most SWEEP_RATE_PER_MINUTE lookups a minute.
+- Numbers that a sweep of the same court/year found empty within
+  SWEEP_EMPTY_TTL_HOURS are skipped.
+- Results are stored every `batch_size` numbers in one transaction: Cases and
+  snapshots with bulk_create, the Case pointer/counter/projection with one
+  bulk_update, and the checkpoint (next_number) alongside, so a resumed sweep
+  neither repeats nor loses stored work.
+"""
+
+from __future__ import annotations
+import logging
+import time
+from bisect import bisect_right
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from . import grid_archive, search
+from .dashboard import invalidate_counts
+from .models import Case, CaseSnapshot, CaseSweep, UserCase
+from .negative_cache import forget_misses
+from .normalizers import clean_solon_fields, has_case_data, project_case_fields, state_fields
+from .solon_scraper_adf import solon_session
+
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 25
+# A sweep gives up after this many lookups in a row failed (SOLON down, court renamed, ...)
+SWEEP_MAX_CONSECUTIVE_FAILURES = 5
+
+PROJECTED_COLUMNS = ["filing_date", "hearing_date", "pinakio_number", "decision_number", "decision_year",
+                     "procedure", "subject", "pleading_type", "eak_number", "eak_year"]
+
+Progress = Callable[[int, str], None]
+
+
+def sweep_rate_per_minute() -> float:
+    return float(getattr(settings, "SWEEP_RATE_PER_MINUTE", 30))
+
+
+def empty_ttl() -> timedelta:
+    return timedelta(hours=float(getattr(settings, "SWEEP_EMPTY_TTL_HOURS", 24)))
+
+
+def merge_spans(spans: List[List[int]]) -> List[List[int]]:
+    """
+    Sorted, non-overlapping [first, last] spans; adjacent spans are joined.
+    """
+    merged: List[List[int]] = []
+    for first, last in sorted(spans):
+        if merged and first <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], last)
+        else:
+            merged.append([first, last])
+    return merged
+
+
+class _SpanSet:
+    def __init__(self, spans: List[List[int]]):
+        self.spans = merge_spans(spans)
+        self.firsts = [first for first, _ in self.spans]
+
+    def __contains__(self, number: int) -> bool:
+        i = bisect_right(self.firsts, number) - 1
+        return i >= 0 and self.spans[i][1] >= number
+
+
+def known_empty(sweep: CaseSweep) -> _SpanSet:
+    """
+    Numbers found empty at this court/year by other recent sweeps.
+    """
+    spans: List[List[int]] = []
+    recent = (
+        CaseSweep.objects.filter(court_id=sweep.court_id, gak_year=sweep.gak_year,
+                                 updated_at__gte=timezone.now() - empty_ttl())
+        .exclude(id=sweep.id)
+        .values_list("empty_ranges", flat=True)
+    )
+    for ranges in recent:
+        spans.extend([first, last] for first, last in ranges or [])
+    return _SpanSet(spans)
+
+
+def upsert_cases(court, gak_year: int, found: List[Tuple[str, Dict[str, Any], str]], created_by: str = "") -> None:
+    """
+    Store (gak_number, normalized fields, grid sha) results: create missing Cases,
+    add one snapshot each and advance Case.latest_snapshot/change_count and the
+    typed columns, as jobs._advance_case does for a single lookup. Call inside a transaction.
+    """
+    numbers = [number for number, _, _ in found]
+    Case.objects.bulk_create(
+        [Case(court=court, gak_number=number, gak_year=gak_year) for number in numbers],
+        ignore_conflicts=True,
+    )
+    cases = {
+        c.gak_number: c for c in
+        Case.objects.select_for_update(of=("self",)).select_related("latest_snapshot")
+        .filter(court=court, gak_year=gak_year, gak_number__in=numbers)
+    }
+    snaps = CaseSnapshot.objects.bulk_create([
+        CaseSnapshot(case=cases[number], data_json=fields, grid_sha256=sha, created_by_username=created_by)
+        for number, fields, sha in found
+    ])
+    now = timezone.now()
+    for snap, (number, fields, _) in zip(snaps, found):
+        case = cases[number]
+        previous = case.latest_snapshot.data_json if case.latest_snapshot_id else None
+        if previous is None or state_fields(previous) != state_fields(fields):
+            case.change_count += 1
+        case.latest_snapshot = snap
+        case.updated_at = now
+        for column, value in project_case_fields(fields).items():
+            setattr(case, column, value)
+        # bulk_create sends no post_save, so the search signal does not run
+        search.index_case(case, fields)
+    Case.objects.bulk_update(list(cases.values()), ["latest_snapshot", "change_count", "updated_at"] + PROJECTED_COLUMNS)
+    invalidate_counts(UserCase.objects.filter(case__in=cases.values()).values_list("user_id", flat=True))
+    forget_misses(court.id, [(number, gak_year) for number in numbers])
+
+
+class _Batch:
+    def __init__(self) -> None:
+        self.found: List[Tuple[str, Dict[str, Any], str]] = []
+        self.empty: List[int] = []
+        self.skipped = 0
+        self.failed = 0
+        self.size = 0
+
+    def flush(self, sweep: CaseSweep, next_number: int) -> None:
+        with transaction.atomic():
+            if self.found:
+                upsert_cases(sweep.court, sweep.gak_year, self.found, sweep.user.username if sweep.user else "")
+            sweep.empty_ranges = merge_spans(list(sweep.empty_ranges or []) + [[n, n] for n in self.empty])
+            sweep.found += len(self.found)
+            sweep.empty += len(self.empty)
+            sweep.skipped += self.skipped
+            sweep.failed_lookups += self.failed
+            sweep.next_number = next_number
+            sweep.save(update_fields=["empty_ranges", "found", "empty", "skipped", "failed_lookups",
+                                      "next_number", "updated_at"])
+        self.__init__()
+
+
+def _lookup(session, sweep: CaseSweep, number: int) -> Tuple[Dict[str, Any], str]:
+    raw = session.lookup(str(number), sweep.gak_year)
+    grid_sha = ""
+    grid_html = raw.pop("grid_html", "")
+    if grid_html:
+        try:
+            grid_sha = grid_archive.store(grid_html)
+        except Exception:
+            logger.exception("Could not archive grid HTML for sweep %s number %s", sweep.id, number)
+    # No client: the snapshot carries SOLON's fields only
+    return clean_solon_fields(dict(raw, Υπόθεση="")), grid_sha
+
+
+def run_sweep(sweep_id: int, batch_size: int = SWEEP_BATCH_SIZE, progress: Optional[Progress] = None) -> CaseSweep:
+    """
+    Scan (or resume) a sweep from its checkpoint to end_number.
+    `progress(number, outcome)` is called per number with "found", "empty", "skipped" or "failed".
+    """
+    sweep = CaseSweep.objects.select_related("court", "user").get(id=sweep_id)
+    if sweep.status == "done":
+        return sweep
+    sweep.status = "running"
+    sweep.error = ""
+    sweep.save(update_fields=["status", "error", "updated_at"])
+
+    report = progress or (lambda number, outcome: None)
+    skip = known_empty(sweep)
+    interval = 60.0 / max(sweep_rate_per_minute(), 0.001)
+    batch = _Batch()
+    number = sweep.next_number
+    last_lookup = 0.0
+    failures_in_row = 0
+    storing = False
+
+    try:
+        while number <= sweep.end_number:
+            try:
+                with solon_session(sweep.court.name) as session:
+                    while number <= sweep.end_number:
+                        if number in skip:
+                            batch.skipped += 1
+                            outcome = "skipped"
+                        else:
+                            time.sleep(max(0.0, last_lookup + interval - time.monotonic()))
+                            last_lookup = time.monotonic()
+                            fields, grid_sha = _lookup(session, sweep, number)
+                            failures_in_row = 0
+                            if has_case_data(fields):
+                                batch.found.append((str(number), fields, grid_sha))
+                                outcome = "found"
+                            else:
+                                batch.empty.append(number)
+                                outcome = "empty"
+                        report(number, outcome)
+                        number += 1
+                        batch.size += 1
+                        if batch.size >= batch_size:
+                            storing = True
+                            batch.flush(sweep, number)
+                            storing = False
+            except Exception:
+                if storing:
+                    raise
+                # This number is passed over (a later sweep retries it); the session is reopened
+                logger.exception("Sweep %s: lookup of %s/%s failed", sweep.id, number, sweep.gak_year)
+                failures_in_row += 1
+                if failures_in_row >= SWEEP_MAX_CONSECUTIVE_FAILURES:
+                    raise
+                batch.failed += 1
+                report(number, "failed")
+                number += 1
+                batch.size += 1
+    except Exception as exc:
+        if not storing:
+            batch.flush(sweep, number)
+        sweep.status = "failed"
+        sweep.error = f"{type(exc).__name__}: {exc}"
+        sweep.save(update_fields=["status", "error", "updated_at"])
+        return sweep
+
+    batch.flush(sweep, number)
+    sweep.status = "done"
+    sweep.save(update_fields=["status", "updated_at"])
+    return sweep
@@ -1,3 +1,1034 @@
-from django.test import TestCase
+import gzip
+import sqlite3
+from contextlib import contextmanager
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core import serializers, signing
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.contrib.auth.models import Group, Permission
+from django.db import connection, connections
+from django.db.models import Max
+from django.test.utils import CaptureQueriesContext
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import browser, fanout, grid_archive, ics, jobs, refresh, search, status_cache, sweeps, views
+from .court_sync import apply_court_options
+from .courts import CourtIndex
+from .management.commands.copy_sqlite_data import SOURCE_ALIAS, models_to_copy
+from .admission import QueueFull, admit, claim_next, queue_status, try_claim
+from .dashboard import MY_CASES_PAGE_SIZE, parse_cursor, user_case_counts, user_cases_page
+from .exports import user_case_rows
+from .models import Case, CaseSnapshot, CaseSweep, CivilSearchJob, Court, UserCase
+from .negative_cache import is_known_miss
+from .normalizers import clean_solon_fields, has_case_data, project_case_fields, state_fields
+from .solon_scraper_adf import StaleGridError
+
+
+class QueryPlanTests(TestCase):
+    """
+    The hot queries must be served by the indexes from migration 0009; a plan
+    that falls back to a full scan or a temp sort grows with the table.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("planner")
+        court = Court.objects.create(name="Πρωτοδικείο Αθηνών")
+        cls.case = Case.objects.create(court=court, gak_number="123", gak_year=2024)
+        CaseSnapshot.objects.create(case=cls.case, data_json={})
+        cls.job = CivilSearchJob.objects.create(
+            user=cls.user, client_name="Test", court=court, gak_number="123", gak_year=2024,
+        )
+        UserCase.objects.create(user=cls.user, case=cls.case, client_name="Test")
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        if connection.vendor == "sqlite":
+            self.assertNotIn("USE TEMP B-TREE", plan)
+
+    def test_batch_status_cursor(self):
+        qs = (CivilSearchJob.objects.filter(user=self.user, updated_at__gt=self.job.created_at)
+              .order_by("updated_at", "id")[:200])
+        self.assertUsesIndex(qs, "job_user_updated_idx")
+
+    def test_queued_jobs_in_order(self):
+        qs = CivilSearchJob.objects.filter(status="queued").order_by("created_at", "id")
+        self.assertUsesIndex(qs, "job_queued_idx")
+
+    def test_running_jobs_per_user(self):
+        qs = CivilSearchJob.objects.filter(status="running", user=self.user)
+        self.assertUsesIndex(qs, "job_running_user_idx")
+
+    def test_latest_snapshot(self):
+        qs = CaseSnapshot.objects.filter(case=self.case).order_by("-scraped_at", "-id")[:1]
+        self.assertUsesIndex(qs, "snapshot_case_latest_idx")
+
+    def test_user_cases_dashboard(self):
+        qs = UserCase.objects.filter(user=self.user).order_by("-updated_at")[:50]
+        self.assertUsesIndex(qs, "usercase_user_updated_idx")
+
+    def test_calendar_feed_version(self):
+        plan = UserCase.objects.filter(user=self.user).values("user").annotate(m=Max("updated_at")).explain()
+        self.assertIn("usercase_user_updated_idx", plan)
+
+
+class MyCasesDashboardTests(TestCase):
+    """
+    The dashboard reads a page in one query whatever the number of followed
+    cases, plus one grouped query for the counts when they are not cached.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("lawyer")
+        cls.courts = [Court.objects.create(name=f"Πρωτοδικείο {n}", slug=f"court-{n}") for n in range(3)]
+        start = timezone.localdate() - timedelta(days=20)
+        for n in range(120):
+            case = Case.objects.create(
+                court=cls.courts[n % 3], gak_number=str(1000 + n), gak_year=2025,
+                hearing_date=start + timedelta(days=n % 40) if n % 10 else None,
+                decision_number=str(n) if n % 4 == 0 else "",
+            )
+            snap = CaseSnapshot.objects.create(case=case, data_json={})
+            Case.objects.filter(pk=case.pk).update(latest_snapshot=snap)
+            UserCase.objects.create(user=cls.user, case=case, client_name=f"Πελάτης {n}")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def _walk(self, params=""):
+        seen, after = [], None
+        while True:
+            rows, cursor = user_cases_page(self.user.id, after=after, **params)
+            self.assertLessEqual(len(rows), MY_CASES_PAGE_SIZE)
+            seen.extend(rows)
+            if cursor is None:
+                return seen
+            after = parse_cursor(cursor)
+
+    def test_query_budget(self):
+        url = reverse("civil_app:my_cases")
+        # session + user + counts + page
+        with self.assertNumQueries(4):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        # counts now cached
+        with self.assertNumQueries(3):
+            self.client.get(url)
+        # next page over htmx: rows only
+        cursor = response.context["next_cursor"]
+        with self.assertNumQueries(3):
+            self.client.get(url, {"after": cursor}, HTTP_HX_REQUEST="true")
+
+    def test_keyset_pages_cover_everything_in_order(self):
+        rows = self._walk({})
+        self.assertEqual(len(rows), 120)
+        self.assertEqual(len({uc.id for uc in rows}), 120)
+        today = timezone.localdate()
+
+        def key(uc):
+            hearing = uc.case.hearing_date
+            if hearing is None:
+                return (2, 0, uc.id)
+            # upcoming soonest first, then past latest first
+            return (0, hearing.toordinal(), uc.id) if hearing >= today else (1, -hearing.toordinal(), uc.id)
+
+        keys = [key(uc) for uc in rows]
+        self.assertEqual(keys, sorted(keys))
+        self.assertEqual(rows[0].case.hearing_date, today + timedelta(days=1))
+
+    def test_cursor_keeps_the_day_it_started_on(self):
+        rows, cursor = user_cases_page(self.user.id)
+        self.assertEqual(parse_cursor(cursor)[0], timezone.localdate())
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch("civil_app.dashboard.timezone.localdate", return_value=tomorrow):
+            seen = list(rows)
+            while cursor is not None:
+                page, cursor = user_cases_page(self.user.id, after=parse_cursor(cursor))
+                seen.extend(page)
+        self.assertEqual(len(seen), 120)
+        self.assertEqual(len({uc.id for uc in seen}), 120)
+        self.assertEqual(parse_cursor("2026-01-01_none"), None)
+
+    def test_filters(self):
+        court = self.courts[1]
+        rows = self._walk({"court_id": court.id, "decision": "pending"})
+        self.assertEqual(len(rows), 30)
+        self.assertTrue(all(uc.case.court.name == court.name and not uc.case.decision_number for uc in rows))
+
+    def test_client_name_search(self):
+        rows = self._walk({"query": "πελατης 7"})
+        self.assertEqual(sorted(uc.client_name for uc in rows),
+                         sorted(["Πελάτης 7"] + [f"Πελάτης {n}" for n in range(70, 80)]))
+        response = self.client.get(reverse("civil_app:my_cases"), {"q": "Πελάτης 119"})
+        self.assertEqual([uc.client_name for uc in response.context["rows"]], ["Πελάτης 119"])
+
+    def test_admin_search_warns_at_the_cap(self):
+        self.client.force_login(get_user_model().objects.create_superuser("admin"))
+        url = reverse("admin:civil_app_usercase_changelist")
+        with mock.patch.object(search, "SEARCH_MAX_RESULTS", 5):
+            response = self.client.get(url, {"q": "πελατης"})
+        self.assertEqual(response.context["cl"].result_count, 5)
+        self.assertIn("best matches only", [str(m) for m in response.context["messages"]][0])
+
+    @override_settings(TIME_ZONE="Europe/Athens")
+    def test_export_times_are_local(self):
+        uc = UserCase.objects.filter(user=self.user).select_related("case").first()
+        scraped = timezone.make_aware(datetime(2026, 7, 1, 21, 30), dt_timezone.utc)
+        CaseSnapshot.objects.filter(id=uc.case.latest_snapshot_id).update(scraped_at=scraped)
+        row = next(r for r in user_case_rows(self.user) if r[0] == uc.client_name)
+        self.assertEqual(row[-1], "02/07/2026 00:30")
+
+    def test_counts_follow_unfollow(self):
+        self.assertEqual(user_case_counts(self.user.id)["total"], 120)
+        with self.captureOnCommitCallbacks(execute=True):
+            UserCase.objects.filter(user=self.user).first().delete()
+        counts = user_case_counts(self.user.id)
+        self.assertEqual(counts["total"], 119)
+        self.assertEqual(counts["decided"] + counts["pending"], 119)
+
+
+class CalendarFeedTests(TestCase):
+    """
+    The .ics feed: token checks, conditional requests, event content, revocation.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("feed")
+        court = Court.objects.create(name="Πρωτοδικείο Πατρών", slug="patra")
+        cls.hearing = timezone.localdate() + timedelta(days=10)
+        cls.case = Case.objects.create(court=court, gak_number="321", gak_year=2025, subject="Αποζημίωση",
+                                       hearing_date=cls.hearing)
+        old = Case.objects.create(court=court, gak_number="7", gak_year=2020,
+                                  hearing_date=timezone.localdate() - timedelta(days=ics.FEED_PAST_DAYS + 1))
+        UserCase.objects.create(user=cls.user, case=cls.case, client_name="Παπαδόπουλος, Γ.")
+        UserCase.objects.create(user=cls.user, case=old, client_name="Παλιά")
+
+    def _get(self, token, **headers):
+        return self.client.get(reverse("civil_app:calendar_feed", args=[token]), **headers)
+
+    def test_bad_or_foreign_token(self):
+        other = get_user_model().objects.create_user("other")
+        foreign = signing.Signer(salt="another.salt").sign(str(self.user.pk))
+        for token in ("nonsense", f"{self.user.pk}", foreign, ics.feed_token(other)[:-1] + "x"):
+            self.assertEqual(self._get(token).status_code, 404, token)
+        self.assertEqual(self._get(ics.feed_token(other)).status_code, 200)
+
+    def test_events(self):
+        response = self._get(ics.feed_token(self.user))
+        self.assertEqual(response["Content-Type"], "text/calendar; charset=utf-8")
+        body = response.content.decode("utf-8")
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in body.split("\r\n")))
+        body = body.replace("\r\n ", "")  # unfold
+        self.assertEqual(body.count("BEGIN:VEVENT"), 1)  # the long past hearing is left out
+        self.assertIn(f"UID:case-{self.case.id}@yoursolon\r\n", body)
+        self.assertIn(f"DTSTART;VALUE=DATE:{self.hearing:%Y%m%d}\r\n", body)
+        self.assertIn("SUMMARY:Δικάσιμος: Παπαδόπουλος\\, Γ. — ΓΑΚ 321/2025\r\n", body)
+        self.assertIn("LOCATION:Πρωτοδικείο Πατρών\r\n", body)
+
+    def test_etag_round_trip(self):
+        token = ics.feed_token(self.user)
+        etag = self._get(token)["ETag"]
+        response = self._get(token, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.content), (304, b""))
+        Case.objects.filter(id=self.case.id).update(hearing_date=self.hearing + timedelta(days=1),
+                                                    updated_at=timezone.now() + timedelta(seconds=1))
+        response = self._get(token, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertContains(response, f"DTSTART;VALUE=DATE:{self.hearing + timedelta(days=1):%Y%m%d}")
+
+    def test_reset_revokes_the_old_url(self):
+        old = ics.feed_token(self.user)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse("civil_app:calendar_subscribe"))
+        self.assertRedirects(response, reverse("civil_app:calendar_subscribe"))
+        new = ics.feed_token(self.user)
+        self.assertNotEqual(new, old)
+        self.assertEqual(self._get(old).status_code, 404)
+        self.assertEqual(self._get(new).status_code, 200)
+        self.assertContains(self.client.get(reverse("civil_app:calendar_subscribe")), new)
+
+
+class JobStatusTests(TestCase):
+    """
+    The three ways a page follows a job: the SSE stream, the conditional
+    fragment poll and the batch API's `since` cursor.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user("lawyer")
+        cls.court = Court.objects.create(name="Πρωτοδικείο Πατρών")
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def _job(self, **kwargs):
+        return CivilSearchJob.objects.create(user=self.user, client_name="Πελάτης", court=self.court,
+                                             gak_number="1", gak_year=2026, **kwargs)
+
+    def _save_status(self, job, **fields):
+        for name, value in fields.items():
+            setattr(job, name, value)
+        with self.captureOnCommitCallbacks(execute=True):
+            job.save()
+
+    def test_stream_pushes_changes_then_closes(self):
+        job = self._job(status="running")
+
+        async def collect():
+            events = []
+            async for event in views._job_status_events(job.id):
+                events.append(event)
+                if event.startswith("event: status") and len(events) == 2:
+                    await sync_to_async(self._save_status)(job, status="error", error="boom")
+            return events
+
+        with mock.patch.object(views, "STREAM_CHECK_SECONDS", 0), \
+                mock.patch.object(views, "STREAM_RECHECK_SECONDS", 3600):
+            events = async_to_sync(collect)()
+        self.assertEqual(events[0], "retry: 3000\n\n")
+        self.assertEqual([e.split("\n", 1)[0] for e in events[1:]],
+                         ["event: status", "event: status", "event: close"])
+        self.assertEqual(events[-1], "event: close\ndata: done\n\n")
+
+    def test_idle_stream_does_not_query(self):
+        job = self._job(status="running")
+        # The stream's queries run on this thread's connection (thread-sensitive sync_to_async)
+        log = connections["default"].queries_log
+
+        async def walk():
+            stream = views._job_status_events(job.id)
+            self.assertEqual(await anext(stream), "retry: 3000\n\n")
+            self.assertTrue((await anext(stream)).startswith("event: status"))
+            before = len(log)
+            for _ in range(5):
+                self.assertEqual(await anext(stream), ": keep-alive\n\n")
+            idle_queries = len(log) - before
+            await sync_to_async(self._save_status)(job, status="done")
+            self.assertTrue((await anext(stream)).startswith("event: status"))
+            await stream.aclose()
+            return idle_queries
+
+        with mock.patch.object(views, "STREAM_CHECK_SECONDS", 0), \
+                mock.patch.object(views, "STREAM_HEARTBEAT_SECONDS", -1), \
+                mock.patch.object(views, "STREAM_RECHECK_SECONDS", 3600), \
+                CaptureQueriesContext(connection):
+            # Nothing changed while idle: only the cache marker is read
+            self.assertEqual(async_to_sync(walk)(), 0)
+
+    def test_fragment_revalidates_with_304(self):
+        job = self._job(status="running")
+        url = reverse("civil_app:job_status_api", args=[job.id])
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"]).status_code, 304)
+
+        CivilSearchJob.objects.filter(id=job.id).update(status="done", updated_at=timezone.now())
+        done = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(done.status_code, 286)
+        self.assertNotEqual(done["ETag"], first["ETag"])
+        # Served from the cached render from now on
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=done["ETag"]).status_code, 304)
+
+    def test_since_cursor_walks_every_change_once(self):
+        jobs_ = [self._job() for _ in range(5)]
+        url = reverse("civil_app:job_status_batch")
+        with mock.patch.object(views, "BATCH_STATUS_MAX_JOBS", 2):
+            seen, since = [], ""
+            while True:
+                body = self.client.get(url, {"since": since} if since else {}).json()
+                seen.extend(j["id"] for j in body["jobs"])
+                self.assertTrue(body["next_since"].endswith(f"Z_{seen[-1]}"))
+                since = body["next_since"]
+                if not body["has_more"]:
+                    break
+        self.assertEqual(seen, [j.id for j in jobs_])
+
+    def test_since_cursor_tolerates_an_unencoded_plus(self):
+        first, second = self._job(), self._job()
+        stamp = first.updated_at.isoformat()
+        self.assertIn("+00:00", stamp)
+        # A client pasting the offset into the query string: "+" arrives as a space
+        response = self.client.get(f"{reverse('civil_app:job_status_batch')}?since={stamp}_{first.id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([j["id"] for j in response.json()["jobs"]], [second.id])
+        self.assertEqual(self.client.get(reverse("civil_app:job_status_batch"), {"since": "yesterday"}).status_code,
+                         400)
+
+
+class NegativeCacheTests(TestCase):
+    """
+    A lookup that found nothing is answered from the cache on retry, until the case is found.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.court = Court.objects.create(name="Ειρηνοδικείο Αθηνών")
+
+    def _run(self, scrape_result, session=None):
+        job = CivilSearchJob.objects.create(client_name="Πελάτης", court=self.court, gak_number="77", gak_year=2026)
+        with mock.patch.object(jobs, "scrape_solon_civil_adf", return_value=scrape_result) as scrape, \
+                self.captureOnCommitCallbacks(execute=True):
+            if session is None:
+                jobs.run_civil_job(job.id)
+            else:
+                jobs._run_job(try_claim(job.id), session=session)
+        job.refresh_from_db()
+        return job.status, scrape.call_count
+
+    def test_repeat_miss_skips_scrape_until_found(self):
+        self.assertEqual(self._run({"fields": {}}), ("no_results", 1))
+        self.assertEqual(self._run({"fields": {}}), ("no_results", 0))
+        self.assertTrue(is_known_miss(self.court.id, "77", 2026))
+        # An admin refresh looks it up regardless, and finds it
+        session = mock.Mock(**{"lookup.return_value": {"fields": {"Διαδικασία": "Τακτική"}}})
+        self.assertEqual(self._run(None, session=session), ("done", 0))
+        self.assertFalse(is_known_miss(self.court.id, "77", 2026))
+
+
+class LatestSnapshotTests(TestCase):
+    """
+    Case.latest_snapshot and the typed columns always describe the same (found) snapshot.
+    """
+
+    def test_found_then_miss_then_renormalize(self):
+        court = Court.objects.create(name="Ειρηνοδικείο Λαμίας")
+
+        def run(fields):
+            job = CivilSearchJob.objects.create(client_name="Πελάτης", court=court, gak_number="9", gak_year=2026)
+            with mock.patch.object(jobs, "scrape_solon_civil_adf", return_value={"fields": fields}), \
+                    self.captureOnCommitCallbacks(execute=True):
+                jobs.run_civil_job(job.id)
+            job.refresh_from_db()
+            return job
+
+        found = run({"Ημ. Κατάθεσης": "01/02/2026", "Διαδικασία": "Τακτική", "Αριθμός Πινακίου": "12 / 15/03/2027"})
+        miss = run({})
+        self.assertEqual((found.status, miss.status), ("done", "no_results"))
+        case = found.case
+        case.refresh_from_db()
+        self.assertEqual(case.latest_snapshot_id, found.snapshot_id)
+
+        # A stored snapshot the pipeline would still change, so renormalize re-projects the case
+        CaseSnapshot.objects.filter(id=found.snapshot_id).update(
+            data_json=dict(found.snapshot.data_json, **{"Ημ. Κατάθεσης": "1/2/2026"}))
+        call_command("renormalize_snapshots", stdout=StringIO())
+
+        case.refresh_from_db()
+        self.assertEqual(case.latest_snapshot_id, found.snapshot_id)
+        self.assertEqual((case.procedure, case.filing_date, case.hearing_date, case.pinakio_number),
+                         ("Τακτική", date(2026, 2, 1), date(2027, 3, 15), "12"))
+        self.assertEqual(case.change_count, 1)
+
+
+@override_settings(JOBS_MAX_RUNNING=2, JOBS_MAX_RUNNING_PER_USER=1, JOBS_MAX_QUEUED=4, JOBS_MAX_QUEUED_PER_USER=3)
+class AdmissionTests(TestCase):
+    """
+    Jobs beyond the running caps wait in FIFO order; the queue itself is bounded.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.court = Court.objects.create(name="Πρωτοδικείο Πειραιά")
+        self.alice, self.bob = (get_user_model().objects.create_user(name) for name in ("alice", "bob"))
+
+    def _job(self, user):
+        return CivilSearchJob.objects.create(user=user, client_name="X", court=self.court,
+                                             gak_number="1", gak_year=2026)
+
+    def test_caps_and_fifo(self):
+        a1, a2, b1, b2 = self._job(self.alice), self._job(self.alice), self._job(self.bob), self._job(self.bob)
+        self.assertIsNotNone(try_claim(a1.id))
+        self.assertIsNone(try_claim(a2.id))  # alice already runs one
+        self.assertEqual(queue_status(a2)["position"], 1)
+        self.assertEqual(queue_status(b2)["position"], 3)
+        # a2 is older but alice is at her cap, so bob's oldest goes first
+        self.assertEqual(claim_next().id, b1.id)
+        self.assertIsNone(claim_next())  # global cap reached
+        a1.refresh_from_db()
+        self.assertIsNone(queue_status(a1))
+        # batched refreshes bring their own browser, so they bypass the caps
+        self.assertIsNotNone(try_claim(b2.id, enforce_caps=False))
+
+    def test_new_job_does_not_overtake_the_queue(self):
+        older = self._job(self.alice)
+        newer = self._job(self.bob)
+        # A slot is free, but alice's job has been waiting longer
+        self.assertIsNone(try_claim(newer.id))
+        self.assertEqual(claim_next().id, older.id)
+        self.assertIsNotNone(try_claim(newer.id))
+
+    @override_settings(FANOUT_PARALLEL=2)
+    def test_waiting_cross_court_search_is_not_starved(self):
+        self.assertIsNotNone(try_claim(self._job(self.alice).id))
+        search = CivilSearchJob.objects.create(user=self.bob, client_name="X", gak_number="1", gak_year=2026,
+                                               candidate_courts=[self.court.id])
+        # One slot is free, the search needs both: a later single lookup must not take it
+        later = CivilSearchJob.objects.create(client_name="X", court=self.court, gak_number="2", gak_year=2026)
+        self.assertIsNone(claim_next())
+        self.assertIsNone(try_claim(later.id))
+        CivilSearchJob.objects.filter(status="running").update(status="done")
+        self.assertEqual(claim_next().id, search.id)
+
+    def test_bounded_queue(self):
+        for _ in range(3):
+            self._job(self.alice)
+        with self.assertRaises(QueueFull):
+            admit(self.alice.id)
+        admit(self.bob.id)
+        self._job(self.bob)
+        with self.assertRaises(QueueFull):
+            admit(self.bob.id)
+
+    def test_status_fragment_shows_position(self):
+        self._job(self.bob)
+        job = self._job(self.alice)
+        self.client.force_login(self.alice)
+        response = self.client.get(reverse("civil_app:job_status_api", args=[job.id]))
+        self.assertContains(response, "θέση 2 στην ουρά")
+
+
+class RerunFailedJobsTests(TestCase):
+    """
+    Admin re-runs and refreshes only queue jobs; the runner batches refreshes per court.
+    """
+
+    def test_rerun_failed(self):
+        user = get_user_model().objects.create_user("staff")
+        court = Court.objects.create(name="Πρωτοδικείο Λάρισας")
+        failed, done = (
+            CivilSearchJob.objects.create(user=user, client_name="X", court=court, gak_number=str(n),
+                                          gak_year=2026, status=status)
+            for n, status in enumerate(("error", "done"))
+        )
+        key = status_cache.status_fragment_cache_key(user.id, failed.id)
+        cache.set(key, ("etag", None, "<p>error</p>"))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(refresh.rerun_jobs(CivilSearchJob.objects.all()), 1)
+        failed.refresh_from_db()
+        done.refresh_from_db()
+        self.assertEqual((failed.status, done.status), ("queued", "done"))
+        self.assertIsNone(cache.get(key))
+
+    def test_runner_batches_refreshes_per_court(self):
+        larisa = Court.objects.create(name="Πρωτοδικείο Λάρισας", slug="larisa")
+        volos = Court.objects.create(name="Πρωτοδικείο Βόλου", slug="volos")
+        for n, court in enumerate((larisa, larisa, volos, larisa)):
+            Case.objects.create(court=court, gak_number=str(n), gak_year=2026)
+        self.assertEqual(refresh.refresh_cases(Case.objects.order_by("id")), 4)
+        ran = []
+
+        def run(job, raw=None, session=None):
+            ran.append((job.gak_number, session is not None))
+            job.status = "done"
+            job.save(update_fields=["status", "updated_at"])
+
+        with mock.patch.object(jobs, "_run_job", side_effect=run), mock.patch.object(jobs, "solon_session") as session:
+            self.assertTrue(jobs.run_next_job())
+        # The claimed refresh, then the rest of its court in one session; Βόλος waits its turn
+        self.assertEqual(ran, [("0", False), ("1", True), ("3", True)])
+        session.assert_called_once_with(larisa.name)
+        self.assertEqual(CivilSearchJob.objects.get(gak_number="2").status, "queued")
+
+
+class CourtSyncTests(TestCase):
+    """
+    SOLON's option labels come whitespace-collapsed and their values are positions;
+    existing rows must still match by name.
+    """
+
+    def test_double_spaced_name_keeps_its_row(self):
+        court = Court.objects.create(name="ΠΡΩΤΟΔΙΚΕΙΟ ΑΙΤΩΛΟΑΚΑΡΝΑΝΙΑΣ  (ΑΓΡΙΝ.& ΜΕΣΟΛ.)",
+                                     slug="πρωτοδικειο-αιτωλοακαρνανιας-αγριν-μεσολ")
+        counts = apply_court_options([("51", "ΠΡΩΤΟΔΙΚΕΙΟ ΑΙΤΩΛΟΑΚΑΡΝΑΝΙΑΣ (ΑΓΡΙΝ.& ΜΕΣΟΛ.)")])
+        self.assertEqual(counts, {"added": 0, "changed": 1, "removed": 0, "unchanged": 0})
+        court.refresh_from_db()
+        self.assertEqual((court.is_active, court.solon_code), (True, "51"))
+        self.assertEqual(Court.objects.count(), 1)
+
+    def test_court_inserted_mid_list(self):
+        # Option values are positions: the insert renumbers every later court
+        apply_court_options([("1", "Ειρηνοδικείο Αθηνών"), ("2", "Ειρηνοδικείο Πειραιά"), ("3", "Ειρηνοδικείο Πατρών")])
+        counts = apply_court_options([("1", "Ειρηνοδικείο Αθηνών"), ("2", "Ειρηνοδικείο Βόλου"),
+                                      ("3", "Ειρηνοδικείο Πειραιά"), ("4", "Ειρηνοδικείο Πατρών")])
+        self.assertEqual(counts, {"added": 1, "changed": 2, "removed": 0, "unchanged": 1})
+        self.assertEqual(
+            dict(Court.objects.filter(is_active=True).values_list("name", "solon_code")),
+            {"Ειρηνοδικείο Αθηνών": "1", "Ειρηνοδικείο Βόλου": "2",
+             "Ειρηνοδικείο Πειραιά": "3", "Ειρηνοδικείο Πατρών": "4"},
+        )
+
+    def test_slug_collision_gets_a_suffix(self):
+        Court.objects.create(name="Ειρηνοδικείο Α", slug="ειρηνοδικείο-β")
+        apply_court_options([("1", "Ειρηνοδικείο Α"), ("2", "Ειρηνοδικείο Β")])
+        self.assertEqual(Court.objects.get(name="Ειρηνοδικείο Β").slug, "ειρηνοδικείο-β-2")
+
+
+class CourtIndexTests(SimpleTestCase):
+    """
+    CourtIndex folds accents and case and ranks word prefixes above substrings.
+    """
+    names = ("Πρωτοδικείο Αθηνών", "Πρωτοδικείο Άρτας", "Ειρηνοδικείο Σπάρτης", "Ειρηνοδικείο Αθηνών")
+
+    def setUp(self):
+        self.index = CourtIndex([{"id": n, "name": name} for n, name in enumerate(self.names)])
+
+    def _names(self, query):
+        return [court["name"] for court in self.index.search(query)]
+
+    def test_accents_and_case_are_folded(self):
+        for query in ("ΑΘΗΝΩΝ", "αθηνων", "Αθηνών", "πρωτ  ΑΘ."):
+            self.assertIn("Πρωτοδικείο Αθηνών", self._names(query))
+        self.assertEqual(self._names("πρωτ αθ"), ["Πρωτοδικείο Αθηνών"])
+
+    def test_word_prefix_ranks_above_substring(self):
+        # Alphabetically Σπάρτης would come first; 'αρτ' only starts a word in Άρτας
+        self.assertEqual(self._names("αρτ"), ["Πρωτοδικείο Άρτας", "Ειρηνοδικείο Σπάρτης"])
+        self.assertEqual(self._names("ειρηνοδ"), ["Ειρηνοδικείο Αθηνών", "Ειρηνοδικείο Σπάρτης"])
+
+    def test_empty_query(self):
+        for query in ("", "   ", "-./"):
+            self.assertEqual(self.index.search(query), [])
+        self.assertEqual(self._names("θεσσαλονίκης"), [])
+
+
+class CopySqliteDataTests(TransactionTestCase):
+    """
+    copy_sqlite_data moves every row of every auth/civil_app table, M2M tables
+    included, and re-points permissions at the target's own ids.
+    """
+
+    def tearDown(self):
+        if SOURCE_ALIAS in connections.settings:
+            connections[SOURCE_ALIAS].close()
+            del connections[SOURCE_ALIAS]
+            del connections.settings[SOURCE_ALIAS]
+
+    def test_row_counts_match(self):
+        court = Court.objects.create(name="Πρωτοδικείο Λάρισας")
+        user = get_user_model().objects.create_user("lawyer")
+        group = Group.objects.create(name="Γραμματεία")
+        view_case = Permission.objects.get(codename="view_case")
+        group.permissions.add(view_case)
+        user.groups.add(group)
+        user.user_permissions.add(view_case)
+        case = Case.objects.create(court=court, gak_number="12", gak_year=2025)
+        snap = CaseSnapshot.objects.create(case=case, data_json={"Διαδικασία": "Τακτική"})
+        Case.objects.filter(pk=case.pk).update(latest_snapshot=snap)
+        UserCase.objects.create(user=user, case=case, client_name="Πελάτης", last_snapshot=snap)
+        CivilSearchJob.objects.create(user=user, client_name="Πελάτης", court=court, gak_number="12",
+                                      gak_year=2025, case=case, snapshot=snap, status="done")
+        CaseSweep.objects.create(court=court, gak_year=2025, start_number=1, end_number=10,
+                                 next_number=1, user=user)
+        models = models_to_copy()
+
+        with tempfile.TemporaryDirectory() as directory:
+            source = Path(directory) / "source.sqlite3"
+            with sqlite3.connect(source) as dest:
+                connection.ensure_connection()
+                connection.connection.backup(dest)
+            expected = {model: model.objects.count() for model in models}
+            for model in reversed(models):
+                model.objects.all().delete()
+            # The target's permission gets another id than the source's
+            view_case.delete()
+            view_case.pk = None
+            view_case.save()
+
+            # The command configures the source alias itself
+            with mock.patch.object(type(self), "databases", {"default", SOURCE_ALIAS}):
+                call_command("copy_sqlite_data", "--source", str(source), stdout=StringIO())
+
+        self.assertEqual({model: model.objects.count() for model in models}, expected)
+        self.assertEqual(Case.objects.get().latest_snapshot_id, snap.id)
+        user = get_user_model().objects.get()
+        self.assertTrue(user.has_perm("civil_app.view_case"))
+        self.assertEqual(list(user.groups.get().permissions.all()), [view_case])
+
+
+class CompactHistoryTests(TestCase):
+    """
+    Every archived row can be read back from the archive, batch by batch, and restored.
+    """
+
+    def test_archived_rows_read_back(self):
+        court = Court.objects.create(name="Πρωτοδικείο Βόλου")
+        old = timezone.now() - timedelta(days=500)
+        case = Case.objects.create(court=court, gak_number="5", gak_year=2024)
+        snaps = [CaseSnapshot.objects.create(case=case, data_json={"Διαδικασία": str(n)}, scraped_at=old + timedelta(days=n))
+                 for n in range(5)]
+        Case.objects.filter(pk=case.pk).update(latest_snapshot=snaps[-1])
+        jobs_ = [CivilSearchJob.objects.create(client_name="X", court=court, gak_number=str(n), gak_year=2024,
+                                               status="done") for n in range(3)]
+        CivilSearchJob.objects.filter(id__in=[j.id for j in jobs_]).update(created_at=old)
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(HISTORY_ARCHIVE_DIR=Path(directory)):
+            call_command("compact_history", "--batch-size", "2", "--no-vacuum", stdout=StringIO())
+            self.assertFalse(CivilSearchJob.objects.exists())
+            self.assertEqual(list(CaseSnapshot.objects.values_list("id", flat=True)), [snaps[-1].id])
+
+            archived = {}
+            for path in sorted(Path(directory).iterdir()):
+                with gzip.open(path, "rt", encoding="utf-8") as fh:
+                    archived[path.name.split("-")[0]] = [obj.object.pk for obj in serializers.deserialize("jsonl", fh)]
+            self.assertEqual(sorted(archived["jobs"]), [j.id for j in jobs_])
+            self.assertEqual(sorted(archived["snapshots"]), [s.id for s in snaps[:-1]])
+
+            for path in sorted(Path(directory).iterdir(), key=lambda p: not p.name.startswith("snapshots")):
+                call_command("compact_history", "--restore", str(path), stdout=StringIO())
+        self.assertEqual(CaseSnapshot.objects.count(), 5)
+        self.assertEqual(CivilSearchJob.objects.count(), 3)
+
+
+class GridExtractionTests(SimpleTestCase):
+    """
+    grid_archive.extract_row_fields picks the case's row out of archived grid HTML.
+    """
+
+    @staticmethod
+    def _grid(*rows):
+        return "<table>" + "".join(
+            "<tr>" + "".join(f'<td id="pc1:ldoTable:{n}{suffix}">{text}</td>' for suffix, text in cells.items()) + "</tr>"
+            for n, cells in enumerate(rows)
+        ) + "</table>"
+
+    def test_separate_number_and_year_cells(self):
+        html = self._grid(
+            {":num": "12", ":year": "2024", ":c2": "01/02/2024", ":c5": "Ειδική"},
+            {":num": "123", ":year": "2024", ":c2": "05/03/2024", ":c5": "Τακτική",
+             ":c10": "456/2025 - Απορρίπτει", ":c11": "Συζητήθηκε"},
+        )
+        self.assertEqual(grid_archive.extract_row_fields(html, "123", "2024"), {
+            "Ημ. Κατάθεσης": "05/03/2024",
+            "Διαδικασία": "Τακτική",
+            "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού": "456/2025 - Απορρίπτει",
+            "Αποτέλεσμα Συζήτησης": "Συζητήθηκε",
+        })
+
+    def test_combined_number_cell(self):
+        html = self._grid(
+            {":c3": "1234/2024", ":c5": "Ειδική"},
+            {":c3": " 123 / 2024 ", ":c4": "55/2024", ":c6": "Αγωγή",
+             ":c7": "Αναγνώριση&nbsp;&nbsp;<br>κυριότητας"},
+        )
+        self.assertEqual(grid_archive.extract_row_fields(html, 123, 2024), {
+            "Γενικός Αριθμός Κατάθεσης/Έτος": "123 / 2024",
+            "Ειδικός Αριθμός Κατάθεσης/Έτος": "55/2024",
+            "Είδος": "Αγωγή",
+            "Αντικείμενο": "Αναγνώριση κυριότητας",
+        })
+        self.assertEqual(grid_archive.extract_row_fields(html, "99", "2024"), {})
+
+    def test_decision_found_outside_its_cell(self):
+        html = self._grid({":c3": "123/2024", ":c9": "12", ":c12": "789/2025 - Δεκτή"})
+        self.assertEqual(grid_archive.extract_row_fields(html, "123", "2024"), {
+            "Γενικός Αριθμός Κατάθεσης/Έτος": "123/2024",
+            "Αριθμός Πινακίου": "12",
+            "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού": "789/2025 - Δεκτή",
+        })
+
+
+class FanoutTests(TestCase):
+    """
+    Cross-court search runs as a queued job over every ranked candidate court;
+    one hit binds the job, several are handed back to the user.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create_user("searcher")
+        self.courts = [Court.objects.create(name=f"Ειρηνοδικείο {name}", slug=f"fanout-{n}")
+                       for n, name in enumerate(("Άργους", "Βέροιας", "Γρεβενών", "Δράμας"))]
+
+    @staticmethod
+    def _scrape_finding(*court_names):
+        def scrape(name, gak_number, gak_year):
+            if name not in court_names:
+                return {"fields": {}}
+            return {"fields": {"Γενικός Αριθμός Κατάθεσης/Έτος": f"{gak_number}/{gak_year}", "Διαδικασία": "Τακτική"}}
+        return scrape
+
+    def test_all_hits_in_candidate_order_and_misses_remembered(self):
+        courts = [{"id": c.id, "name": c.name} for c in self.courts]
+        finding = self._scrape_finding(courts[3]["name"], courts[1]["name"])
+        for _ in range(3):  # whichever lookup finishes first
+            cache.clear()
+            with mock.patch.object(fanout, "scrape_solon_civil_adf", side_effect=finding) as scrape:
+                hits = fanout.find_courts("12", 2026, courts, parallel=4)
+            self.assertEqual(scrape.call_count, 4)
+            self.assertEqual([court for court, _ in hits], [courts[1], courts[3]])
+        self.assertTrue(is_known_miss(courts[0]["id"], "12", 2026))
+        self.assertFalse(is_known_miss(courts[1]["id"], "12", 2026))
+
+    def test_row_of_another_gak_is_not_a_hit(self):
+        courts = [{"id": c.id, "name": c.name} for c in self.courts[:1]]
+        other = {"fields": {"Γενικός Αριθμός Κατάθεσης/Έτος": "120/2026", "Διαδικασία": "Τακτική"}}
+        with mock.patch.object(fanout, "scrape_solon_civil_adf", return_value=other):
+            self.assertEqual(fanout.find_courts("12", 2026, courts), [])
+
+    def test_candidates_ranked_by_hits(self):
+        CivilSearchJob.objects.create(client_name="X", court=self.courts[3], gak_number="1", gak_year=2026, status="done")
+        self.assertEqual(fanout.candidate_courts()[0]["id"], self.courts[3].id)
+        self.assertEqual([c["id"] for c in fanout.candidate_courts("βεροια")], [self.courts[1].id])
+
+    def test_form_queues_the_search_and_runner_finds_the_court(self):
+        self.client.force_login(self.user)
+        form = {"client_name": "Πελάτης", "gak_number": "12", "gak_year": "2026", "across_courts": "1"}
+        response = self.client.post(reverse("civil_app:civil_form"), dict(form, court_q="καλαματα"))
+        self.assertContains(response, "Κανένα δικαστήριο")
+        self.assertFalse(CivilSearchJob.objects.exists())
+
+        with mock.patch.object(fanout, "scrape_solon_civil_adf") as scrape:
+            self.client.post(reverse("civil_app:civil_form"), dict(form, court_q=""))
+        scrape.assert_not_called()
+        job = CivilSearchJob.objects.get()
+        self.assertEqual((job.status, job.court_id, len(job.candidate_courts)), ("queued", None, 4))
+
+        with mock.patch.object(fanout, "scrape_solon_civil_adf", side_effect=self._scrape_finding(self.courts[1].name)):
+            self.assertTrue(jobs.run_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.court_id), ("done", self.courts[1].id))
+
+    def test_several_hits_are_offered_to_the_user(self):
+        self.client.force_login(self.user)
+        job = CivilSearchJob.objects.create(user=self.user, client_name="Πελάτης", gak_number="12", gak_year=2026,
+                                            candidate_courts=[c.id for c in self.courts])
+        finding = self._scrape_finding(self.courts[2].name, self.courts[0].name)
+        with mock.patch.object(fanout, "scrape_solon_civil_adf", side_effect=finding):
+            self.assertTrue(jobs.run_next_job())
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.court_id, job.snapshot_id), ("ambiguous", None, None))
+        self.assertEqual(job.candidate_courts, [self.courts[0].id, self.courts[2].id])
+
+        response = self.client.get(reverse("civil_app:job_status_api", args=[job.id]))
+        self.assertEqual(response.status_code, 286)
+        pick = f"{reverse('civil_app:civil_form')}?court={self.courts[2].id}&gak_number=12&gak_year=2026"
+        self.assertContains(response, pick.replace("&", "&amp;"), status_code=286)
+        form = self.client.get(pick)
+        self.assertContains(form, f'name="court" type="hidden" value="{self.courts[2].id}"')
+
+    @override_settings(JOBS_MAX_RUNNING=2, FANOUT_PARALLEL=4)
+    def test_search_takes_its_parallel_slots(self):
+        CivilSearchJob.objects.create(client_name="X", court=self.courts[0], gak_number="1", gak_year=2026,
+                                      status="running")
+        CivilSearchJob.objects.create(user=self.user, client_name="X", gak_number="2", gak_year=2026,
+                                      candidate_courts=[self.courts[1].id])
+        self.assertIsNone(claim_next())
+
+
+class _Crash(BaseException):
+    """Stands in for the process being killed mid-sweep."""
+
+
+class _StubSession:
+    def __init__(self, results, calls):
+        self.results, self.calls = results, calls
+
+    def lookup(self, gak_number, gak_year):
+        self.calls.append(int(gak_number))
+        result = self.results.get(int(gak_number), {})
+        if isinstance(result, BaseException):
+            raise result
+        return {"fields": dict(result), "grid_html": ""}
+
+
+@override_settings(SWEEP_RATE_PER_MINUTE=1e9)
+class SweepTests(TestCase):
+    """
+    Range walk with a stubbed SolonSession: outcomes, bulk upsert, checkpoint/resume and skipping known-empty numbers.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.court = Court.objects.create(name="Πρωτοδικείο Κορίνθου")
+        self.calls, self.sessions = [], 0
+
+    def _run(self, sweep, results, batch_size=2):
+        @contextmanager
+        def session(label):
+            self.sessions += 1
+            yield _StubSession(results, self.calls)
+        with mock.patch.object(sweeps, "solon_session", session):
+            return sweeps.run_sweep(sweep.id, batch_size=batch_size)
+
+    def _sweep(self, start=1, end=6):
+        return CaseSweep.objects.create(court=self.court, gak_year=2026, start_number=start, end_number=end,
+                                        next_number=start)
+
+    def test_walk_and_upsert(self):
+        existing = Case.objects.create(court=self.court, gak_number="5", gak_year=2026)
+        found = {"Διαδικασία": "Τακτική"}
+        snap = CaseSnapshot.objects.create(case=existing, data_json=clean_solon_fields({"fields": found}))
+        Case.objects.filter(pk=existing.pk).update(latest_snapshot=snap, change_count=1)
+
+        with self.assertLogs("civil_app.sweeps", "ERROR"):
+            sweep = self._run(self._sweep(), {2: found, 4: StaleGridError("grid"), 5: found})
+        self.assertEqual((sweep.status, sweep.found, sweep.empty, sweep.failed_lookups), ("done", 2, 3, 1))
+        self.assertEqual(sweep.empty_ranges, [[1, 1], [3, 3], [6, 6]])
+        self.assertEqual(sweep.next_number, 7)
+        self.assertEqual(self.sessions, 2)  # reopened after the stale grid
+
+        new = Case.objects.get(court=self.court, gak_number="2", gak_year=2026)
+        self.assertEqual((new.change_count, new.procedure), (1, "Τακτική"))
+        self.assertEqual(new.latest_snapshot.data_json["Διαδικασία"], "Τακτική")
+        existing.refresh_from_db()
+        self.assertNotEqual(existing.latest_snapshot_id, snap.id)
+        self.assertEqual(existing.change_count, 1)  # same state: not a change
+
+    def test_resume_from_checkpoint(self):
+        sweep = self._sweep()
+        with self.assertRaises(_Crash):
+            self._run(sweep, {2: {"Διαδικασία": "Τακτική"}, 5: _Crash()})
+        sweep.refresh_from_db()
+        self.assertEqual((sweep.next_number, sweep.found, sweep.empty), (5, 1, 3))
+
+        self.calls.clear()
+        sweep = self._run(sweep, {})
+        self.assertEqual(self.calls, [5, 6])
+        self.assertEqual((sweep.status, sweep.found, sweep.empty), ("done", 1, 5))
+
+    def test_known_empty_numbers_are_skipped(self):
+        self._run(self._sweep(1, 4), {2: {"Διαδικασία": "Τακτική"}})
+        self.calls.clear()
+        sweep = self._run(self._sweep(1, 6), {})
+        self.assertEqual(self.calls, [2, 5, 6])
+        self.assertEqual(sweep.skipped, 3)
+
+
+class NormalizerTests(SimpleTestCase):
+    """
+    clean_solon_fields repairs misplaced grid cells and is idempotent.
+    """
+
+    def _clean(self, fields):
+        cleaned = clean_solon_fields({"fields": fields})
+        # Re-running a stored snapshot through the pipeline changes nothing
+        self.assertEqual(clean_solon_fields(cleaned), cleaned)
+        return cleaned
+
+    def test_swapped_filing_and_general_number(self):
+        cleaned = self._clean({"Ημ. Κατάθεσης": "123/2024", "Γενικός Αριθμός Κατάθεσης/Έτος": "01/02/2024",
+                               "Διαδικασία": "Τακτική"})
+        self.assertEqual((cleaned["Ημ. Κατάθεσης"], cleaned["Γενικός Αριθμός Κατάθεσης/Έτος"]),
+                         ("01/02/2024", "123/2024"))
+        self.assertEqual(cleaned["Διαδικασία"], "Τακτική")
+
+    def test_values_one_cell_right_are_moved_back(self):
+        cleaned = self._clean({
+            "Ημ. Κατάθεσης": "Ηλεκτρονική",
+            "Γενικός Αριθμός Κατάθεσης/Έτος": "01/02/2024",
+            "Ειδικός Αριθμός Κατάθεσης/Έτος": "123/2024",
+            "Διαδικασία": "55/2024",
+            "Είδος": "Τακτική",
+            "Αντικείμενο": "Αγωγή",
+            "Αριθμός Πινακίου": "Αποζημίωση",          # c9 text: the c8 value we do not map
+            "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού": "12 / 15/03/2025",
+            "Αποτέλεσμα Συζήτησης": "900/2025 - Οριστική",
+        })
+        self.assertEqual(cleaned["Ημ. Κατάθεσης"], "01/02/2024")
+        self.assertEqual(cleaned["Γενικός Αριθμός Κατάθεσης/Έτος"], "123/2024")
+        self.assertEqual(cleaned["Ειδικός Αριθμός Κατάθεσης/Έτος"], "55/2024")
+        self.assertEqual((cleaned["Διαδικασία"], cleaned["Είδος"]), ("Τακτική", "Αγωγή"))
+        self.assertEqual(cleaned["Αντικείμενο"], "")  # its cell (c8) was not scraped
+        self.assertEqual(cleaned["Αριθμός Πινακίου"], "12 / 15/03/2025")
+        self.assertEqual(cleaned["Δικάσιμος"], "15/03/2025")
+        self.assertEqual(cleaned["Αριθμός Απόφασης/Έτος - Είδος Διατακτικού"], "900/2025 - Οριστική")
+        self.assertEqual(cleaned["Αποτέλεσμα Συζήτησης"], "")
+
+    def test_row_that_does_not_line_up_is_left_alone(self):
+        fields = {"Ημ. Κατάθεσης": "junk", "Γενικός Αριθμός Κατάθεσης/Έτος": "01/02/2024",
+                  "Ειδικός Αριθμός Κατάθεσης/Έτος": "55/2024", "Διαδικασία": "Τακτική"}
+        cleaned = self._clean(fields)
+        self.assertEqual((cleaned["Ημ. Κατάθεσης"], cleaned["Ειδικός Αριθμός Κατάθεσης/Έτος"], cleaned["Διαδικασία"]),
+                         ("junk", "55/2024", "Τακτική"))
+
+
+class ProjectionTests(SimpleTestCase):
+    """
+    project_case_fields types the Case columns; state_fields keeps only SOLON state.
+    """
+
+    def test_dates_and_numbers(self):
+        projected = project_case_fields({
+            "Ημ. Κατάθεσης": "5/3/2024",
+            "Αριθμός Πινακίου": "12 - 07.11.2026",
+            "Αριθμός Απόφασης/Έτος - Είδος Διατακτικού": "1234/2025 - Οριστική",
+            "Ειδικός Αριθμός Κατάθεσης/Έτος": "55 / 2024",
+            "Διαδικασία": " Τακτική ",
+            "Αντικείμενο": "Α" * 300,
+            "Είδος": "",
+        })
+        self.assertEqual(projected, {
+            "filing_date": date(2024, 3, 5),
+            "hearing_date": date(2026, 11, 7),
+            "pinakio_number": "12",
+            "decision_number": "1234",
+            "decision_year": 2025,
+            "eak_number": "55",
+            "eak_year": 2024,
+            "procedure": "Τακτική",
+            "subject": "Α" * 255,
+        })
+
+    def test_explicit_hearing_and_bad_dates(self):
+        projected = project_case_fields({"Δικάσιμος": "01-12-2026", "Αριθμός Πινακίου": "3 07/11/2026"})
+        self.assertEqual((projected["hearing_date"], projected["pinakio_number"]), (date(2026, 12, 1), "3"))
+        projected = project_case_fields({"Ημ. Κατάθεσης": "31/02/2024", "Αριθμός Πινακίου": "χωρίς δικάσιμο"})
+        self.assertEqual((projected["filing_date"], projected["hearing_date"], projected["pinakio_number"]),
+                         (None, None, ""))
+
+    def test_missing_keys(self):
+        self.assertEqual(project_case_fields({}), {
+            "filing_date": None, "hearing_date": None, "pinakio_number": "",
+            "decision_number": "", "decision_year": None,
+        })
+
+    def test_state_fields(self):
+        self.assertEqual(state_fields({"normalized": {"Υπόθεση": "Πελάτης", "Διαδικασία": "Τακτική"}, "raw": {}}),
+                         {"Διαδικασία": "Τακτική"})
+        self.assertEqual(state_fields({"Υπόθεση": "Πελάτης", "Είδος": "Αγωγή"}), {"Είδος": "Αγωγή"})
+        for data in (None, [], {"normalized": "junk"}):
+            self.assertEqual(state_fields(data), {})
+        self.assertFalse(has_case_data({"normalized": {"Υπόθεση": "Πελάτης", "Είδος": "  "}}))
+        self.assertTrue(has_case_data({"normalized": {"Υπόθεση": "Πελάτης", "Είδος": "Αγωγή"}}))
+
+
+class BrowserSetupTests(SimpleTestCase):
+    """
+    The shared browser needs a cross-process cache; a launched one is not sampled.
+    """
+    shared_cache = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                                "LOCATION": tempfile.gettempdir()}}
+
+    def test_shared_browser_refuses_a_per_process_cache(self):
+        with override_settings(SOLON_BROWSER_CDP_URL="http://127.0.0.1:9222"):
+            with self.assertRaises(ImproperlyConfigured):
+                apps.get_app_config("civil_app").ready()
+            with override_settings(CACHES=self.shared_cache):
+                apps.get_app_config("civil_app").ready()
+
+    def test_launched_browser_is_not_sampled(self):
+        with mock.patch.object(browser, "sync_playwright") as playwright, \
+                mock.patch.object(browser, "browser_rss") as browser_rss:
+            with browser.browser_context("Πρωτοδικείο Αθηνών") as context:
+                self.assertIs(context, playwright().__enter__().chromium.launch().new_context())
+        browser_rss.assert_not_called()
@@ -6,7 +6,14 @@ app_name = "civil_app"
 
 urlpatterns = [
     path("", views.civil_form, name="civil_form"),
+    path("courts/autocomplete/", views.court_autocomplete, name="court_autocomplete"),
+    path("status/batch/", views.job_status_batch, name="job_status_batch"),
     path("status/<int:job_id>/", views.job_status_page, name="job_status_page"),
     path("status/<int:job_id>/fragment/", views.job_status_api, name="job_status_api"),
+    path("status/<int:job_id>/stream/", views.job_status_stream, name="job_status_stream"),
+    path("cases/", views.my_cases, name="my_cases"),
+    path("cases/export.csv", views.export_user_cases, name="export_user_cases"),
+    path("calendar/", views.calendar_subscribe, name="calendar_subscribe"),
+    path("calendar/<str:token>.ics", views.calendar_feed, name="calendar_feed"),
     path("debug/scrape/", views.debug_direct_scrape, name="debug_direct_scrape"),
 ]
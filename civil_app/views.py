@@ -1,11 +1,30 @@
 from __future__ import annotations
+import asyncio
+import hashlib
 import json
-from typing import List, Tuple, Dict, Any
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import AsyncIterator, List, Optional, Tuple, Dict, Any
+from asgiref.sync import sync_to_async
 from django.contrib.auth.decorators import login_required
-from django.http import HttpRequest, HttpResponse
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import Http404, HttpRequest, HttpResponse, JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.urls import reverse
+from django.template.loader import render_to_string
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .admission import QueueFull, admit, queue_status
+from .courts import court_index
+from .dashboard import DECISION_FILTERS, parse_cursor, user_case_counts, user_cases_page
+from .exports import iter_user_cases_csv
+from .fanout import candidate_courts, fanout_max_courts
+from .ics import feed_token, reset_feed_token, user_feed, user_id_from_token
+from . import status_cache
 from .models import CivilSearchJob, Court
 from .jobs import run_civil_job
+from .normalizers import snapshot_fields
 
 DISPLAY_ORDER: List[str] = [
     "Ημ. Κατάθεσης",
@@ -19,19 +38,71 @@ DISPLAY_ORDER: List[str] = [
     "Αποτέλεσμα Συζήτησης",
 ]
 
+# Server-sent status stream: how often the change markers (status_cache.py,
+# a cache read) are checked, how often the job row is read regardless (writers
+# in processes that do not share the cache), how often a keep-alive comment is
+# sent, and when the stream hands back to the browser (EventSource reconnects
+# on its own if the job is still running).
+STREAM_CHECK_SECONDS = 1.0
+STREAM_RECHECK_SECONDS = 15.0
+STREAM_HEARTBEAT_SECONDS = 15.0
+STREAM_MAX_SECONDS = 600.0
+
+# Batch status API: upper bound on ids per request / rows per cursor page.
+BATCH_STATUS_MAX_JOBS = 200
+
+# Court typeahead: max matches returned per keystroke.
+COURT_AUTOCOMPLETE_LIMIT = 20
+
+# Fragments of finished jobs never change, so they are kept rendered.
+STATUS_FRAGMENT_CACHE_SECONDS = 24 * 60 * 60
+
 @login_required
 def civil_form(request: HttpRequest) -> HttpResponse:
-    courts = Court.objects.order_by("name")
+    # The Κατάστημα field is a typeahead (court_autocomplete), so the page itself
+    # no longer carries the court list.
     if request.method == "POST":
         client_name = request.POST.get("client_name", "").strip()
         court_id = request.POST.get("court", "").strip()
+        court_q = request.POST.get("court_q", "").strip()
         gak_number = request.POST.get("gak_number", "").strip()
         gak_year = request.POST.get("gak_year", "").strip()
+        across_courts = bool(request.POST.get("across_courts"))
+        prefill = {"client_name": client_name, "court_q": court_q, "gak_number": gak_number,
+                   "gak_year": gak_year, "across_courts": across_courts}
+
+        try:
+            admit(request.user.pk)
+        except QueueFull as exc:
+            response = render(request, "civil_app/civil_form.html",
+                              {"error": str(exc), "prefill": prefill}, status=429)
+            response["Retry-After"] = str(exc.retry_after)
+            return response
+
+        candidates = []
+        if across_courts and not court_id:
+            # Unknown Κατάστημα: the typed text narrows the candidates, empty means every active court
+            if not gak_year.isdigit():
+                return render(request, "civil_app/civil_form.html",
+                              {"error": "Συμπληρώστε έγκυρο έτος.", "prefill": prefill})
+            candidates = [c["id"] for c in candidate_courts(court_q)[:fanout_max_courts()]]
+            if not candidates:
+                return render(request, "civil_app/civil_form.html",
+                              {"error": f"Κανένα δικαστήριο δεν ταιριάζει με «{court_q}».", "prefill": prefill})
+            # The search itself runs as a job (`manage.py run_jobs`), not in this request
+            job = CivilSearchJob.objects.create(
+                user=request.user,
+                client_name=client_name,
+                gak_number=gak_number,
+                gak_year=gak_year,
+                candidate_courts=candidates,
+                status="queued",
+            )
+            return redirect("civil_app:job_status_page", job_id=job.id)
 
         if not court_id:
             return render(request, "civil_app/civil_form.html",
-                          {"courts": courts, "error": "Επιλέξτε δικαστήριο.",
-                           "prefill": {"client_name": client_name, "gak_number": gak_number, "gak_year": gak_year}})
+                          {"error": "Επιλέξτε δικαστήριο.", "prefill": prefill})
 
         court = get_object_or_404(Court, id=court_id)
         job = CivilSearchJob.objects.create(
@@ -42,21 +113,37 @@ def civil_form(request: HttpRequest) -> HttpResponse:
             gak_year=gak_year,
             status="queued",
         )
-        # Run synchronously in dev to avoid getting stuck on waiting
+        # Runs now when admission control has a slot and no older job waits; otherwise `manage.py run_jobs` starts it
         run_civil_job(job.id)
         return redirect("civil_app:job_status_page", job_id=job.id)
 
-    return render(request, "civil_app/civil_form.html", {"courts": courts})
+    # Prefilled from a link, e.g. a court picked after an ambiguous cross-court search
+    prefill = {key: request.GET.get(key, "").strip() for key in ("client_name", "gak_number", "gak_year")}
+    court_id = request.GET.get("court", "")
+    court = Court.objects.filter(id=court_id).first() if court_id.isdigit() else None
+    if court is not None:
+        prefill.update(court=court.id, court_q=court.name)
+    return render(request, "civil_app/civil_form.html", {"prefill": prefill})
 
 @login_required
-def job_status_page(request: HttpRequest, job_id: int) -> HttpResponse:
-    job = get_object_or_404(CivilSearchJob, id=job_id, user=request.user)
-    return render(request, "civil_app/job_status.html", {"job": job})
+def court_autocomplete(request: HttpRequest) -> HttpResponse:
+    """
+    Court typeahead over the in-process CourtIndex (accent/case-insensitive).
+    htmx requests get the <li> list fragment, anything else gets JSON.
+    """
+    q = request.GET.get("q", request.GET.get("court_q", ""))
+    matches = court_index().search(q, limit=COURT_AUTOCOMPLETE_LIMIT)
+    if request.headers.get("HX-Request"):
+        return render(request, "civil_app/_court_matches.html", {"matches": matches, "q": q})
+    return JsonResponse({"results": matches}, json_dumps_params={"ensure_ascii": False})
 
 @login_required
-def job_status_api(request: HttpRequest, job_id: int) -> HttpResponse:
+def job_status_page(request: HttpRequest, job_id: int) -> HttpResponse:
     job = get_object_or_404(CivilSearchJob, id=job_id, user=request.user)
+    return render(request, "civil_app/job_status.html", {"job": job})
 
+def _status_fragment_context(job: CivilSearchJob, debug: bool = False,
+                             queue: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     data: Dict[str, Any] = {}
     if getattr(job, "snapshot_id", None):
         data = getattr(job.snapshot, "data_json", {}) or {}
@@ -68,7 +155,6 @@ def job_status_api(request: HttpRequest, job_id: int) -> HttpResponse:
     if isinstance(normalized, dict):
         display_fields = [(label, (normalized.get(label) or "")) for label in DISPLAY_ORDER]
 
-    debug = ("debug" in request.GET)
     raw_pretty = None
     if debug and raw_payload is not None:
         try:
@@ -76,17 +162,326 @@ def job_status_api(request: HttpRequest, job_id: int) -> HttpResponse:
         except Exception:
             raw_pretty = str(raw_payload)
 
-    return render(
-        request,
-        "civil_app/status_fragment.html",
-        {
-            "job": job,
-            "display_fields": display_fields,
-            "has_raw": raw_payload is not None,
-            "raw_pretty": raw_pretty,
-        },
+    if queue is None:
+        queue = queue_status(job)
+    if queue and queue["eta_seconds"] is not None:
+        queue = dict(queue, eta_minutes=max(1, round(queue["eta_seconds"] / 60)))
+
+    court_choices: List[Court] = []
+    if job.status == "ambiguous":
+        by_id = Court.objects.in_bulk(job.candidate_courts)
+        court_choices = [by_id[court_id] for court_id in job.candidate_courts if court_id in by_id]
+
+    return {
+        "job": job,
+        "queue": queue,
+        "court_choices": court_choices,
+        "display_fields": display_fields,
+        "has_raw": raw_payload is not None,
+        "raw_pretty": raw_pretty,
+    }
+
+def _status_etag(job: CivilSearchJob, debug: bool, queue: Optional[Dict[str, Any]] = None) -> str:
+    updated = job.updated_at.isoformat() if job.updated_at else ""
+    # A queued job's fragment also changes as the queue moves
+    waiting = f"{queue['position']}:{queue['eta_seconds']}" if queue else ""
+    token = f"{job.id}|{job.status}|{updated}|{job.snapshot_id or ''}|{int(debug)}|{waiting}"
+    return '"%s"' % hashlib.md5(token.encode("utf-8")).hexdigest()
+
+@login_required
+def job_status_api(request: HttpRequest, job_id: int) -> HttpResponse:
+    """
+    Status fragment polled by htmx.
+    - ETag/Last-Modified from (status, updated_at, snapshot_id) -> 304 when unchanged
+    - terminal jobs are rendered once and served from the cache afterwards
+    - 286 at terminal states stops htmx polling
+    """
+    debug = ("debug" in request.GET)
+    cache_key = status_cache.status_fragment_cache_key(request.user.pk, job_id)
+    cached = None if debug else cache.get(cache_key)
+
+    job = None
+    html = None
+    if cached is not None:
+        etag, last_modified, html = cached
+        terminal = True
+    else:
+        job = get_object_or_404(
+            CivilSearchJob.objects.select_related("snapshot"), id=job_id, user=request.user
+        )
+        queue = queue_status(job)
+        etag = _status_etag(job, debug, queue)
+        last_modified = None if queue else (int(job.updated_at.timestamp()) if job.updated_at else None)
+        terminal = job.is_terminal
+
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        if html is None:
+            html = render_to_string(
+                "civil_app/status_fragment.html", _status_fragment_context(job, debug=debug, queue=queue), request
+            )
+            if terminal and not debug:
+                cache.set(cache_key, (etag, last_modified, html), STATUS_FRAGMENT_CACHE_SECONDS)
+        # htmx stops an `every Ns` trigger when it receives 286, so pages that
+        # still poll this endpoint go quiet once the job can no longer change.
+        response = HttpResponse(html, status=286 if terminal else 200)
+
+    response["ETag"] = etag
+    if last_modified is not None:
+        response["Last-Modified"] = http_date(last_modified)
+    # Let the browser keep the fragment but revalidate it on every poll.
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+def _render_status_event(job_id: int) -> str:
+    job = CivilSearchJob.objects.select_related("snapshot").get(id=job_id)
+    html = render_to_string("civil_app/status_fragment.html", _status_fragment_context(job))
+    return "event: status\n" + "".join(f"data: {line}\n" for line in html.splitlines()) + "\n"
+
+async def _job_status_events(job_id: int) -> AsyncIterator[str]:
+    """
+    Push the status fragment whenever (status, snapshot, error) changes, and
+    while queued whenever the queue position moves.
+    The job row (a single-row values() query, plus a count while queued) is read
+    only when its change marker moved (status_cache.py) or every
+    STREAM_RECHECK_SECONDS; the template is rendered only on change.
+    """
+    watched = CivilSearchJob.objects.filter(id=job_id).values_list("status", "snapshot_id", "error", "created_at")
+    last = None
+    seen_version = None
+    started = last_sent = time.monotonic()
+    last_read = float("-inf")
+    # Ask EventSource to wait a little before reconnecting after STREAM_MAX_SECONDS.
+    yield "retry: 3000\n\n"
+    while True:
+        versions = await status_cache.aversions(job_id)
+
+        def marker():
+            # The queue marker only matters while the job waits in the queue
+            return versions if last is None or last[0] == "queued" else versions[:1]
+
+        now = time.monotonic()
+        if marker() != seen_version or now - last_read >= STREAM_RECHECK_SECONDS:
+            last_read = now
+            state = await watched.afirst()
+            if state is None:
+                yield "event: close\ndata: gone\n\n"
+                return
+            if state[0] == "queued":
+                job = CivilSearchJob(id=job_id, status=state[0], created_at=state[3])
+                state += (await sync_to_async(queue_status)(job),)
+            changed = state != last
+            last = state
+            seen_version = marker()
+            if changed:
+                yield await sync_to_async(_render_status_event)(job_id)
+                last_sent = time.monotonic()
+                if state[0] in CivilSearchJob.TERMINAL_STATUSES:
+                    yield "event: close\ndata: done\n\n"
+                    return
+
+        now = time.monotonic()
+        if now - started > STREAM_MAX_SECONDS:
+            return
+        if now - last_sent > STREAM_HEARTBEAT_SECONDS:
+            yield ": keep-alive\n\n"
+            last_sent = now
+        await asyncio.sleep(STREAM_CHECK_SECONDS)
+
+@login_required
+async def job_status_stream(request: HttpRequest, job_id: int) -> StreamingHttpResponse:
+    """
+    text/event-stream of status fragments for one job (served via your_solon/asgi.py).
+    Emits `status` events with the rendered fragment and a final `close` event at a terminal state.
+    """
+    user = await request.auser()
+    if not await CivilSearchJob.objects.filter(id=job_id, user=user).aexists():
+        raise Http404("No CivilSearchJob matches the given query.")
+
+    response = StreamingHttpResponse(_job_status_events(job_id), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Disable proxy buffering (nginx) so events are flushed immediately.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+def _status_cursor(job: CivilSearchJob) -> str:
+    # UTC with a "Z": nothing in it needs URL-encoding
+    return f"{job.updated_at.astimezone(dt_timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%fZ')}_{job.id}"
+
+def _parse_status_cursor(value: str) -> Optional[Tuple[datetime, int]]:
+    """
+    Cursor format is '<updated_at ISO 8601>_<job id>' as returned in `next_since`.
+    A bare ISO timestamp is accepted too (id 0), as is an offset whose "+" arrived
+    unencoded (decoded to a space); timestamps without an offset are UTC.
+    """
+    stamp, _, job_id = value.rpartition("_")
+    if not stamp:
+        stamp, job_id = value, "0"
+    for candidate in (stamp, stamp.replace(" ", "+")):
+        try:
+            when = datetime.fromisoformat(candidate)
+            return (when if when.tzinfo else when.replace(tzinfo=dt_timezone.utc)), int(job_id)
+        except ValueError:
+            continue
+    return None
+
+def _job_status_json(job: CivilSearchJob) -> Dict[str, Any]:
+    fields: Dict[str, Any] = {}
+    scraped_at = None
+    if job.snapshot_id and job.snapshot is not None:
+        fields = snapshot_fields(job.snapshot.data_json)
+        scraped_at = job.snapshot.scraped_at.isoformat()
+
+    return {
+        "id": job.id,
+        "status": job.status,
+        "terminal": job.is_terminal,
+        "client_name": job.client_name,
+        "court": {"id": job.court_id, "name": job.court.name} if job.court_id else None,
+        # Cross-court search: courts still to search, or (status "ambiguous") the ones that hold the ΓΑΚ
+        "candidate_courts": job.candidate_courts if not job.court_id else [],
+        "gak_number": job.gak_number,
+        "gak_year": job.gak_year,
+        "case": ({"id": job.case_id, "procedure": job.case.procedure, "subject": job.case.subject}
+                 if job.case_id else None),
+        "snapshot_id": job.snapshot_id,
+        "scraped_at": scraped_at,
+        "fields": fields,
+        # First line only: the full traceback stays in the admin.
+        "error": (job.error or "").strip().split("\n", 1)[0],
+        "updated_at": job.updated_at.isoformat(),
+    }
+
+@login_required
+def job_status_batch(request: HttpRequest) -> JsonResponse:
+    """
+    JSON status of many jobs in one query.
+      ?ids=12,13,14       (or repeated ?id=12&id=13) -> those jobs of the current user
+      ?since=<cursor>     -> jobs changed after the cursor, oldest change first;
+                             pass `next_since` back to continue
+    """
+    qs = (
+        CivilSearchJob.objects
+        .filter(user=request.user)
+        .select_related("snapshot", "case", "court")
+    )
+
+    raw_ids = [part for value in request.GET.getlist("ids") + request.GET.getlist("id")
+               for part in value.split(",") if part.strip()]
+    since = request.GET.get("since", "").strip()
+
+    if raw_ids:
+        try:
+            ids = sorted({int(part) for part in raw_ids})
+        except ValueError:
+            return JsonResponse({"error": "ids must be integers."}, status=400)
+        if len(ids) > BATCH_STATUS_MAX_JOBS:
+            return JsonResponse({"error": f"At most {BATCH_STATUS_MAX_JOBS} ids per request."}, status=400)
+        jobs = list(qs.filter(id__in=ids).order_by("id"))
+        found = {job.id for job in jobs}
+        return JsonResponse(
+            {"jobs": [_job_status_json(job) for job in jobs],
+             "missing": [job_id for job_id in ids if job_id not in found]},
+            json_dumps_params={"ensure_ascii": False},
+        )
+
+    if since:
+        cursor = _parse_status_cursor(since)
+        if cursor is None:
+            return JsonResponse({"error": "Invalid since cursor."}, status=400)
+        when, last_id = cursor
+        qs = qs.filter(Q(updated_at__gt=when) | Q(updated_at=when, id__gt=last_id))
+
+    jobs = list(qs.order_by("updated_at", "id")[:BATCH_STATUS_MAX_JOBS])
+    next_since = since or None
+    if jobs:
+        next_since = _status_cursor(jobs[-1])
+    return JsonResponse(
+        {"jobs": [_job_status_json(job) for job in jobs],
+         "next_since": next_since,
+         "has_more": len(jobs) == BATCH_STATUS_MAX_JOBS},
+        json_dumps_params={"ensure_ascii": False},
     )
 
+@login_required
+def my_cases(request: HttpRequest) -> HttpResponse:
+    """
+    The user's followed cases, next hearing first.
+      ?court=<id>               only cases of that court
+      ?decision=decided|pending
+      ?q=<words>                cases whose client name matches (full-text index)
+      ?after=<cursor>           next page (keyset); htmx requests get just the rows
+    """
+    try:
+        court_id = int(request.GET.get("court") or 0) or None
+    except ValueError:
+        court_id = None
+    decision = request.GET.get("decision", "")
+    if decision not in DECISION_FILTERS:
+        decision = ""
+    query = request.GET.get("q", "").strip()
+    after = None
+    if request.GET.get("after"):
+        after = parse_cursor(request.GET["after"])
+        if after is None:
+            return HttpResponse("Invalid cursor.", status=400)
+
+    rows, next_cursor = user_cases_page(request.user.id, court_id=court_id, decision=decision,
+                                        query=query, after=after)
+    context = {
+        "rows": rows,
+        "next_cursor": next_cursor,
+        "court_id": court_id,
+        "decision": decision,
+        "query": query,
+    }
+    if request.headers.get("HX-Request"):
+        return render(request, "civil_app/_my_cases_rows.html", context)
+    context["counts"] = user_case_counts(request.user.id)
+    return render(request, "civil_app/my_cases.html", context)
+
+@login_required
+def export_user_cases(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Streams every followed case (UserCase) with its latest snapshot fields as CSV.
+    Bytes start flowing with the first row; nothing is held in memory.
+    """
+    response = StreamingHttpResponse(iter_user_cases_csv(request.user), content_type="text/csv; charset=utf-8")
+    stamp = datetime.now().strftime("%Y%m%d")
+    response["Content-Disposition"] = f'attachment; filename="yoursolon-cases-{stamp}.csv"'
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+def calendar_feed(request: HttpRequest, token: str) -> HttpResponse:
+    """
+    Public (token-authenticated) .ics of upcoming hearings for the token's user.
+    Unchanged feeds cost the token's key lookup and one aggregate query, and
+    answer 304 to conditional requests.
+    """
+    user_id = user_id_from_token(token)
+    if user_id is None:
+        raise Http404("Unknown calendar feed.")
+
+    etag, body = user_feed(user_id)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body(), content_type="text/calendar; charset=utf-8")
+        response["Content-Disposition"] = 'inline; filename="yoursolon.ics"'
+    response["ETag"] = etag
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+@login_required
+def calendar_subscribe(request: HttpRequest) -> HttpResponse:
+    """
+    Shows the user's feed URL; POST replaces it with a new one (a leaked URL stops working).
+    """
+    if request.method == "POST":
+        reset_feed_token(request.user)
+        return redirect("civil_app:calendar_subscribe")
+    feed_url = request.build_absolute_uri(reverse("civil_app:calendar_feed", args=[feed_token(request.user)]))
+    return render(request, "civil_app/calendar_subscribe.html", {"feed_url": feed_url})
+
 from django.contrib.auth.decorators import login_required
 
 @login_required
@@ -0,0 +1,140 @@
+"""
+Concurrency benchmark for the SQLite settings in your_solon/settings.py.
+
+Simulates scraper workers writing snapshots (claim job -> insert snapshot ->
+mark done, as in civil_app.jobs._run_job) while web processes read status
+fragments (job + snapshot by id), first with SQLite defaults and then with the
+production profile (SQLITE_INIT_COMMAND + BEGIN IMMEDIATE + busy timeout).
+
+Usage:
+  python scripts/bench_sqlite_concurrency.py [--writers 4] [--readers 8] [--seconds 5]
+"""
+
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+JOBS = 2000
+PAYLOAD = json.dumps({f"Πεδίο {i}": "Τιμή " * 20 for i in range(10)}, ensure_ascii=False)
+
+
+def _tuned_init_command() -> str:
+    # Read the real profile so the benchmark cannot drift from settings.py
+    from your_solon.settings import SQLITE_INIT_COMMAND
+    return SQLITE_INIT_COMMAND
+
+
+PROFILES = {
+    # Django defaults: rollback journal, deferred transactions, 5s busy timeout
+    "default": {"init": "", "begin": "BEGIN", "timeout": 5},
+    "tuned": {"init": None, "begin": "BEGIN IMMEDIATE", "timeout": 20},
+}
+
+
+def _connect(path, profile):
+    conn = sqlite3.connect(path, timeout=profile["timeout"], isolation_level=None)
+    for pragma in (profile["init"] or "").split(";"):
+        if pragma.strip():
+            conn.execute(pragma)
+    return conn
+
+
+def _setup(path):
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.executescript("""
+        CREATE TABLE job (id INTEGER PRIMARY KEY, status TEXT, snapshot_id INTEGER, updated_at REAL);
+        CREATE TABLE snapshot (id INTEGER PRIMARY KEY, job_id INTEGER, data_json TEXT, scraped_at REAL);
+    """)
+    conn.executemany("INSERT INTO job (id, status, updated_at) VALUES (?, 'queued', ?)",
+                     [(i, time.time()) for i in range(1, JOBS + 1)])
+    conn.close()
+
+
+def _writer(path, profile, deadline, out):
+    conn = _connect(path, profile)
+    done = locked = 0
+    while time.time() < deadline:
+        job_id = random.randint(1, JOBS)
+        try:
+            conn.execute(profile["begin"])
+            # Claim (read, then write: the lock upgrade that fails under deferred mode)
+            conn.execute("SELECT status FROM job WHERE id = ?", (job_id,)).fetchone()
+            conn.execute("UPDATE job SET status = 'running', updated_at = ? WHERE id = ?", (time.time(), job_id))
+            cur = conn.execute("INSERT INTO snapshot (job_id, data_json, scraped_at) VALUES (?, ?, ?)",
+                               (job_id, PAYLOAD, time.time()))
+            conn.execute("UPDATE job SET status = 'done', snapshot_id = ?, updated_at = ? WHERE id = ?",
+                         (cur.lastrowid, time.time(), job_id))
+            conn.execute("COMMIT")
+            done += 1
+        except sqlite3.OperationalError:
+            locked += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+    out.put(("write", done, locked))
+
+
+def _reader(path, profile, deadline, out):
+    conn = _connect(path, profile)
+    done = locked = 0
+    while time.time() < deadline:
+        try:
+            conn.execute(
+                "SELECT job.status, snapshot.data_json FROM job LEFT JOIN snapshot ON snapshot.id = job.snapshot_id "
+                "WHERE job.id = ?", (random.randint(1, JOBS),)
+            ).fetchone()
+            done += 1
+        except sqlite3.OperationalError:
+            locked += 1
+    out.put(("read", done, locked))
+
+
+def run(name, profile, writers, readers, seconds):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.sqlite3")
+        _setup(path)
+        _connect(path, profile).close()  # journal_mode=WAL is persistent; set it before workers start
+        out = mp.Queue()
+        deadline = time.time() + seconds
+        procs = [mp.Process(target=_writer, args=(path, profile, deadline, out)) for _ in range(writers)]
+        procs += [mp.Process(target=_reader, args=(path, profile, deadline, out)) for _ in range(readers)]
+        for p in procs:
+            p.start()
+        totals = {"write": [0, 0], "read": [0, 0]}
+        for _ in procs:
+            kind, done, locked = out.get()
+            totals[kind][0] += done
+            totals[kind][1] += locked
+        for p in procs:
+            p.join()
+
+    w, r = totals["write"], totals["read"]
+    print(f"{name:>8}: {w[0] / seconds:8.0f} writes/s ({w[1]} locked)   "
+          f"{r[0] / seconds:9.0f} reads/s ({r[1]} locked)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    PROFILES["tuned"]["init"] = _tuned_init_command()
+    print(f"{args.writers} writers, {args.readers} readers, {args.seconds:g}s per profile")
+    for name, profile in PROFILES.items():
+        run(name, profile, args.writers, args.readers, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
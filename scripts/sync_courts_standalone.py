@@ -50,39 +50,12 @@ import django  # noqa: E402
 django.setup()
 
 # After setup, we can import ORM models
-from django.utils.text import slugify  # noqa: E402
-from playwright.sync_api import sync_playwright  # noqa: E402
-from civil_app.models import Court  # noqa: E402
-
-SOLON_TRACK_URL = "https://extapps.solon.gov.gr/mojwp/faces/TrackLdoPublic"
+from civil_app.court_sync import sync_courts  # noqa: E402
 
 def main() -> None:
-    added = 0
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True, args=["--no-sandbox"])
-        page = browser.new_page(locale="el-GR")
-        page.goto(SOLON_TRACK_URL, wait_until="domcontentloaded", timeout=45000)
-
-        # Find Κατάστημα <select>
-        select = page.get_by_label("Κατάστημα", exact=False)
-        if not select.count():
-            select = page.locator("select").first
-
-        options = select.locator("option")
-        for i in range(options.count()):
-            text = options.nth(i).inner_text().strip()
-            if not text or text.lower() in ("--", "επιλέξτε", "επιλογή"):
-                continue
-            Court.objects.update_or_create(
-                name=text,
-                defaults={"slug": slugify(text, allow_unicode=True), "is_active": True},
-            )
-            added += 1
-
-        browser.close()
-
+    counts = sync_courts()
     print(f"[OK] DJANGO_SETTINGS_MODULE={settings_module}")
-    print(f"Synced {added} courts.")
+    print("Synced courts: {added} added, {changed} changed, {removed} deactivated, {unchanged} unchanged.".format(**counts))
 
 if __name__ == "__main__":
     main()
@@ -3,6 +3,11 @@ ASGI config for your_solon project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The job status stream (civil_app.views.job_status_stream) is an async
+text/event-stream view; serve it with an ASGI server, e.g.
+``uvicorn your_solon.asgi:application``, so open status tabs do not each
+hold a worker thread.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
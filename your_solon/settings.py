@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -74,12 +75,88 @@ WSGI_APPLICATION = 'your_solon.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# SQLite production profile, applied on every new connection:
+# - WAL: status-fragment reads keep running while a worker writes a snapshot
+# - synchronous=NORMAL: durable in WAL mode, far fewer fsyncs
+# - mmap/cache: keep the hot pages of the job/snapshot tables in memory
+# - transaction_mode IMMEDIATE: atomic() blocks (job claim, snapshot write) take
+#   the write lock up front, so concurrent writers wait on `timeout` (busy
+#   timeout, seconds) instead of failing half-way with "database is locked"
+# scripts/bench_sqlite_concurrency.py compares this against the defaults.
+SQLITE_INIT_COMMAND = ";".join([
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",   # 256 MiB
+    "PRAGMA cache_size=-65536",     # 64 MiB
+    "PRAGMA temp_store=MEMORY",
+])
+
+# DJANGO_DB_ENGINE=postgresql switches to PostgreSQL (needs psycopg 3, see
+# requirements.txt); connection details come from POSTGRES_* variables.
+# Persistent connections by default (DB_CONN_MAX_AGE seconds); DB_POOL=1 uses
+# psycopg's connection pool instead (CONN_MAX_AGE must then be 0).
+# Move existing data over with `manage.py copy_sqlite_data --source db.sqlite3`.
+DB_ENGINE = os.environ.get("DJANGO_DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgresql":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get("POSTGRES_DB", "your_solon"),
+            'USER': os.environ.get("POSTGRES_USER", "your_solon"),
+            'PASSWORD': os.environ.get("POSTGRES_PASSWORD", ""),
+            'HOST': os.environ.get("POSTGRES_HOST", "127.0.0.1"),
+            'PORT': os.environ.get("POSTGRES_PORT", "5432"),
+            'CONN_MAX_AGE': int(os.environ.get("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {},
+        }
+    }
+    if os.environ.get("DB_POOL") == "1":
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            'min_size': int(os.environ.get("DB_POOL_MIN", "2")),
+            'max_size': int(os.environ.get("DB_POOL_MAX", "10")),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                'init_command': SQLITE_INIT_COMMAND,
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': 20,
+            },
+        }
+    }
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Redis (already used by Celery) when DJANGO_CACHE_URL is set, e.g. redis://127.0.0.1:6379/1.
+# Falls back to per-process local memory, which is fine for a single dev server:
+# other processes' changes (e.g. sync_courts) show up there only after
+# courts.COURTS_LOCAL_VERSION_SECONDS, and SOLON_BROWSER_CDP_URL refuses to run
+# without the shared cache.
+
+DJANGO_CACHE_URL = os.environ.get("DJANGO_CACHE_URL", "")
+
+if DJANGO_CACHE_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': DJANGO_CACHE_URL,
+            'KEY_PREFIX': 'your_solon',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'your_solon',
+        }
     }
-}
 
 
 # Password validation
@@ -119,6 +196,44 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# Compressed, content-addressed archive of raw SOLON result grids (civil_app/grid_archive.py)
+GRID_ARCHIVE_DIR = Path(os.environ.get("GRID_ARCHIVE_DIR", BASE_DIR / "grid_archive"))
+
+# gzip JSONL archives written by `manage.py compact_history`
+HISTORY_ARCHIVE_DIR = Path(os.environ.get("HISTORY_ARCHIVE_DIR", BASE_DIR / "history_archive"))
+
+# Shared Chromium per host (`manage.py browser_server`), e.g. http://127.0.0.1:9222.
+# Empty: every lookup launches its own browser (civil_app/browser.py).
+SOLON_BROWSER_CDP_URL = os.environ.get("SOLON_BROWSER_CDP_URL", "")
+# browser_server recycles its Chromium past this RSS (whole process tree) or this
+# many lookups, after waiting up to SOLON_BROWSER_DRAIN_SECONDS for open pages.
+SOLON_BROWSER_MAX_RSS_MB = int(os.environ.get("SOLON_BROWSER_MAX_RSS_MB", "1536"))
+SOLON_BROWSER_RECYCLE_LOOKUPS = int(os.environ.get("SOLON_BROWSER_RECYCLE_LOOKUPS", "500"))
+SOLON_BROWSER_DRAIN_SECONDS = int(os.environ.get("SOLON_BROWSER_DRAIN_SECONDS", "60"))
+
+# Cross-court search (civil_app/fanout.py): courts looked up at the same time
+FANOUT_PARALLEL = int(os.environ.get("FANOUT_PARALLEL", "4"))
+# ... and at most this many courts per search (the most used ones first)
+FANOUT_MAX_COURTS = int(os.environ.get("FANOUT_MAX_COURTS", "40"))
+
+# ΓΑΚ range sweeps (civil_app/sweeps.py): lookups per minute, and how long a
+# number found empty is skipped by later sweeps of the same court/year
+SWEEP_RATE_PER_MINUTE = float(os.environ.get("SWEEP_RATE_PER_MINUTE", "30"))
+SWEEP_EMPTY_TTL_HOURS = float(os.environ.get("SWEEP_EMPTY_TTL_HOURS", "24"))
+
+# Lookups that found nothing are answered as no_results without scraping for
+# this long (civil_app/negative_cache.py); 0 disables it
+NEGATIVE_CACHE_SECONDS = int(os.environ.get("NEGATIVE_CACHE_SECONDS", str(15 * 60)))
+
+# Admission control (civil_app/admission.py): lookups running at once, overall
+# and per user; jobs waiting beyond the queue limits are refused at the form
+JOBS_MAX_RUNNING = int(os.environ.get("JOBS_MAX_RUNNING", "4"))
+JOBS_MAX_RUNNING_PER_USER = int(os.environ.get("JOBS_MAX_RUNNING_PER_USER", "2"))
+JOBS_MAX_QUEUED = int(os.environ.get("JOBS_MAX_QUEUED", "200"))
+JOBS_MAX_QUEUED_PER_USER = int(os.environ.get("JOBS_MAX_QUEUED_PER_USER", "20"))
+JOBS_RUNNING_TIMEOUT_SECONDS = int(os.environ.get("JOBS_RUNNING_TIMEOUT_SECONDS", str(10 * 60)))
+JOBS_THROUGHPUT_WINDOW_SECONDS = int(os.environ.get("JOBS_THROUGHPUT_WINDOW_SECONDS", str(10 * 60)))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 